@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status
 from app.core.security import get_current_user
-from app.core.database import get_db
+from app.core.database import get_async_db
 
 async def get_current_active_user(current_user=Depends(get_current_user)):
     """Get current authenticated user"""
@@ -15,10 +15,10 @@ async def get_current_admin_user(current_user: dict = Depends(get_current_user))
         )
     return current_user
 
-def get_user_from_db(user_id: str):
+async def get_user_from_db(user_id: str):
     """Get full user details from the database"""
-    db = get_db()
-    result = db.table('users').select('*').eq('id', user_id).execute()
+    db = get_async_db()
+    result = await db.table('users').select('*').eq('id', user_id).execute()
     
     if not result.data:
         raise HTTPException(
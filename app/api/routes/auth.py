@@ -46,7 +46,7 @@ async def google_auth(auth_request: GoogleAuthRequest):
 async def get_current_user_info(current_user: dict = Depends(get_current_active_user)):
     """Get current authenticated users info"""
     try:
-        user = get_user_from_db(current_user['sub'])
+        user = await get_user_from_db(current_user['sub'])
         return user
     except Exception as e:
         print(f"Error getting current user: {str(e)}")
@@ -2,8 +2,10 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
-from app.core.database import get_db
+import uuid
+from app.core.database import get_async_db
 from app.api.deps import get_current_active_user
+from app.services.product_loader import get_product_loader
 
 router = APIRouter()
 
@@ -43,11 +45,11 @@ async def get_cart(current_user: dict = Depends(get_current_active_user)):
     Get current user's cart with all items and product details
     """
     user_id = current_user['sub']
-    db = get_db()
+    db = get_async_db()
     
     try:
         # Use the cart_details view for easy access to all data
-        cart_result = db.table('cart_details').select('*').eq('user_id', user_id).execute()
+        cart_result = await db.table('cart_details').select('*').eq('user_id', user_id).execute()
         
         if not cart_result.data:
             return CartResponse(items=[], total=0.0, item_count=0)
@@ -95,20 +97,18 @@ async def add_to_cart(
     Add item to cart or update quantity if already exists
     """
     user_id = current_user['sub']
-    db = get_db()
+    db = get_async_db()
     
     try:
         # Verify product exists and has stock
-        product_result = db.table('products').select('*').eq('id', item.product_id).execute()
+        product = await get_product_loader().load(item.product_id)
         
-        if not product_result.data:
+        if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Product not found"
             )
         
-        product = product_result.data[0]
-        
         # Check if product has enough stock
         if product['stock_quantity'] < item.quantity:
             raise HTTPException(
@@ -117,7 +117,7 @@ async def add_to_cart(
             )
         
         # Check if item already exists in cart
-        existing_cart_item = db.table('cart_items').select('*').eq('user_id', user_id).eq('product_id', item.product_id).execute()
+        existing_cart_item = await db.table('cart_items').select('*').eq('user_id', user_id).eq('product_id', item.product_id).execute()
         
         if existing_cart_item.data:
             # Item exists - update quantity
@@ -132,7 +132,7 @@ async def add_to_cart(
                 )
             
             # Update quantity
-            updated = db.table('cart_items').update({
+            updated = await db.table('cart_items').update({
                 'quantity': new_quantity,
                 'updated_at': datetime.utcnow().isoformat()
             }).eq('id', current_item['id']).execute()
@@ -154,7 +154,7 @@ async def add_to_cart(
                 'updated_at': datetime.utcnow().isoformat()
             }
             
-            created = db.table('cart_items').insert(cart_item_data).execute()
+            created = await db.table('cart_items').insert(cart_item_data).execute()
             
             return {
                 "success": True,
@@ -182,7 +182,7 @@ async def update_cart_item(
     Update quantity of an item in the cart
     """
     user_id = current_user['sub']
-    db = get_db()
+    db = get_async_db()
     
     try:
         if update.quantity <= 0:
@@ -192,7 +192,7 @@ async def update_cart_item(
             )
         
         # Check if item exists in user's cart
-        cart_item_result = db.table('cart_items').select('*').eq('user_id', user_id).eq('product_id', product_id).execute()
+        cart_item_result = await db.table('cart_items').select('*').eq('user_id', user_id).eq('product_id', product_id).execute()
         
         if not cart_item_result.data:
             raise HTTPException(
@@ -203,7 +203,7 @@ async def update_cart_item(
         cart_item = cart_item_result.data[0]
         
         # Check product stock
-        product_result = db.table('products').select('stock_quantity').eq('id', product_id).execute()
+        product_result = await db.table('products').select('stock_quantity').eq('id', product_id).execute()
         
         if not product_result.data:
             raise HTTPException(
@@ -220,7 +220,7 @@ async def update_cart_item(
             )
         
         # Update quantity
-        updated = db.table('cart_items').update({
+        updated = await db.table('cart_items').update({
             'quantity': update.quantity,
             'updated_at': datetime.utcnow().isoformat()
         }).eq('id', cart_item['id']).execute()
@@ -249,11 +249,11 @@ async def remove_from_cart(
     Remove an item from the cart
     """
     user_id = current_user['sub']
-    db = get_db()
+    db = get_async_db()
     
     try:
         # Check if item exists in cart
-        cart_item_result = db.table('cart_items').select('id').eq('user_id', user_id).eq('product_id', product_id).execute()
+        cart_item_result = await db.table('cart_items').select('id').eq('user_id', user_id).eq('product_id', product_id).execute()
         
         if not cart_item_result.data:
             raise HTTPException(
@@ -264,7 +264,7 @@ async def remove_from_cart(
         cart_item_id = cart_item_result.data[0]['id']
         
         # Delete the item
-        db.table('cart_items').delete().eq('id', cart_item_id).execute()
+        await db.table('cart_items').delete().eq('id', cart_item_id).execute()
         
         return {
             "success": True,
@@ -286,15 +286,15 @@ async def clear_cart(current_user: dict = Depends(get_current_active_user)):
     Clear all items from the cart
     """
     user_id = current_user['sub']
-    db = get_db()
+    db = get_async_db()
     
     try:
         # Get count before deleting
-        cart_items = db.table('cart_items').select('id').eq('user_id', user_id).execute()
+        cart_items = await db.table('cart_items').select('id').eq('user_id', user_id).execute()
         items_count = len(cart_items.data)
         
         # Delete all items for this user
-        db.table('cart_items').delete().eq('user_id', user_id).execute()
+        await db.table('cart_items').delete().eq('user_id', user_id).execute()
         
         return {
             "success": True,
@@ -314,10 +314,10 @@ async def get_cart_count(current_user: dict = Depends(get_current_active_user)):
     Get the number of items in the cart (useful for navbar badge)
     """
     user_id = current_user['sub']
-    db = get_db()
+    db = get_async_db()
     
     try:
-        cart_items = db.table('cart_items').select('id').eq('user_id', user_id).execute()
+        cart_items = await db.table('cart_items').select('id').eq('user_id', user_id).execute()
         
         return {
             "count": len(cart_items.data)
@@ -339,35 +339,46 @@ async def sync_cart(
     Merges local cart with database cart
     """
     user_id = current_user['sub']
-    db = get_db()
+    db = get_async_db()
     
     try:
         synced_count = 0
         errors = []
         
+        # A malformed id would make Postgres reject the uuid cast for the whole batch below
+        valid_items = []
         for item in items:
+            try:
+                uuid.UUID(item.product_id)
+                valid_items.append(item)
+            except ValueError:
+                errors.append({
+                    "product_id": item.product_id,
+                    "error": "Invalid product id"
+                })
+        
+        # Fetch every product in the payload with one batched query
+        products = await get_product_loader().load_many([item.product_id for item in valid_items])
+        
+        for item, product in zip(valid_items, products):
             try:
                 # Check if product exists and has stock
-                product_result = db.table('products').select('stock_quantity').eq('id', item.product_id).execute()
-                
-                if not product_result.data:
+                if not product:
                     errors.append({
                         "product_id": item.product_id,
                         "error": "Product not found"
                     })
                     continue
                 
-                product = product_result.data[0]
-                
                 # Check existing cart item
-                existing = db.table('cart_items').select('*').eq('user_id', user_id).eq('product_id', item.product_id).execute()
+                existing = await db.table('cart_items').select('*').eq('user_id', user_id).eq('product_id', item.product_id).execute()
                 
                 if existing.data:
                     # Update quantity (take maximum of both)
                     new_quantity = max(existing.data[0]['quantity'], item.quantity)
                     
                     if new_quantity <= product['stock_quantity']:
-                        db.table('cart_items').update({
+                        await db.table('cart_items').update({
                             'quantity': new_quantity,
                             'updated_at': datetime.utcnow().isoformat()
                         }).eq('id', existing.data[0]['id']).execute()
@@ -375,7 +386,7 @@ async def sync_cart(
                 else:
                     # Add new item
                     if item.quantity <= product['stock_quantity']:
-                        db.table('cart_items').insert({
+                        await db.table('cart_items').insert({
                             'user_id': user_id,
                             'product_id': item.product_id,
                             'quantity': item.quantity,
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, EmailStr
 from app.services.email_service import EmailService
+from app.services.email_health import EmailProviderHealth
 from app.core.config import settings
 import logging
 
@@ -106,6 +107,7 @@ async def get_email_config():
             "api_key_set": bool(settings.SENDGRID_API_KEY),
             "api_key_length": len(settings.SENDGRID_API_KEY) if settings.SENDGRID_API_KEY else 0
         },
+        "provider_health": EmailProviderHealth.snapshot(),
         "business_email": settings.BUSINESS_EMAIL,
         "environment": settings.ENVIRONMENT
     }
\ No newline at end of file
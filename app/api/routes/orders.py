@@ -1,5 +1,5 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
-from typing import Optional
+from typing import Optional, Literal
 from app.schemas.order import (OrderCreate, OrderResponse, OrderStatusUpdate, PaymentRecord, OrderCreateResponse, OrderListResponse)
 from app.services.order_service import OrderService
 from app.api.deps import get_current_active_user, get_current_admin_user
@@ -40,7 +40,7 @@ async def create_order(order: OrderCreate, current_user: Optional[dict] = Depend
 @router.get('/{order_id}', response_model=OrderResponse)
 async def get_order(order_id: str):
     """Get order details by Order ID - returns JSON only"""
-    order = OrderService.get_order_by_id(order_id)
+    order = await OrderService.get_order_by_id(order_id)
     
     if not order:
         raise HTTPException(
@@ -57,7 +57,7 @@ async def get_my_orders(current_user: dict = Depends(get_current_active_user), s
         user_id = current_user['sub']
         print(f"Getting orders for user: {user_id}")
         
-        orders = OrderService.get_user_orders(user_id, status)
+        orders = await OrderService.get_user_orders(user_id, status)
         
         print(f"Found {len(orders)} orders")
         
@@ -106,27 +106,53 @@ async def record_payment(order_id: str, payment_data: PaymentRecord):
     return updated_order
 
 @router.get('/', response_model=OrderListResponse, dependencies=[Depends(get_current_admin_user)])
-async def get_all_orders(status: Optional[str] = None, limit: int = Query(50, ge=1, le=100), page: int = Query(1, ge=1)):
-    """Get all orders with pagination"""
-    result = OrderService.get_all_orders(status, limit, page)
+async def get_all_orders(
+    status: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description='next_cursor from the previous page'),
+    count: Optional[Literal['exact', 'planned', 'estimated', 'none']] = Query(None, description='Total count mode')
+):
+    """
+    Get all orders with pagination.
+    Use cursor (keyset) pagination for constant-cost deep pages; totals are
+    skipped in cursor mode unless a count mode is requested.
+    """
+    if count is None:
+        count = 'none' if cursor else 'exact'
+    
+    try:
+        result = await OrderService.get_all_orders(
+            status, limit, page,
+            cursor=cursor,
+            count=None if count == 'none' else count
+        )
+    except ValueError as e:
+        # 'status' is shadowed by the filter parameter here
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
     
     return OrderListResponse(
         orders=result['orders'],
         count=result['count'],
         page=result['page'],
-        total_pages=result['total_pages']
+        total_pages=result['total_pages'],
+        total_count=result['total_count'],
+        next_cursor=result['next_cursor']
     )
     
 @router.get('/stats/dashboard', dependencies=[Depends(get_current_admin_user)])
 async def get_order_stats():
     """Get order statistics for admin dashboard"""
-    from app.core.database import get_db
+    from app.core.database import get_async_db
     from collections import Counter
     
-    db = get_db()
+    db = get_async_db()
     
     # Get all orders
-    all_orders = db.table('orders').select('*').execute().data
+    all_orders = (await db.table('orders').select('*').execute()).data
     
     # Calculate statistics
     total_orders = len(all_orders)
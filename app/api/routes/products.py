@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, status, Query, Depends
-from typing import Optional, List
+from fastapi import APIRouter, HTTPException, status, Query, Depends, Request
+from typing import Optional, List, Literal
 from app.schemas.product import ProductResponse, ProductCreate, ProductUpdate, ProductImageCreate, ProductImageResponse
 from app.services.product_service import ProductService
+from app.services.catalog_cache import CatalogCache
+from app.services.search_index import product_search_index
+from app.services.fuzzy_index import product_fuzzy_index
 from app.api.deps import get_current_active_user, get_current_admin_user
+from app.core.security import get_optional_user
+from app.services.unique_views import UniqueViewCounter
+from app.services.stock_watcher import LowStockWatcher
+from app.core.config import settings
 from datetime import datetime
 
 router = APIRouter()
@@ -12,7 +19,9 @@ async def get_products(
     category: Optional[str] = None,
     sort_by: str = Query('balanced', description='balanced, popularity, price_low, price_high, newest, rating'),
     limit: int = Query(50, ge=1, le=100),
-    page: int = Query(1, ge=1)
+    page: int = Query(1, ge=1),
+    cursor: Optional[str] = Query(None, description='next_cursor from the previous page'),
+    count: Optional[Literal['exact', 'planned', 'estimated', 'none']] = Query(None, description='Total count mode')
 ):
     """
     Get all products with filtering and sorting
@@ -20,10 +29,25 @@ async def get_products(
     - **category**: Filter by product category (optional)
     - **sort_by**: Sorting strategy (default: balanced)
     - **limit**: Number of products per page
-    - **page**: Page number
+    - **page**: Page number (ignored when cursor is given)
+    - **cursor**: Opaque keyset cursor; constant cost per page regardless of depth
+    - **count**: exact, planned (approximate) or estimated total; skipped by default in cursor mode
     """
+    if count is None:
+        count = 'none' if cursor else 'exact'
+    
     offset = (page - 1) * limit
-    result = ProductService.get_all_products(category, sort_by, limit, offset)
+    try:
+        result = await ProductService.get_all_products(
+            category, sort_by, limit, offset,
+            cursor=cursor,
+            count=None if count == 'none' else count
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     return result
 
 @router.get('/search')
@@ -31,27 +55,64 @@ async def search_products(
     q: str = Query(..., min_length=2, description='Search term'),
     limit: int = Query(20, ge=1, le=50)
 ):
-    """Search products by name or description"""
-    products = ProductService.search_products(q, limit)
+    """Search products by name, category or description, ranked by relevance"""
+    products = await ProductService.search_products(q, limit)
     return {
         'products': products,
         'count': len(products),
         'search_item': q
     }
 
+@router.get('/suggest')
+async def suggest_products(
+    q: str = Query(..., min_length=1, description='Partial search term'),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """Autocomplete suggestions: matching products, categories and popular searches"""
+    suggestions = await ProductService.suggest(q, limit)
+    return {
+        **suggestions,
+        'query': q
+    }
+
 @router.get('/categories')
 async def get_categories():
     """Get all available product categories"""
-    categories = ProductService.get_categories()
+    categories = await ProductService.get_categories()
     return {
         'categories': categories,
         'count': len(categories)
     }
 
+@router.get('/stats/unique-views', dependencies=[Depends(get_current_admin_user)])
+async def get_unique_view_stats(
+    hours: Optional[float] = Query(None, gt=0, description='Rolling window in hours (default: longest kept)'),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Most viewed products by estimated distinct viewers, for the admin dashboard"""
+    snapshot = await CatalogCache.get_snapshot()
+    
+    products = []
+    for product_id, unique_views in UniqueViewCounter.top(limit, hours):
+        product = snapshot.by_id.get(product_id)
+        if product:
+            products.append({
+                'id': product['id'],
+                'name': product['name'],
+                'category': product.get('category'),
+                'view_count': product.get('view_count', 0),
+                'unique_views': unique_views
+            })
+    
+    return {
+        'products': products,
+        'window_hours': min(hours or settings.UNIQUE_VIEWS_WINDOW_HOURS, settings.UNIQUE_VIEWS_WINDOW_HOURS)
+    }
+
 @router.get('/{product_id}', response_model=ProductResponse)
-async def get_product(product_id: str):
+async def get_product(product_id: str, request: Request, current_user: Optional[dict] = Depends(get_optional_user)):
     """Get single product by ID with images"""
-    product = ProductService.get_product_by_id(product_id)
+    product = await ProductService.get_product_by_id(product_id)
     
     if not product:
         raise HTTPException(
@@ -59,16 +120,21 @@ async def get_product(product_id: str):
             detail='Product not found'
         )
     
-    # Increment view count
-    ProductService.increment_view_count(product_id)
+    # Increment view count; signed-in viewers are counted by id, others by client fingerprint
+    viewer_key = UniqueViewCounter.viewer_key(
+        current_user.get('sub') if current_user else None,
+        request.client.host if request.client else None,
+        request.headers.get('user-agent')
+    )
+    ProductService.increment_view_count(product_id, viewer_key)
     
     return product
 
 @router.post('/', response_model=ProductResponse, dependencies=[Depends(get_current_admin_user)])
 async def create_product(product: ProductCreate):
     """Create new product with optional multiple images (Admin only)"""
-    from app.core.database import get_db
-    db = get_db()
+    from app.core.database import get_async_db
+    db = get_async_db()
     
     # Separate images from product data
     images = product.images if product.images else []
@@ -77,7 +143,7 @@ async def create_product(product: ProductCreate):
     product_data['updated_at'] = datetime.utcnow().isoformat()
     
     # Create the product
-    result = db.table('products').insert(product_data).execute()
+    result = await db.table('products').insert(product_data).execute()
     created_product = result.data[0]
     
     # Add images if provided
@@ -85,19 +151,24 @@ async def create_product(product: ProductCreate):
         image_data = []
         for img in images:
             image_record = img.model_dump()
-            ProductService.add_product_images(created_product['id'], [image_record])
+            await ProductService.add_product_images(created_product['id'], [image_record])
+    
+    CatalogCache.invalidate()
+    product_search_index.upsert(created_product)
+    product_fuzzy_index.upsert(created_product)
+    LowStockWatcher.record_stock(created_product)
     
     # Return product with images
-    return ProductService.get_product_by_id(created_product['id'])
+    return await ProductService.get_product_by_id(created_product['id'])
 
 @router.put('/{product_id}', response_model=ProductResponse, dependencies=[Depends(get_current_admin_user)])
 async def update_product(product_id: str, product_update: ProductUpdate):
     """Update product with optional image updates (Admin only)"""
-    from app.core.database import get_db
-    db = get_db()
+    from app.core.database import get_async_db
+    db = get_async_db()
     
     # Check if product exists
-    existing = ProductService.get_product_by_id(product_id)
+    existing = await ProductService.get_product_by_id(product_id)
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -111,28 +182,36 @@ async def update_product(product_id: str, product_update: ProductUpdate):
     
     # Update product data
     if update_data:
-        result = db.table('products').update(update_data).eq('id', product_id).execute()
+        result = await db.table('products').update(update_data).eq('id', product_id).execute()
     
     # Update images if provided
     if images is not None:  # Allow empty list to clear images
         if images:
             image_data = [img.model_dump() for img in images]
-            ProductService.update_product_images(product_id, image_data)
+            await ProductService.update_product_images(product_id, image_data)
         else:
             # Clear all images if empty list provided
-            db.table('product_images').delete().eq('product_id', product_id).execute()
+            await db.table('product_images').delete().eq('product_id', product_id).execute()
+    
+    CatalogCache.invalidate()
     
     # Return updated product with images
-    return ProductService.get_product_by_id(product_id)
+    updated_product = await ProductService.get_product_by_id(product_id)
+    if updated_product:
+        product_search_index.upsert(updated_product)
+        product_fuzzy_index.upsert(updated_product)
+        if 'stock_quantity' in update_data or 'low_stock_threshold' in update_data:
+            LowStockWatcher.record_stock(updated_product)
+    return updated_product
 
 @router.delete('/{product_id}', dependencies=[Depends(get_current_admin_user)])
 async def delete_product(product_id: str):
     """Delete product (Admin only)"""
-    from app.core.database import get_db
-    db = get_db()
+    from app.core.database import get_async_db
+    db = get_async_db()
     
     # Check if product exists
-    existing = ProductService.get_product_by_id(product_id)
+    existing = await ProductService.get_product_by_id(product_id)
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -140,10 +219,13 @@ async def delete_product(product_id: str):
         )
     
     # Delete product images first (due to foreign key constraint)
-    db.table('product_images').delete().eq('product_id', product_id).execute()
+    await db.table('product_images').delete().eq('product_id', product_id).execute()
     
     # Delete product
-    db.table('products').delete().eq('id', product_id).execute()
+    await db.table('products').delete().eq('id', product_id).execute()
+    CatalogCache.invalidate()
+    product_search_index.remove(product_id)
+    product_fuzzy_index.remove(product_id)
     
     return {
         'success': True,
@@ -155,21 +237,21 @@ async def delete_product(product_id: str):
 async def get_product_images(product_id: str):
     """Get all images for a specific product (Admin only)"""
     # Check if product exists
-    existing = ProductService.get_product_by_id(product_id)
+    existing = await ProductService.get_product_by_id(product_id)
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Product not found'
         )
     
-    images = ProductService.get_product_images(product_id)
+    images = await ProductService.get_product_images(product_id)
     return images
 
 @router.post('/{product_id}/images', response_model=List[ProductImageResponse], dependencies=[Depends(get_current_admin_user)])
 async def add_product_images(product_id: str, images: List[ProductImageCreate]):
     """Add new images to a product (Admin only)"""
     # Check if product exists
-    existing = ProductService.get_product_by_id(product_id)
+    existing = await ProductService.get_product_by_id(product_id)
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -177,14 +259,15 @@ async def add_product_images(product_id: str, images: List[ProductImageCreate]):
         )
     
     image_data = [img.model_dump() for img in images]
-    created_images = ProductService.add_product_images(product_id, image_data)
+    created_images = await ProductService.add_product_images(product_id, image_data)
+    CatalogCache.invalidate()
     return created_images
 
 @router.put('/{product_id}/images', response_model=List[ProductImageResponse], dependencies=[Depends(get_current_admin_user)])
 async def replace_product_images(product_id: str, images: List[ProductImageCreate]):
     """Replace all images for a product (Admin only)"""
     # Check if product exists
-    existing = ProductService.get_product_by_id(product_id)
+    existing = await ProductService.get_product_by_id(product_id)
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -192,24 +275,26 @@ async def replace_product_images(product_id: str, images: List[ProductImageCreat
         )
     
     image_data = [img.model_dump() for img in images]
-    updated_images = ProductService.update_product_images(product_id, image_data)
+    updated_images = await ProductService.update_product_images(product_id, image_data)
+    CatalogCache.invalidate()
     return updated_images
 
 @router.delete('/{product_id}/images', dependencies=[Depends(get_current_admin_user)])
 async def delete_all_product_images(product_id: str):
     """Delete all images for a product (Admin only)"""
-    from app.core.database import get_db
-    db = get_db()
+    from app.core.database import get_async_db
+    db = get_async_db()
     
     # Check if product exists
-    existing = ProductService.get_product_by_id(product_id)
+    existing = await ProductService.get_product_by_id(product_id)
     if not existing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail='Product not found'
         )
     
-    db.table('product_images').delete().eq('product_id', product_id).execute()
+    await db.table('product_images').delete().eq('product_id', product_id).execute()
+    CatalogCache.invalidate()
     
     return {
         'success': True,
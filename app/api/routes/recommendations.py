@@ -22,7 +22,7 @@ async def get_personalized_recommendations(
     Get personalized product recommendations for current user
     Based on their browsing and purchase history
     """
-    recommendations = RecommendationService.get_user_recommendations(
+    recommendations = await RecommendationService.get_user_recommendations(
         current_user['sub'],
         limit
     )
@@ -38,7 +38,7 @@ async def get_similar_products(
     Get products similar to a specific product
     Based on category, price range, and ratings
     """
-    similar = RecommendationService.get_similar_products(product_id, limit)
+    similar = await RecommendationService.get_similar_products(product_id, limit)
     
     return similar
 
@@ -46,11 +46,11 @@ async def get_similar_products(
 async def get_trending_products(limit: int = Query(8, ge=1, le=20)):
     """
     Get currently trending products
-    Based on recent user activity
+    Based on recent user activity, with older activity counting less
     """
-    trending = RecommendationService.get_trending_products(set(), days=7)
+    trending = await RecommendationService.get_trending_products(set(), limit)
     
-    return trending[:limit]
+    return trending
 
 @router.get("/popular", response_model=List[ProductResponse])
 async def get_popular_products(limit: int = Query(8, ge=1, le=20)):
@@ -58,7 +58,7 @@ async def get_popular_products(limit: int = Query(8, ge=1, le=20)):
     Get most popular products overall
     Based on order count and ratings
     """
-    popular = RecommendationService.get_popular_products(limit)
+    popular = await RecommendationService.get_popular_products(limit)
     
     return popular
 
@@ -14,6 +14,53 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: str
     
+    # Async database client pool
+    DB_POOL_MAX_CONNECTIONS: int = 100
+    DB_POOL_MAX_KEEPALIVE: int = 20
+    DB_POOL_KEEPALIVE_EXPIRY: float = 30.0
+    DB_TIMEOUT_SECONDS: float = 10.0
+    
+    # Query instrumentation (Server-Timing header + per-request log line)
+    QUERY_INSTRUMENTATION_ENABLED: bool = True
+    QUERY_N_PLUS_ONE_THRESHOLD: int = 3
+    
+    # In-process catalog cache
+    CATALOG_CACHE_TTL_SECONDS: int = 60
+    
+    # Buffered product view counters
+    VIEW_FLUSH_INTERVAL_SECONDS: float = 10.0
+    
+    # Unique viewer estimates (HyperLogLog sketches per product)
+    UNIQUE_VIEWS_WINDOW_HOURS: float = 168  # Longest rolling window kept (7 days)
+    UNIQUE_VIEWS_BUCKET_HOURS: float = 24  # Window granularity
+    UNIQUE_VIEWS_PRECISION: int = 10  # 2**precision bytes per sketch, ~3% error
+    UNIQUE_VIEWS_FLUSH_SECONDS: float = 300.0  # How often estimates are written to products.unique_views for ranking
+    
+    # Item-item co-purchase matrix for collaborative recommendations
+    CO_PURCHASE_REBUILD_SECONDS: float = 3600.0
+    CO_PURCHASE_NEIGHBOURS: int = 50  # Most similar products kept per product
+    CO_PURCHASE_PAGE_SIZE: int = 1000  # Purchase rows read per query during a rebuild
+    
+    # Similar users (MinHash LSH over purchase sets); collisions are likely above (1 / BANDS) ** (1 / ROWS) ~ 0.18
+    SIMILAR_USERS_LSH_BANDS: int = 32
+    SIMILAR_USERS_LSH_ROWS: int = 2
+    SIMILAR_USERS_MIN_JACCARD: float = 0.2
+    SIMILAR_USERS_MAX_CANDIDATES: int = 1000  # Bucket collisions compared exactly per lookup
+    
+    # Trending products (time-decayed activity scores, checkpointed to product_trending_scores)
+    TRENDING_HALF_LIFE_HOURS: float = 48.0  # An activity counts half as much after this long
+    TRENDING_TOP_K: int = 50  # Best products kept ready for /trending
+    TRENDING_CHECKPOINT_SECONDS: float = 60.0
+    TRENDING_MIN_SCORE: float = 0.01  # Products that decayed below this are forgotten
+    
+    # Per-user /for-you cache (ranked product ids; rows come from the catalog cache)
+    RECOMMENDATION_CACHE_TTL_SECONDS: float = 300.0
+    RECOMMENDATION_CACHE_MAX_PRODUCT_IDS: int = 100000  # Least recently used users are evicted beyond this
+    
+    # Product search
+    SEARCH_FUZZY_THRESHOLD: float = 0.3  # Trigram similarity for the typo-tolerant fallback
+    SUGGEST_MAX_TRACKED_QUERIES: int = 1000  # Popular past queries kept for autocomplete
+    
     # Google OAuth
     GOOGLE_CLIENT_ID: str
     GOOGLE_CLIENT_SECRET: str
@@ -28,6 +75,10 @@ class Settings(BaseSettings):
     SMTP_PORT: int
     SMTP_USER: str
     SMTP_PASSWORD: str
+    SMTP_TIMEOUT_SECONDS: float = 30.0
+    SMTP_POOL_SIZE: int = 4  # Persistent authenticated connections
+    SMTP_POOL_NOOP_AFTER_SECONDS: float = 30.0  # Idle connections are NOOP-checked before reuse
+    SMTP_POOL_IDLE_TIMEOUT_SECONDS: float = 240.0  # Idle connections older than this are replaced
     BUSINESS_EMAIL: str
     
     # SendGrid (alternative email service)
@@ -38,6 +89,47 @@ class Settings(BaseSettings):
     # Resend
     RESEND_API_KEY: str = ""
     
+    # Email HTTP APIs (Resend, SendGrid)
+    EMAIL_HTTP_TIMEOUT_SECONDS: float = 15.0
+    EMAIL_HTTP_MAX_CONCURRENCY: int = 4  # In-flight requests per provider
+    RESEND_RATE_LIMIT_PER_SECOND: float = 2.0  # Resend's default team limit
+    SENDGRID_RATE_LIMIT_PER_SECOND: float = 10.0
+    
+    # Email provider health and circuit breaker
+    EMAIL_HEALTH_WINDOW: int = 50  # Recent attempts per provider used for success rate/latency
+    EMAIL_HEALTH_MIN_SUCCESS_RATE: float = 0.5  # Below this (over at least MIN_SAMPLES attempts) the breaker opens
+    EMAIL_HEALTH_MIN_SAMPLES: int = 10
+    EMAIL_BREAKER_FAILURE_THRESHOLD: int = 3  # Consecutive failures that open the breaker
+    EMAIL_BREAKER_OPEN_SECONDS: float = 60.0  # Then one probe send is let through
+    
+    # Email outbox worker
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5.0
+    EMAIL_OUTBOX_BATCH_SIZE: int = 20
+    EMAIL_OUTBOX_LEASE_SECONDS: int = 300  # A claimed message is retried if not settled within this time
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 6  # Then the message is marked dead
+    EMAIL_OUTBOX_RETRY_BASE_SECONDS: float = 30.0
+    EMAIL_OUTBOX_RETRY_MAX_SECONDS: float = 3600.0
+    
+    # Business order notifications: one email per order, or digests during busy periods
+    ORDER_DIGEST_ENABLED: bool = False
+    ORDER_DIGEST_WINDOW_SECONDS: float = 300.0  # A digest goes out this long after its first order...
+    ORDER_DIGEST_MAX_ORDERS: int = 20  # ...or as soon as it holds this many orders
+    ORDER_DIGEST_URGENT_MIN_TOTAL: float = 100000.0  # Orders worth at least this are always emailed on their own
+    
+    # Low stock alerts to BUSINESS_EMAIL
+    LOW_STOCK_DEFAULT_THRESHOLD: int = 5  # For products without their own low_stock_threshold
+    LOW_STOCK_ALERT_COOLDOWN_SECONDS: float = 21600.0  # At most one alert per product in this window (6 hours)
+    LOW_STOCK_CHECK_SECONDS: float = 60.0  # Pending alerts are batched into one email per check
+    
+    # Promotional email campaigns
+    CAMPAIGN_PAGE_SIZE: int = 500  # Users read per page; progress is checkpointed after each page
+    CAMPAIGN_BATCH_SIZE: int = 100  # Recipients per provider batch request
+    CAMPAIGN_MAX_CONCURRENCY: int = 4  # Batches in flight at once
+    CAMPAIGN_RATE_LIMIT_PER_SECOND: float = 50.0  # Messages per second for the whole campaign
+    CAMPAIGN_LEASE_SECONDS: int = 600  # A campaign whose worker stops checkpointing is resumed after this
+    CAMPAIGN_POLL_SECONDS: float = 30.0
+    CAMPAIGN_MAX_ATTEMPTS: int = 5  # Claims in a row without finishing a page before a campaign is marked failed
+    
     # Business
     BUSINESS_WHATSAPP: str
     BUSINESS_PHONE: str
@@ -1,5 +1,8 @@
 from supabase import create_client, Client
+from postgrest import AsyncPostgrestClient
 from app.core.config import settings
+from app.core.instrumentation import instrumentation_hooks
+import httpx
 
 
 class Database:
@@ -23,5 +26,79 @@ class Database:
         )
 
 
+class AsyncDatabase:
+    """
+    Async PostgREST clients sharing one pooled keep-alive HTTP connection pool:
+    the public client uses SUPABASE_KEY, the service client SUPABASE_SERVICE_KEY
+    """
+    _instance: AsyncPostgrestClient = None
+    _service_instance: AsyncPostgrestClient = None
+    _http_client: httpx.AsyncClient = None
+    
+    @classmethod
+    def _get_http_client(cls) -> httpx.AsyncClient:
+        if cls._http_client is None:
+            cls._http_client = httpx.AsyncClient(
+                http2=True,
+                follow_redirects=True,
+                timeout=httpx.Timeout(settings.DB_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=settings.DB_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.DB_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=settings.DB_POOL_KEEPALIVE_EXPIRY
+                ),
+                event_hooks=instrumentation_hooks()
+            )
+        return cls._http_client
+    
+    @classmethod
+    def _create_client(cls, key: str) -> AsyncPostgrestClient:
+        return AsyncPostgrestClient(
+            f"{settings.SUPABASE_URL}/rest/v1",
+            headers={
+                'apikey': key,
+                'Authorization': f"Bearer {key}",
+                'Accept': 'application/json',
+                'Content-Type': 'application/json'
+            },
+            http_client=cls._get_http_client()
+        )
+    
+    @classmethod
+    def get_client(cls) -> AsyncPostgrestClient:
+        if cls._instance is None:
+            cls._instance = cls._create_client(settings.SUPABASE_KEY)
+        return cls._instance
+    
+    @classmethod
+    def get_service_client(cls) -> AsyncPostgrestClient:
+        if cls._service_instance is None:
+            cls._service_instance = cls._create_client(settings.SUPABASE_SERVICE_KEY)
+        return cls._service_instance
+    
+    @classmethod
+    async def close(cls):
+        """Close pooled connections (called on application shutdown)"""
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+        cls._instance = None
+        cls._service_instance = None
+        cls._http_client = None
+
+
 def get_db() -> Client:
-    return Database.get_client()
\ No newline at end of file
+    return Database.get_client()
+
+
+def get_async_db() -> AsyncPostgrestClient:
+    """Get the async client - every query builder's execute() must be awaited"""
+    return AsyncDatabase.get_client()
+
+
+def get_async_service_db() -> AsyncPostgrestClient:
+    """
+    Get the async client with the service role key, which bypasses RLS.
+    Only for server-side tables that have no client policies, and the RPCs
+    whose EXECUTE is revoked from anon and authenticated.
+    """
+    return AsyncDatabase.get_service_client()
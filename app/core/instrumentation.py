@@ -0,0 +1,134 @@
+from typing import Dict, List, Optional
+from contextvars import ContextVar, Token
+from collections import Counter
+from urllib.parse import parse_qsl
+from app.core.config import settings
+import httpx
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional['RequestQueryStats']] = ContextVar('request_query_stats', default=None)
+
+# PostgREST query params that shape the response rather than filter rows
+NON_FILTER_PARAMS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+
+class RequestQueryStats:
+    """Every PostgREST round-trip made while serving one request"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries: List[dict] = []
+
+    @staticmethod
+    def start_request() -> Token:
+        return _current_stats.set(RequestQueryStats())
+
+    @staticmethod
+    def end_request(token: Token):
+        _current_stats.reset(token)
+
+    @staticmethod
+    def current() -> Optional['RequestQueryStats']:
+        return _current_stats.get()
+
+    def record(self, query: dict):
+        self.queries.append(query)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(q['duration_ms'] for q in self.queries)
+
+    def n_plus_one(self) -> Dict[str, int]:
+        """Query shapes (method, table, filter columns) repeated often enough to be an N+1"""
+        counts = Counter(q['shape'] for q in self.queries)
+        return {shape: count for shape, count in counts.items() if count >= settings.QUERY_N_PLUS_ONE_THRESHOLD}
+
+    def server_timing(self) -> str:
+        """Render a Server-Timing header value"""
+        elapsed_ms = (time.perf_counter() - self.started_at) * 1000
+        metrics = [
+            f'db;dur={self.total_ms:.1f};desc="{len(self.queries)} queries"',
+            f'app;dur={elapsed_ms:.1f}'
+        ]
+        repeated = self.n_plus_one()
+        if repeated:
+            metrics.append(f'nplus1;desc="{len(repeated)} repeated query shapes"')
+        return ', '.join(metrics)
+
+    def log(self, method: str, path: str, status_code: int):
+        """Emit one structured log line summarising the request's queries"""
+        repeated = self.n_plus_one()
+        summary = {
+            'event': 'request_queries',
+            'method': method,
+            'path': path,
+            'status': status_code,
+            'query_count': len(self.queries),
+            'db_ms': round(self.total_ms, 2),
+            'n_plus_one': [{'shape': shape, 'count': count} for shape, count in repeated.items()],
+            'queries': [
+                {k: q[k] for k in ('method', 'table', 'filters', 'rows', 'duration_ms')}
+                for q in self.queries
+            ]
+        }
+        if repeated:
+            logger.warning(json.dumps(summary))
+        else:
+            logger.info(json.dumps(summary))
+
+
+def _row_count(response: httpx.Response) -> Optional[int]:
+    """Rows returned, taken from PostgREST's Content-Range header (e.g. 0-24/*)"""
+    content_range = response.headers.get('content-range')
+    if not content_range:
+        return None
+    returned = content_range.split('/')[0]
+    if returned == '*':
+        return 0
+    try:
+        start, end = returned.split('-')
+        return int(end) - int(start) + 1
+    except ValueError:
+        return None
+
+
+async def _on_request(request: httpx.Request):
+    request.extensions['query_started_at'] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+
+    request = response.request
+    started_at = request.extensions.get('query_started_at', time.perf_counter())
+    table = request.url.path.split('/rest/v1/', 1)[-1]
+    # Only column and operator (e.g. user_id=eq): filter values carry emails, user ids and other
+    # personal data that must not end up in the logs
+    operators = sorted(
+        f"{key}={value.split('.', 1)[0]}"
+        for key, value in parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        if key not in NON_FILTER_PARAMS
+    )
+
+    stats.record({
+        'method': request.method,
+        'table': table,
+        'filters': operators,
+        'shape': f"{request.method} {table}?{'&'.join(operators)}",
+        'rows': _row_count(response),
+        'status': response.status_code,
+        'duration_ms': round((time.perf_counter() - started_at) * 1000, 2)
+    })
+
+
+def instrumentation_hooks() -> Dict[str, list]:
+    """httpx event hooks that record each PostgREST call against the current request"""
+    if not settings.QUERY_INSTRUMENTATION_ENABLED:
+        return {}
+    return {'request': [_on_request], 'response': [_on_response]}
@@ -1,13 +1,60 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.database import AsyncDatabase
+from app.core.instrumentation import RequestQueryStats
+from app.services.product_loader import ProductLoader
+from app.services.view_counter import ViewCounter
+from app.services.unique_views import UniqueViewCounter
+from app.services.email_outbox import EmailOutbox
+from app.services.order_digest import BusinessOrderDigest
+from app.services.email_campaigns import EmailCampaigns
+from app.services.stock_watcher import LowStockWatcher
+from app.services.co_purchase import CoPurchaseIndex
+from app.services.trending import TrendingCounter
+from app.services.smtp_pool import close_smtp_pool
+from app.services.email_providers import EmailHTTPClient
+from app.utils.email_templates import EmailTemplates
 from app.api.routes import auth, products, orders, cart, recommendations, admin, email_test
+from contextlib import asynccontextmanager
 from datetime import datetime
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Compile email templates up front so the first order does not pay for it
+    EmailTemplates.load()
+    ViewCounter.start()
+    UniqueViewCounter.start()
+    EmailOutbox.start()
+    BusinessOrderDigest.start()
+    EmailCampaigns.start()
+    LowStockWatcher.start()
+    CoPurchaseIndex.start()
+    TrendingCounter.start()
+    yield
+    await TrendingCounter.stop()
+    await CoPurchaseIndex.stop()
+    await EmailCampaigns.stop()
+    # Alerts go to the outbox, so they are checked before it stops
+    await LowStockWatcher.stop()
+    # Held business notifications go to the outbox before it stops
+    await BusinessOrderDigest.stop()
+    await EmailOutbox.stop()
+    await close_smtp_pool()
+    await EmailHTTPClient.close()
+    # Write out buffered product views
+    await ViewCounter.stop()
+    await UniqueViewCounter.stop()
+    # Release pooled database connections
+    await AsyncDatabase.close()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     description='E-commerce API for Crown Mega Store',
-    version='1.0.0'
+    version='1.0.0',
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -19,6 +66,33 @@ app.add_middleware(
     allow_headers=['*'],
 )
 
+@app.middleware('http')
+async def product_loader_scope(request: Request, call_next):
+    """Give each request its own batching/memoizing product loader"""
+    token = ProductLoader.start_request()
+    try:
+        return await call_next(request)
+    finally:
+        ProductLoader.end_request(token)
+
+
+@app.middleware('http')
+async def query_instrumentation(request: Request, call_next):
+    """Report the request's database round-trips via Server-Timing and a log line"""
+    if not settings.QUERY_INSTRUMENTATION_ENABLED:
+        return await call_next(request)
+    
+    token = RequestQueryStats.start_request()
+    try:
+        response = await call_next(request)
+        stats = RequestQueryStats.current()
+        response.headers['Server-Timing'] = stats.server_timing()
+        stats.log(request.method, request.url.path, response.status_code)
+        return response
+    finally:
+        RequestQueryStats.end_request(token)
+
+
 # Include router
 app.include_router(auth.router, prefix='/api/auth', tags=['Authentication'])
 app.include_router(products.router, prefix='/api/products', tags=['Products'])
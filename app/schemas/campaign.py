@@ -0,0 +1,30 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import datetime
+
+
+class PromoData(BaseModel):
+    title: Optional[str] = None
+    message: Optional[str] = None
+    promo_code: Optional[str] = None
+    discount: Optional[str] = None
+    expiry_date: Optional[str] = None
+    shop_link: Optional[str] = None
+
+
+class CampaignCreate(BaseModel):
+    subject: str = Field(..., min_length=1, max_length=200)
+    promo: PromoData = PromoData()
+
+
+class CampaignResponse(BaseModel):
+    id: str
+    subject: str
+    promo_data: dict
+    status: str
+    sent_count: int
+    failed_count: int
+    last_error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
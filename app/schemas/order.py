@@ -88,4 +88,6 @@ class OrderListResponse(BaseModel):
     orders: List[OrderResponse]
     count: int
     page: Optional[int] = None
-    total_pages: Optional[int] = None
\ No newline at end of file
+    total_pages: Optional[int] = None
+    total_count: Optional[int] = None
+    next_cursor: Optional[str] = None
\ No newline at end of file
@@ -31,6 +31,7 @@ class ProductBase(BaseModel):
     category: str
     image_url: Optional[str] = None  # Keep for backward compatibility
     stock_quantity: int = 0
+    low_stock_threshold: Optional[int] = None  # Defaults to LOW_STOCK_DEFAULT_THRESHOLD
     
 
 class ProductCreate(ProductBase):
@@ -46,6 +47,7 @@ class ProductUpdate(BaseModel):
     category: Optional[str] = None
     image_url: Optional[str] = None
     stock_quantity: Optional[int] = None
+    low_stock_threshold: Optional[int] = None
     is_featured: Optional[bool] = None
     is_new: Optional[bool] = None
     images: Optional[List[ProductImageCreate]] = None  # Update images
@@ -3,7 +3,7 @@ from google.oauth2 import id_token
 from google.auth.transport import requests
 from fastapi import HTTPException, status
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.security import create_access_token
 from datetime import datetime
 
@@ -41,18 +41,18 @@ class AuthService:
     @staticmethod
     async def get_or_create_user(user_data: dict):
         """Get existing user or create a new one"""
-        db = get_db()
+        db = get_async_db()
         
         try:
             # Check if user exists by email
-            result = db.table('users').select('*').eq('email', user_data['email']).execute()
+            result = await db.table('users').select('*').eq('email', user_data['email']).execute()
             
             if result.data and len(result.data) > 0:
                 # User exists, update their info
                 user = result.data[0]
                 
                 # Update user data
-                updated_user = db.table('users').update({
+                updated_user = await db.table('users').update({
                     'name': user_data.get('name', user['name']),
                     'avatar_url': user_data.get('avatar_url', user.get('avatar_url')),
                     'google_id': user_data.get('google_id', user.get('google_id')),
@@ -74,7 +74,7 @@ class AuthService:
                     'updated_at': datetime.utcnow().isoformat()
                 }
                 
-                new_user = db.table('users').insert(new_user_data).execute()
+                new_user = await db.table('users').insert(new_user_data).execute()
                 
                 if new_user.data and len(new_user.data) > 0:
                     return new_user.data[0]
@@ -0,0 +1,116 @@
+from typing import Dict, List, Optional
+from app.core.database import get_async_db
+from app.core.config import settings
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """Immutable view of the products and product_images tables at one point in time"""
+
+    def __init__(self, products: List[dict], images: List[dict]):
+        self.products = products
+        self.by_id: Dict[str, dict] = {str(p['id']): p for p in products}
+        self.by_category: Dict[str, List[dict]] = {}
+        for product in products:
+            self.by_category.setdefault(product.get('category'), []).append(product)
+        self.images_by_product: Dict[str, List[dict]] = {}
+        for img in sorted(images, key=lambda i: i.get('display_order') or 0):
+            self.images_by_product.setdefault(str(img['product_id']), []).append(img)
+        self.loaded_at = time.monotonic()
+
+    def with_images(self, product: dict) -> dict:
+        """Copy of a product row with its images attached, same shape as ProductService.get_products_with_images"""
+        product = dict(product)
+        product['images'] = list(self.images_by_product.get(str(product['id']), []))
+
+        # For backward compatibility: if no images but has image_url, create image entry
+        if not product['images'] and product.get('image_url'):
+            product['images'] = [{
+                'id': None,
+                'product_id': product['id'],
+                'image_url': product['image_url'],
+                'alt_text': product.get('name', ''),
+                'display_order': 0,
+                'is_primary': True,
+                'created_at': product.get('created_at'),
+                'updated_at': product.get('updated_at')
+            }]
+        return product
+
+
+class CatalogCache:
+    """
+    In-process snapshot of the catalog.
+    Expired snapshots keep being served while a single background refresh
+    runs; admin writes call invalidate() so the next read reloads.
+    Rows are shared between callers and must be treated as read-only.
+    """
+    _snapshot: Optional[CatalogSnapshot] = None
+    _generation: int = 0
+    _load_lock: Optional[asyncio.Lock] = None
+    _refresh_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def get_snapshot(cls) -> CatalogSnapshot:
+        """Get the current catalog snapshot, loading it on first use"""
+        snapshot = cls._snapshot
+        if snapshot is None:
+            return await cls._load()
+
+        if time.monotonic() - snapshot.loaded_at > settings.CATALOG_CACHE_TTL_SECONDS:
+            cls._start_background_refresh()
+        return snapshot
+
+    @classmethod
+    async def get_products(cls) -> List[dict]:
+        """Get every product row from the snapshot"""
+        return (await cls.get_snapshot()).products
+
+    @classmethod
+    def invalidate(cls):
+        """Drop the snapshot after a catalog write"""
+        cls._generation += 1
+        cls._snapshot = None
+
+    @classmethod
+    async def _load(cls) -> CatalogSnapshot:
+        # Single-flight: concurrent cold reads share one load
+        if cls._load_lock is None:
+            cls._load_lock = asyncio.Lock()
+        async with cls._load_lock:
+            if cls._snapshot is not None:
+                return cls._snapshot
+            return await cls._refresh()
+
+    @classmethod
+    async def _refresh(cls) -> CatalogSnapshot:
+        generation = cls._generation
+        db = get_async_db()
+        products_result, images_result = await asyncio.gather(
+            db.table('products').select('*').execute(),
+            db.table('product_images').select('*').execute()
+        )
+        snapshot = CatalogSnapshot(products_result.data, images_result.data)
+
+        # An invalidation while we were loading means this data may predate the write
+        if generation == cls._generation:
+            cls._snapshot = snapshot
+        return snapshot
+
+    @classmethod
+    def _start_background_refresh(cls):
+        if cls._refresh_task is not None and not cls._refresh_task.done():
+            return
+        cls._refresh_task = asyncio.get_running_loop().create_task(cls._background_refresh())
+
+    @classmethod
+    async def _background_refresh(cls):
+        try:
+            await cls._refresh()
+        except Exception as e:
+            # Keep serving the stale snapshot; the next read retries
+            logger.error(f"Catalog cache refresh failed: {str(e)}")
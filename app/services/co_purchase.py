@@ -0,0 +1,144 @@
+from typing import Dict, Iterable, List, Optional
+from array import array
+from collections import Counter, defaultdict
+from app.core.database import get_async_db
+from app.core.config import settings
+from app.services.similar_users import SimilarUsers
+from app.utils.periodic import PeriodicWorker
+import asyncio
+import heapq
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+
+class CoPurchaseMatrix:
+    """
+    Sparse item-item similarity in CSR form: the neighbours of item i are
+    indices[indptr[i]:indptr[i + 1]] with scores in the same slice of data,
+    best first. Scores are cosine similarity of co-purchase counts,
+    co(i, j) / sqrt(n(i) * n(j)), where n counts the users who bought an item;
+    only the top CO_PURCHASE_NEIGHBOURS per item are kept.
+    """
+
+    def __init__(self, item_ids: List[str], indptr: array, indices: array, data: array):
+        self.item_ids = item_ids
+        self.index: Dict[str, int] = {item_id: i for i, item_id in enumerate(item_ids)}
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @classmethod
+    def build(cls, baskets: Iterable[Iterable[str]], neighbours: int) -> 'CoPurchaseMatrix':
+        """Build from one set of purchased product ids per user"""
+        item_ids: List[str] = []
+        index: Dict[str, int] = {}
+        buyers = Counter()
+        co_counts: Dict[int, Counter] = defaultdict(Counter)
+
+        for basket in baskets:
+            items = []
+            for item_id in set(basket):
+                if item_id not in index:
+                    index[item_id] = len(item_ids)
+                    item_ids.append(item_id)
+                items.append(index[item_id])
+            for i in items:
+                buyers[i] += 1
+                row = co_counts[i]
+                for j in items:
+                    if i != j:
+                        row[j] += 1
+
+        indptr, indices, data = array('i', [0]), array('i'), array('f')
+        for i in range(len(item_ids)):
+            row = co_counts.get(i)
+            if row:
+                scored = ((count / math.sqrt(buyers[i] * buyers[j]), j) for j, count in row.items())
+                for score, j in heapq.nlargest(neighbours, scored):
+                    indices.append(j)
+                    data.append(score)
+            indptr.append(len(indices))
+        return cls(item_ids, indptr, indices, data)
+
+    def neighbours(self, item_id: str) -> List[tuple]:
+        """(product_id, score) pairs for one item, best first"""
+        i = self.index.get(item_id)
+        if i is None:
+            return []
+        start, end = self.indptr[i], self.indptr[i + 1]
+        return [(self.item_ids[j], score) for j, score in zip(self.indices[start:end], self.data[start:end])]
+
+    def scores(self, item_ids: Iterable[str], exclude_ids: set) -> Counter:
+        """Summed similarity to item_ids for every neighbouring product not in exclude_ids"""
+        scores = Counter()
+        for item_id in set(item_ids):
+            for neighbour_id, score in self.neighbours(item_id):
+                if neighbour_id not in exclude_ids:
+                    scores[neighbour_id] += score
+        return scores
+
+    def recommend(self, item_ids: Iterable[str], exclude_ids: set, limit: int) -> List[str]:
+        """Top products by summed similarity to item_ids, skipping exclude_ids"""
+        return [product_id for product_id, _ in self.scores(item_ids, exclude_ids).most_common(limit)]
+
+
+class CoPurchaseIndex:
+    """
+    Holds the current CoPurchaseMatrix and rebuilds it from purchase rows in
+    user_activities every CO_PURCHASE_REBUILD_SECONDS, so recommendation
+    requests never scan purchase history themselves. The same scan reloads
+    the SimilarUsers index.
+    """
+    _matrix: Optional[CoPurchaseMatrix] = None
+
+    @classmethod
+    def get(cls) -> Optional[CoPurchaseMatrix]:
+        """The latest matrix, or None before the first build finishes"""
+        return cls._matrix
+
+    @staticmethod
+    async def _load_baskets() -> Dict[str, set]:
+        """Purchased product ids per user, read in id-ordered pages"""
+        db = get_async_db()
+        baskets = defaultdict(set)
+        last_id = None
+        while True:
+            query = (db.table('user_activities').select('id, user_id, product_id')
+                     .eq('activity_type', 'purchase').order('id').limit(settings.CO_PURCHASE_PAGE_SIZE))
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            rows = (await query.execute()).data or []
+            for row in rows:
+                baskets[row['user_id']].add(row['product_id'])
+            if len(rows) < settings.CO_PURCHASE_PAGE_SIZE:
+                return baskets
+            last_id = rows[-1]['id']
+
+    @classmethod
+    async def rebuild(cls) -> CoPurchaseMatrix:
+        """Rebuild the matrix, and the similar-users index, from current purchase activity"""
+        baskets = await cls._load_baskets()
+        # Pair counting and MinHashing are CPU-bound; keep them off the event loop
+        matrix = await asyncio.to_thread(CoPurchaseMatrix.build, baskets.values(), settings.CO_PURCHASE_NEIGHBOURS)
+        cls._matrix = matrix
+        SimilarUsers.replace(await asyncio.to_thread(SimilarUsers.build, baskets))
+        logger.info(f"Co-purchase matrix rebuilt: {len(matrix.item_ids)} products, {len(matrix.indices)} neighbour links from {len(baskets)} users")
+        return matrix
+
+    @classmethod
+    def start(cls):
+        """Build now and then periodically (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        await cls._worker.stop()
+
+    # Until a rebuild succeeds the previous matrix keeps being served
+    _worker = PeriodicWorker(
+        'Co-purchase matrix rebuild',
+        lambda: CoPurchaseIndex.rebuild(),
+        lambda: settings.CO_PURCHASE_REBUILD_SECONDS
+    )
@@ -0,0 +1,166 @@
+from typing import List, Optional
+from datetime import datetime, timedelta
+from app.core.database import get_async_db, get_async_service_db
+from app.core.config import settings
+from app.services.email_service import EmailService
+from app.services.email_providers import EmailProviderError, RateLimiter
+from app.utils.email_templates import EmailTemplates
+from app.utils.periodic import PeriodicWorker
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmailCampaigns:
+    """
+    Admin-triggered promotional campaigns (see sql/create_email_campaigns_table.sql).
+    create() only inserts a row; a background worker claims it, renders the
+    promotional template once and streams customers from the users table in
+    id-ordered pages of CAMPAIGN_PAGE_SIZE. Each page goes out as provider
+    batch requests, CAMPAIGN_MAX_CONCURRENCY at a time and at most
+    CAMPAIGN_RATE_LIMIT_PER_SECOND messages per second, after which the last
+    user id is checkpointed. A restart resumes after the last finished page,
+    so at most one page is sent twice. A campaign claimed CAMPAIGN_MAX_ATTEMPTS
+    times in a row without finishing a page is marked failed. The table is
+    reached with the service key only; recipients are read with the public one.
+    """
+
+    @classmethod
+    async def create(cls, subject: str, promo_data: dict, created_by: Optional[str] = None) -> dict:
+        """Queue a campaign; the worker starts sending it shortly"""
+        db = get_async_service_db()
+        result = await db.table('email_campaigns').insert({
+            'subject': subject,
+            'promo_data': promo_data,
+            'status': 'pending',
+            'created_by': created_by
+        }).execute()
+
+        cls._worker.wake()
+        return result.data[0]
+
+    @staticmethod
+    async def get(campaign_id: str) -> Optional[dict]:
+        db = get_async_service_db()
+        result = await db.table('email_campaigns').select('*').eq('id', campaign_id).execute()
+        return result.data[0] if result.data else None
+
+    @staticmethod
+    async def cancel(campaign_id: str) -> Optional[dict]:
+        """Stop a pending or running campaign; a running one stops at its next checkpoint"""
+        db = get_async_service_db()
+        result = await db.table('email_campaigns').update({
+            'status': 'cancelled',
+            'updated_at': datetime.utcnow().isoformat()
+        }).eq('id', campaign_id).in_('status', ['pending', 'running']).execute()
+        return result.data[0] if result.data else None
+
+    @staticmethod
+    async def _recipients(after_user_id: Optional[str]) -> List[dict]:
+        """Next page of customers, in id order, after the checkpoint"""
+        db = get_async_db()
+        query = db.table('users').select('id, email').eq('role', 'customer').order('id').limit(settings.CAMPAIGN_PAGE_SIZE)
+        if after_user_id:
+            query = query.gt('id', after_user_id)
+        result = await query.execute()
+        return result.data or []
+
+    @staticmethod
+    async def _checkpoint(campaign_id: str, update: dict) -> bool:
+        """Save progress and extend the lease; False if the campaign was cancelled meanwhile"""
+        db = get_async_service_db()
+        now = datetime.utcnow()
+        update.setdefault('lease_expires_at', (now + timedelta(seconds=settings.CAMPAIGN_LEASE_SECONDS)).isoformat())
+        update['updated_at'] = now.isoformat()
+        result = await db.table('email_campaigns').update(update).eq('id', campaign_id).eq('status', 'running').execute()
+        return bool(result.data)
+
+    @classmethod
+    async def send(cls, campaign: dict) -> dict:
+        """Send a claimed campaign from its checkpoint to the last customer"""
+        rendered = EmailTemplates.render('promotional.html', data=campaign.get('promo_data') or {})
+        limiter = RateLimiter(settings.CAMPAIGN_RATE_LIMIT_PER_SECOND)
+        slots = asyncio.Semaphore(settings.CAMPAIGN_MAX_CONCURRENCY)
+        cursor = campaign.get('last_user_id')
+        sent, failed = campaign.get('sent_count', 0), campaign.get('failed_count', 0)
+
+        async def send_batch(recipients: List[str]) -> int:
+            async with slots:
+                await limiter.acquire(len(recipients))
+                undelivered = await EmailService.send_bulk_email(recipients, campaign['subject'], rendered.html, rendered.text)
+                return len(undelivered)
+
+        while True:
+            users = await cls._recipients(cursor)
+            if not users:
+                await cls._checkpoint(campaign['id'], {
+                    'status': 'completed',
+                    'completed_at': datetime.utcnow().isoformat(),
+                    'lease_expires_at': None
+                })
+                logger.info(f"Campaign {campaign['id']} completed: {sent} sent, {failed} failed")
+                return {'sent_count': sent, 'failed_count': failed}
+
+            emails = [user['email'] for user in users if user.get('email')]
+            batches = [emails[i:i + settings.CAMPAIGN_BATCH_SIZE] for i in range(0, len(emails), settings.CAMPAIGN_BATCH_SIZE)]
+            undelivered = sum(await asyncio.gather(*(send_batch(batch) for batch in batches)))
+            if emails and undelivered == len(emails):
+                # Every provider is down: keep the checkpoint and retry the page once the lease runs out
+                raise EmailProviderError(f"No provider accepted any of {len(emails)} messages")
+
+            failed += undelivered
+            sent += len(emails) - undelivered
+            cursor = users[-1]['id']
+            # Progress: a later failure starts counting attempts again
+            campaign['attempts'] = 0
+            if not await cls._checkpoint(campaign['id'], {'last_user_id': cursor, 'sent_count': sent, 'failed_count': failed, 'attempts': 0}):
+                logger.info(f"Campaign {campaign['id']} stopped after {sent} sent (cancelled)")
+                return {'sent_count': sent, 'failed_count': failed}
+
+    @classmethod
+    async def process_next(cls) -> bool:
+        """Claim and send one runnable campaign; returns whether there was one"""
+        db = get_async_service_db()
+        result = await db.rpc('claim_email_campaign', {
+            'p_lease_seconds': settings.CAMPAIGN_LEASE_SECONDS,
+            'p_max_attempts': settings.CAMPAIGN_MAX_ATTEMPTS
+        }).execute()
+        if not result.data:
+            return False
+
+        campaign = result.data[0]
+        logger.info(f"Sending campaign {campaign['id']} '{campaign['subject']}' from user {campaign.get('last_user_id') or 'start'}")
+        try:
+            await cls.send(campaign)
+        except asyncio.CancelledError:
+            # Shutting down: hand the campaign back so the next start resumes it right away,
+            # without counting this claim as an attempt
+            await cls._checkpoint(campaign['id'], {'lease_expires_at': None, 'attempts': max(campaign['attempts'] - 1, 0)})
+            raise
+        except Exception as e:
+            if campaign['attempts'] >= settings.CAMPAIGN_MAX_ATTEMPTS:
+                logger.error(f"Campaign {campaign['id']} failed after {campaign['attempts']} attempts: {str(e)}")
+                await cls._checkpoint(campaign['id'], {'status': 'failed', 'last_error': str(e), 'lease_expires_at': None})
+            else:
+                # The lease runs out and the campaign is resumed from its checkpoint
+                logger.error(f"Campaign {campaign['id']} interrupted (attempt {campaign['attempts']}), will resume: {str(e)}")
+                await db.table('email_campaigns').update({'last_error': str(e)}).eq('id', campaign['id']).execute()
+        return True
+
+    @classmethod
+    def start(cls):
+        """Start the campaign worker (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        """Stop the worker; a campaign in progress resumes from its checkpoint on the next start"""
+        await cls._worker.stop()
+
+    # After a campaign, look for the next one straight away
+    _worker = PeriodicWorker(
+        'Email campaign poll',
+        lambda: EmailCampaigns.process_next(),
+        lambda: settings.CAMPAIGN_POLL_SECONDS
+    )
@@ -0,0 +1,128 @@
+from typing import Dict, List
+from collections import deque
+from app.core.config import settings
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class ProviderHealth:
+    """
+    Rolling success rate and latency for one email provider, plus a circuit
+    breaker: after EMAIL_BREAKER_FAILURE_THRESHOLD consecutive failures, or
+    when the rolling success rate drops below EMAIL_HEALTH_MIN_SUCCESS_RATE,
+    the provider is skipped for EMAIL_BREAKER_OPEN_SECONDS. Then a single
+    send is let through as a probe; it closes the breaker on success and
+    re-opens it on failure.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.outcomes: deque = deque(maxlen=settings.EMAIL_HEALTH_WINDOW)
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.probing = False
+
+    def record(self, success: bool, latency: float):
+        """Record the outcome of one send attempt"""
+        self.outcomes.append((success, latency))
+        self.probing = False
+        if success:
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            return
+        self.consecutive_failures += 1
+        failing_often = (
+            len(self.outcomes) >= settings.EMAIL_HEALTH_MIN_SAMPLES
+            and self.success_rate < settings.EMAIL_HEALTH_MIN_SUCCESS_RATE
+        )
+        if self.state == HALF_OPEN or failing_often or self.consecutive_failures >= settings.EMAIL_BREAKER_FAILURE_THRESHOLD:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def _refresh(self):
+        if self.state == OPEN and time.monotonic() - self.opened_at >= settings.EMAIL_BREAKER_OPEN_SECONDS:
+            self.state = HALF_OPEN
+
+    def ready(self) -> bool:
+        """Whether a send may be attempted now; claims nothing"""
+        self._refresh()
+        return self.state == CLOSED or (self.state == HALF_OPEN and not self.probing)
+
+    def claim(self) -> bool:
+        """
+        Call right before actually sending through this provider: takes the
+        probe slot when half-open, and is False if another send holds it.
+        Claiming only what is attempted keeps an unused probe from blocking
+        the provider forever.
+        """
+        self._refresh()
+        if self.state == HALF_OPEN:
+            if self.probing:
+                return False
+            self.probing = True
+        return True
+
+    @property
+    def success_rate(self) -> float:
+        if not self.outcomes:
+            return 1.0
+        return sum(1 for success, _ in self.outcomes if success) / len(self.outcomes)
+
+    @property
+    def avg_latency(self) -> float:
+        latencies = [latency for success, latency in self.outcomes if success]
+        return sum(latencies) / len(latencies) if latencies else 0.0
+
+    @property
+    def score(self) -> float:
+        """Higher is better: success rate discounted by latency (a 5s average halves the score)"""
+        return self.success_rate / (1 + self.avg_latency / 5.0)
+
+    def to_dict(self) -> dict:
+        return {
+            'state': self.state,
+            'success_rate': round(self.success_rate, 3),
+            'avg_latency_ms': round(self.avg_latency * 1000, 1),
+            'score': round(self.score, 3),
+            'consecutive_failures': self.consecutive_failures,
+            'samples': len(self.outcomes)
+        }
+
+
+class EmailProviderHealth:
+    """Health of every email provider in this process"""
+    _providers: Dict[str, ProviderHealth] = {}
+
+    @classmethod
+    def get(cls, name: str) -> ProviderHealth:
+        if name not in cls._providers:
+            cls._providers[name] = ProviderHealth(name)
+        return cls._providers[name]
+
+    @classmethod
+    def order(cls, names: List[str]) -> List[str]:
+        """
+        Providers to try, in order. names is the configured preference order:
+        providers with open breakers are left out, a half-open provider's
+        probe goes first, the preferred provider comes next and the remaining
+        fallbacks follow best score first. If every breaker is open, all are
+        returned as a last resort rather than dropping the message.
+        Nothing is claimed here; callers claim() each provider as they try it.
+        """
+        available = [name for name in names if cls.get(name).ready()]
+        if not available:
+            return list(names)
+        # Probes go first so a recovered provider is noticed quickly
+        probes = [name for name in available if cls.get(name).state == HALF_OPEN]
+        rest = [name for name in available if name not in probes]
+        fallbacks = sorted(rest[1:], key=lambda name: -cls.get(name).score)
+        return probes + rest[:1] + fallbacks
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, dict]:
+        """Per-provider health, for debugging and monitoring"""
+        return {name: health.to_dict() for name, health in cls._providers.items()}
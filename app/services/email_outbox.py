@@ -0,0 +1,123 @@
+from typing import List, Optional, Tuple
+from app.core.database import get_async_service_db
+from app.core.config import settings
+from app.services.email_service import EmailService
+from app.utils.periodic import PeriodicWorker
+from datetime import datetime, timedelta
+import asyncio
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+
+class EmailOutbox:
+    """
+    Durable queue for transactional email (sql/create_email_outbox_table.sql).
+    Requests call enqueue(), which is one INSERT (checkout passes rows() to
+    create_checkout_order instead, so they commit with the order); the table
+    is reached with the service key only. A background worker claims
+    due rows, sends them through EmailService.send_email and retries failures
+    with exponential backoff until max_attempts, after which the row is left
+    in the 'dead' state for inspection.
+    """
+
+    @staticmethod
+    def rows(messages: List[Tuple[str, str, str, Optional[str]]]) -> List[dict]:
+        """email_outbox rows for (to_email, subject, html_content, text_content) messages"""
+        return [{
+            'to_email': to_email,
+            'subject': subject,
+            'html_content': html_content,
+            'text_content': text_content,
+            'status': 'pending',
+            'max_attempts': settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        } for to_email, subject, html_content, text_content in messages]
+
+    @classmethod
+    async def enqueue(cls, messages: List[Tuple[str, str, str, Optional[str]]]) -> List[dict]:
+        """Queue (to_email, subject, html_content, text_content) messages for delivery"""
+        if not messages:
+            return []
+        db = get_async_service_db()
+        result = await db.table('email_outbox').insert(cls.rows(messages)).execute()
+        cls.wake()
+        return result.data
+
+    @classmethod
+    def wake(cls):
+        """Let this process's worker pick new rows up now instead of at the next poll"""
+        cls._worker.wake()
+
+    @classmethod
+    async def process_due(cls) -> int:
+        """Claim and send one batch of due messages; returns how many were claimed"""
+        db = get_async_service_db()
+        result = await db.rpc('claim_email_outbox', {
+            'p_limit': settings.EMAIL_OUTBOX_BATCH_SIZE,
+            'p_lease_seconds': settings.EMAIL_OUTBOX_LEASE_SECONDS
+        }).execute()
+        messages = result.data or []
+        if messages:
+            await asyncio.gather(*(cls._deliver(message) for message in messages))
+        return len(messages)
+
+    @staticmethod
+    def retry_delay(attempts: int) -> float:
+        """Exponential backoff with jitter: base * 2^(attempts - 1), capped"""
+        delay = min(
+            settings.EMAIL_OUTBOX_RETRY_BASE_SECONDS * (2 ** (attempts - 1)),
+            settings.EMAIL_OUTBOX_RETRY_MAX_SECONDS
+        )
+        return delay * random.uniform(0.8, 1.2)
+
+    @classmethod
+    async def _deliver(cls, message: dict):
+        db = get_async_service_db()
+        try:
+            sent = await EmailService.send_email(
+                message['to_email'], message['subject'], message['html_content'], message.get('text_content')
+            )
+            error = None if sent else 'All email providers failed'
+        except Exception as e:
+            sent, error = False, str(e)
+
+        now = datetime.utcnow()
+        if sent:
+            update = {'status': 'sent', 'sent_at': now.isoformat(), 'last_error': None}
+            logger.info(f"Outbox email {message['id']} sent to {message['to_email']}")
+        elif message['attempts'] >= message['max_attempts']:
+            update = {'status': 'dead', 'last_error': error}
+            logger.error(f"Outbox email {message['id']} to {message['to_email']} dead after {message['attempts']} attempts: {error}")
+        else:
+            retry_at = now + timedelta(seconds=cls.retry_delay(message['attempts']))
+            update = {'status': 'pending', 'next_attempt_at': retry_at.isoformat(), 'last_error': error}
+            logger.warning(f"Outbox email {message['id']} failed (attempt {message['attempts']}), retrying at {retry_at.isoformat()}: {error}")
+
+        update['updated_at'] = now.isoformat()
+        try:
+            await db.table('email_outbox').update(update).eq('id', message['id']).execute()
+        except Exception as e:
+            # The lease expires and the row is claimed again, so at worst the message is resent
+            logger.error(f"Failed to record outbox result for {message['id']}: {str(e)}")
+
+    @classmethod
+    def start(cls):
+        """Start the outbox worker (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        """Stop the worker; unsent rows stay in the table for the next start"""
+        await cls._worker.stop()
+
+    @classmethod
+    async def _drain(cls) -> bool:
+        # A full batch means more may be due: go again straight away
+        return await cls.process_due() >= settings.EMAIL_OUTBOX_BATCH_SIZE
+
+    _worker = PeriodicWorker(
+        'Email outbox poll',
+        lambda: EmailOutbox._drain(),
+        lambda: settings.EMAIL_OUTBOX_POLL_SECONDS
+    )
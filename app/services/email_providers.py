@@ -0,0 +1,198 @@
+from typing import List, Optional
+from app.core.config import settings
+import asyncio
+import httpx
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class EmailProviderError(Exception):
+    """An email API rejected a request or could not be reached"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int = 1):
+        """Wait until `tokens` requests (or messages) may be made"""
+        async with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Take the tokens now and wait out any shortfall, so a batch larger
+            # than the burst still goes through at the average rate
+            self._tokens -= tokens
+            if self._tokens < 0:
+                await asyncio.sleep(-self._tokens / self.rate)
+
+
+class EmailHTTPClient:
+    """One keep-alive HTTP connection pool shared by every email API provider"""
+    _http_client: httpx.AsyncClient = None
+
+    @classmethod
+    def get_client(cls) -> httpx.AsyncClient:
+        if cls._http_client is None:
+            cls._http_client = httpx.AsyncClient(
+                http2=True,
+                timeout=httpx.Timeout(settings.EMAIL_HTTP_TIMEOUT_SECONDS),
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60)
+            )
+        return cls._http_client
+
+    @classmethod
+    async def close(cls):
+        """Close pooled connections (called on application shutdown)"""
+        if cls._http_client is not None:
+            await cls._http_client.aclose()
+        cls._http_client = None
+
+
+class HTTPEmailProvider:
+    """
+    Async client for an HTTP email API. Requests go through the shared
+    connection pool, at most max_concurrency at a time and no faster than
+    rate_per_second, so an order burst queues here instead of tripping the
+    provider's rate limit.
+    """
+    name = 'http'
+    url = ''
+    batch_url = ''
+    max_batch_size = 1
+
+    def __init__(self, api_key: str, rate_per_second: float, max_concurrency: int):
+        self.api_key = api_key
+        self._limiter = RateLimiter(rate_per_second)
+        self._slots = asyncio.Semaphore(max_concurrency)
+
+    def _payload(self, to_email: str, subject: str, html_content: str, plain_text: str) -> dict:
+        raise NotImplementedError
+
+    def _batch_payload(self, recipients: List[str], subject: str, html_content: str, plain_text: str):
+        raise NotImplementedError
+
+    async def _post(self, url: str, payload) -> dict:
+        async with self._slots:
+            await self._limiter.acquire()
+            try:
+                response = await EmailHTTPClient.get_client().post(
+                    url,
+                    json=payload,
+                    headers={'Authorization': f"Bearer {self.api_key}"}
+                )
+            except httpx.HTTPError as e:
+                raise EmailProviderError(f"{self.name} request failed: {str(e)}")
+
+        if response.status_code < 200 or response.status_code >= 300:
+            raise EmailProviderError(f"{self.name} API error: {response.status_code} - {response.text}", response.status_code)
+        return response.json() if response.content else {}
+
+    async def send_email(self, to_email: str, subject: str, html_content: str, plain_text: str) -> dict:
+        """Send one email; returns the provider's response body"""
+        return await self._post(self.url, self._payload(to_email, subject, html_content, plain_text))
+
+    async def send_batch(self, recipients: List[str], subject: str, html_content: str, plain_text: str) -> dict:
+        """
+        Send the same email to up to max_batch_size recipients in one request.
+        Each recipient gets their own copy; nobody sees the other addresses.
+        """
+        if len(recipients) > self.max_batch_size:
+            raise ValueError(f"{self.name} batches hold at most {self.max_batch_size} recipients")
+        return await self._post(self.batch_url, self._batch_payload(recipients, subject, html_content, plain_text))
+
+
+class ResendProvider(HTTPEmailProvider):
+    name = 'Resend'
+    url = 'https://api.resend.com/emails'
+    batch_url = 'https://api.resend.com/emails/batch'
+    max_batch_size = 100
+
+    def _payload(self, to_email: str, subject: str, html_content: str, plain_text: str) -> dict:
+        # For sandbox/testing without verified domain, use onboarding@resend.dev
+        # For production with verified domain, use your domain email
+        return {
+            'from': "Crown Mega Store <onboarding@resend.dev>",
+            'to': [to_email],
+            'subject': subject,
+            'html': html_content,
+            'text': plain_text
+        }
+
+    def _batch_payload(self, recipients: List[str], subject: str, html_content: str, plain_text: str) -> list:
+        return [self._payload(to_email, subject, html_content, plain_text) for to_email in recipients]
+
+
+class SendGridProvider(HTTPEmailProvider):
+    name = 'SendGrid'
+    url = 'https://api.sendgrid.com/v3/mail/send'
+    batch_url = url
+    max_batch_size = 1000
+
+    def _payload(self, to_email: str, subject: str, html_content: str, plain_text: str) -> dict:
+        return {
+            'personalizations': [{'to': [{'email': to_email}]}],
+            'from': {'email': settings.FROM_EMAIL, 'name': "Crown Mega Store"},
+            # Reply-to for better sender reputation
+            'reply_to': {'email': settings.BUSINESS_EMAIL},
+            'subject': subject,
+            'content': [
+                {'type': 'text/plain', 'value': plain_text},
+                {'type': 'text/html', 'value': html_content}
+            ],
+            # Tracking settings (helps with deliverability)
+            'tracking_settings': {
+                'click_tracking': {'enable': True, 'enable_text': False},
+                'open_tracking': {'enable': True},
+                'subscription_tracking': {'enable': False},
+                'ganalytics': {'enable': False}
+            },
+            'mail_settings': {
+                'footer': {'enable': False},
+                'sandbox_mode': {'enable': False}
+            }
+        }
+
+    def _batch_payload(self, recipients: List[str], subject: str, html_content: str, plain_text: str) -> dict:
+        # One personalization per recipient: separate messages from a single request
+        payload = self._payload(recipients[0], subject, html_content, plain_text)
+        payload['personalizations'] = [{'to': [{'email': to_email}]} for to_email in recipients]
+        return payload
+
+
+_resend: Optional[ResendProvider] = None
+_sendgrid: Optional[SendGridProvider] = None
+
+
+def get_resend_provider() -> ResendProvider:
+    global _resend
+    if _resend is None:
+        _resend = ResendProvider(
+            settings.RESEND_API_KEY,
+            settings.RESEND_RATE_LIMIT_PER_SECOND,
+            settings.EMAIL_HTTP_MAX_CONCURRENCY
+        )
+    return _resend
+
+
+def get_sendgrid_provider() -> SendGridProvider:
+    global _sendgrid
+    if _sendgrid is None:
+        _sendgrid = SendGridProvider(
+            settings.SENDGRID_API_KEY,
+            settings.SENDGRID_RATE_LIMIT_PER_SECOND,
+            settings.EMAIL_HTTP_MAX_CONCURRENCY
+        )
+    return _sendgrid
@@ -2,34 +2,58 @@ import aiosmtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.core.config import settings
-from typing import Optional
-import logging
+from app.services.smtp_pool import get_smtp_pool
+from app.services.email_providers import get_resend_provider, get_sendgrid_provider
+from app.services.email_health import EmailProviderHealth
+from app.utils.email_templates import EmailTemplates, RenderedEmail, html_to_text
+from typing import List, Optional, Tuple
 import asyncio
-
-# SendGrid imports
-try:
-    from sendgrid import SendGridAPIClient
-    from sendgrid.helpers.mail import Mail
-    SENDGRID_AVAILABLE = True
-except ImportError:
-    SENDGRID_AVAILABLE = False
-
-# Resend imports
-try:
-    import resend
-    RESEND_AVAILABLE = True
-except ImportError:
-    RESEND_AVAILABLE = False
+import logging
+import time
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+STATUS_MESSAGES = {
+    'confirmed': {
+        'title': 'Order Confirmed',
+        'message': "Great news! We have confirmed your order and will send payment details shortly.",
+        'color': '#27ae60'
+    },
+    'payment_received': {
+        'title': 'Payment Received',
+        'message': "We have received your payment! Your order is now being processed.",
+        'color': '#2c5aa0'
+    },
+    'processing': {
+        'title': 'Order Processing',
+        'message': "Your order is being prepared for delivery.",
+        'color': '#f39c12'
+    },
+    'shipped': {
+        'title': 'Order Shipped',
+        'message': "Your order has been shipped and is on its way to you!",
+        'color': '#e67e22'
+    },
+    'delivered': {
+        'title': 'Order Delivered',
+        'message': "Your order has been delivered successfully! Thank you for shopping with us.",
+        'color': '#27ae60'
+    },
+    'cancelled': {
+        'title': 'Order Cancelled',
+        'message': "Your order has been cancelled as requested.",
+        'color': '#e74c3c'
+    }
+}
+
+
 class EmailService:
     
     @staticmethod
-    async def send_email_via_smtp(to_email: str, subject: str, html_content: str):
+    async def send_email_via_smtp(to_email: str, subject: str, html_content: str, text_content: Optional[str] = None):
         """Send email via SMTP (Gmail) with anti-spam headers"""
         try:
             logger.info(f"Sending email via SMTP to {to_email}")
@@ -52,11 +76,8 @@ class EmailService:
             message['Importance'] = 'Normal'
             message['Content-Type'] = 'multipart/alternative'
             
-            # Add plain text version for better deliverability
-            from html import escape
-            import re
-            plain_text = re.sub('<[^<]+?>', '', html_content)
-            plain_text = re.sub(r'\s+', ' ', plain_text).strip()
+            # Add plain text version for better deliverability (templates supply it precomputed)
+            plain_text = text_content or html_to_text(html_content)
             
             text_part = MIMEText(plain_text, 'plain', 'utf-8')
             html_part = MIMEText(html_content, 'html', 'utf-8')
@@ -64,17 +85,10 @@ class EmailService:
             message.attach(text_part)
             message.attach(html_part)
             
-            logger.info(f"Connecting to SMTP server: {settings.SMTP_HOST}:{settings.SMTP_PORT}")
+            logger.info(f"Sending via SMTP server: {settings.SMTP_HOST}:{settings.SMTP_PORT}")
             
-            await aiosmtplib.send(
-                message,
-                hostname=settings.SMTP_HOST,
-                port=settings.SMTP_PORT,
-                username=settings.SMTP_USER,
-                password=settings.SMTP_PASSWORD,
-                start_tls=True,
-                timeout=30
-            )
+            # Reuses an authenticated connection from the pool when one is idle
+            await get_smtp_pool().send(message)
             
             logger.info(f"SMTP email successfully sent to {to_email}")
             return True
@@ -93,106 +107,43 @@ class EmailService:
             return False
 
     @staticmethod
-    async def send_email_via_sendgrid(to_email: str, subject: str, html_content: str):
+    async def send_email_via_sendgrid(to_email: str, subject: str, html_content: str, text_content: Optional[str] = None):
         """Send email via SendGrid API with improved deliverability"""
         try:
-            if not SENDGRID_AVAILABLE:
-                logger.error("SendGrid package not installed")
-                return False
-                
             if not settings.SENDGRID_API_KEY:
                 logger.error("SendGrid API key not configured")
                 return False
             
             logger.info(f"Sending email via SendGrid to {to_email}")
             
-            # Create plain text version
-            import re
-            plain_text = re.sub('<[^<]+?>', '', html_content)
-            plain_text = re.sub(r'\s+', ' ', plain_text).strip()
-            
-            # Create SendGrid message with enhanced deliverability settings
-            message = Mail(
-                from_email=(settings.FROM_EMAIL, "Crown Mega Store"),
-                to_emails=to_email,
-                subject=subject,
-                html_content=html_content,
-                plain_text_content=plain_text
-            )
-            
-            # Add reply-to for better sender reputation
-            message.reply_to = settings.BUSINESS_EMAIL
-            
-            # Add tracking settings (helps with deliverability)
-            message.tracking_settings = {
-                "click_tracking": {"enable": True, "enable_text": False},
-                "open_tracking": {"enable": True},
-                "subscription_tracking": {"enable": False},
-                "ganalytics": {"enable": False}
-            }
+            # Create plain text version (templates supply it precomputed)
+            plain_text = text_content or html_to_text(html_content)
             
-            # Add mail settings
-            message.mail_settings = {
-                "footer": {"enable": False},
-                "sandbox_mode": {"enable": False}
-            }
+            # Native async client: shared keep-alive connections, rate limited
+            await get_sendgrid_provider().send_email(to_email, subject, html_content, plain_text)
             
-            # Send email
-            sg = SendGridAPIClient(api_key=settings.SENDGRID_API_KEY)
-            
-            # Run in executor to make it async
-            def send_sync():
-                return sg.send(message)
-            
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, send_sync)
-            
-            if response.status_code >= 200 and response.status_code < 300:
-                logger.info(f"SendGrid email successfully sent to {to_email}")
-                return True
-            else:
-                logger.error(f"SendGrid API error: {response.status_code} - {response.body}")
-                return False
+            logger.info(f"SendGrid email successfully sent to {to_email}")
+            return True
                 
         except Exception as e:
             logger.error(f"SendGrid email failed: {str(e)}")
             return False
 
     @staticmethod
-    async def send_email_via_resend(to_email: str, subject: str, html_content: str):
+    async def send_email_via_resend(to_email: str, subject: str, html_content: str, text_content: Optional[str] = None):
         """Send email via Resend API"""
         try:
-            if not RESEND_AVAILABLE:
-                logger.error("Resend package not installed")
-                return False
-                
             if not settings.RESEND_API_KEY:
                 logger.error("Resend API key not configured")
                 return False
             
             logger.info(f"Sending email via Resend to {to_email}")
             
-            # Set API key
-            resend.api_key = settings.RESEND_API_KEY
-            
-            # For sandbox/testing without verified domain, use onboarding@resend.dev
-            # For production with verified domain, use your domain email
-            from_email = "Crown Mega Store <onboarding@resend.dev>"
-            
-            # Create email params
-            params = {
-                "from": from_email,
-                "to": [to_email],
-                "subject": subject,
-                "html": html_content,
-            }
-            
-            # Send email (Resend SDK is sync, so wrap in executor)
-            def send_sync():
-                return resend.Emails.send(params)
+            # Create plain text version (templates supply it precomputed)
+            plain_text = text_content or html_to_text(html_content)
             
-            loop = asyncio.get_event_loop()
-            response = await loop.run_in_executor(None, send_sync)
+            # Native async client: shared keep-alive connections, rate limited
+            response = await get_resend_provider().send_email(to_email, subject, html_content, plain_text)
             
             logger.info(f"Resend email successfully sent to {to_email}. ID: {response.get('id', 'N/A')}")
             return True
@@ -202,405 +153,172 @@ class EmailService:
             return False
 
     @staticmethod
-    async def send_email(to_email: str, subject: str, html_content: str):
-        """Send email using configured provider with fallback"""
-        logger.info(f"Attempting to send email to {to_email} with provider: {settings.EMAIL_PROVIDER}")
+    def _provider_preference() -> List[str]:
+        """Configured provider first, then the other configured ones as fallbacks"""
+        configured = ['smtp']
+        if settings.RESEND_API_KEY:
+            configured.append('resend')
+        if settings.SENDGRID_API_KEY:
+            configured.append('sendgrid')
         
-        # Try primary provider
-        if settings.EMAIL_PROVIDER.lower() == "resend":
-            success = await EmailService.send_email_via_resend(to_email, subject, html_content)
-            if success:
-                return True
-            logger.warning("Resend failed, trying SMTP fallback...")
-            return await EmailService.send_email_via_smtp(to_email, subject, html_content)
-        elif settings.EMAIL_PROVIDER.lower() == "sendgrid":
-            success = await EmailService.send_email_via_sendgrid(to_email, subject, html_content)
-            if success:
-                return True
-            logger.warning("SendGrid failed, trying SMTP fallback...")
-            return await EmailService.send_email_via_smtp(to_email, subject, html_content)
-        else:
-            # Default to SMTP with fallbacks
-            success = await EmailService.send_email_via_smtp(to_email, subject, html_content)
+        primary = settings.EMAIL_PROVIDER.lower()
+        if primary in configured:
+            configured.remove(primary)
+            configured.insert(0, primary)
+        return configured
+
+    @staticmethod
+    async def send_email(to_email: str, subject: str, html_content: str, text_content: Optional[str] = None):
+        """
+        Send email with failover. Providers are tried in configured order,
+        except that ones with an open circuit breaker are skipped and
+        unhealthy ones demoted (see EmailProviderHealth).
+        """
+        senders = {
+            'smtp': EmailService.send_email_via_smtp,
+            'resend': EmailService.send_email_via_resend,
+            'sendgrid': EmailService.send_email_via_sendgrid
+        }
+        providers = EmailProviderHealth.order(EmailService._provider_preference())
+        logger.info(f"Attempting to send email to {to_email} via {', '.join(providers)}")
+        
+        for provider in providers:
+            health = EmailProviderHealth.get(provider)
+            if not health.claim():
+                continue  # Another send is probing this provider
+            started = time.monotonic()
+            success = False
+            try:
+                success = await senders[provider](to_email, subject, html_content, text_content)
+            finally:
+                health.record(success, time.monotonic() - started)
+            
             if success:
                 return True
-            
-            # Try Resend fallback first
-            if RESEND_AVAILABLE and settings.RESEND_API_KEY:
-                logger.warning("SMTP failed, trying Resend fallback...")
-                success = await EmailService.send_email_via_resend(to_email, subject, html_content)
-                if success:
-                    return True
-            
-            # Fallback to SendGrid if available
-            if SENDGRID_AVAILABLE and settings.SENDGRID_API_KEY:
-                logger.warning("SMTP and Resend failed, trying SendGrid fallback...")
-                return await EmailService.send_email_via_sendgrid(to_email, subject, html_content)
-            
-            logger.error("All email providers failed or unavailable")
-            return False
+            logger.warning(f"{provider} failed for {to_email} (breaker {health.state}), trying next provider...")
+        
+        logger.error("All email providers failed or unavailable")
+        return False
         
     @staticmethod
-    def format_order_email_business(order_data: dict) -> str:
-        """Format HTML email for business owner"""
-        items_html = ''
-        for item in order_data['items']:
-            subtotal = float(item['price']) * item['quantity']
-            items_html += f"""
-                <tr>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; font-size: 14px;">{item['product_name']}</td>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: center; font-size: 14px;">{item['quantity']}</td>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-size: 14px;">NGN {float(item['price']):.2f}</td>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; font-size: 14px;">NGN {subtotal:.2f}</td>
-                </tr>"""
+    async def send_bulk_email(recipients: List[str], subject: str, html_content: str, text_content: Optional[str] = None) -> List[str]:
+        """
+        Send the same email to many recipients; returns the ones that could not
+        be reached. HTTP providers get one batch API request per chunk of up to
+        max_batch_size recipients; SMTP sends each message over the pool.
+        Failover and health tracking work as in send_email, per request.
+        """
+        plain_text = text_content or html_to_text(html_content)
+        batch_providers = {}
+        if settings.RESEND_API_KEY:
+            batch_providers['resend'] = get_resend_provider()
+        if settings.SENDGRID_API_KEY:
+            batch_providers['sendgrid'] = get_sendgrid_provider()
+        
+        remaining = list(recipients)
+        for provider in EmailProviderHealth.order(EmailService._provider_preference()):
+            if not remaining:
+                break
+            health = EmailProviderHealth.get(provider)
+            if not health.claim():
+                continue  # Another send is probing this provider
+            
+            if provider == 'smtp':
+                started = time.monotonic()
+                results = await asyncio.gather(*(
+                    EmailService.send_email_via_smtp(to_email, subject, html_content, plain_text) for to_email in remaining
+                ))
+                # One health sample for the whole batch, like one API request
+                health.record(any(results), (time.monotonic() - started) / len(remaining))
+                remaining = [to_email for to_email, sent in zip(remaining, results) if not sent]
+                continue
+            
+            client = batch_providers[provider]
+            failed = []
+            for start in range(0, len(remaining), client.max_batch_size):
+                chunk = remaining[start:start + client.max_batch_size]
+                started = time.monotonic()
+                success = False
+                try:
+                    await client.send_batch(chunk, subject, html_content, plain_text)
+                    success = True
+                except Exception as e:
+                    logger.error(f"{client.name} batch of {len(chunk)} failed: {str(e)}")
+                    failed.extend(chunk)
+                finally:
+                    health.record(success, time.monotonic() - started)
+            remaining = failed
         
+        if remaining:
+            logger.error(f"Bulk email '{subject}' could not be sent to {len(remaining)} of {len(recipients)} recipients")
+        return remaining
+        
+    @staticmethod
+    def _order_email_context(order_data: dict) -> dict:
         delivery_info = order_data['customer_info'].get('delivery_address', 'Not specified')
         if order_data['customer_info'].get('pickup_preference'):
             delivery_info = "Customer prefers pickup"
-            
-        notes = order_data['customer_info'].get('order_notes', 'No special notes')
-        
-        return f"""<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
-<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-    <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
-    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-    <title>New Order Notification - Crown Mega Store</title>
-    <style type="text/css">
-        body {{ margin: 0; padding: 0; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; font-size: 14px; line-height: 1.6; color: #333333; background-color: #f4f4f4; }}
-        table {{ border-collapse: collapse; }}
-        .email-container {{ max-width: 600px; margin: 20px auto; background: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .header {{ background: linear-gradient(135deg, #2c5aa0 0%, #1e3d72 100%); color: #ffffff; padding: 30px 25px; text-align: center; }}
-        .header h1 {{ margin: 0; font-size: 24px; font-weight: 600; }}
-        .header p {{ margin: 8px 0 0 0; font-size: 16px; opacity: 0.9; }}
-        .content {{ padding: 25px; }}
-        .alert-box {{ background: #fff8dc; border: 1px solid #ffd700; border-radius: 6px; padding: 18px; margin-bottom: 20px; }}
-        .order-section {{ background: #fafafa; border: 1px solid #e0e0e0; border-radius: 6px; padding: 20px; margin: 20px 0; }}
-        .order-table {{ width: 100%; margin: 15px 0; }}
-        .order-table th {{ background: #f8f9fa; padding: 12px; text-align: left; font-weight: 600; font-size: 13px; color: #555; border-bottom: 2px solid #dee2e6; }}
-        .total-row {{ background: #e8f5e8; font-weight: 600; }}
-        .customer-section {{ background: #f0f8ff; border: 1px solid #b3d9ff; border-radius: 6px; padding: 18px; margin: 20px 0; }}
-        .action-section {{ background: #e6f3ff; border-left: 4px solid #0066cc; padding: 18px; margin: 20px 0; }}
-        .footer {{ text-align: center; padding: 20px; color: #888; font-size: 12px; background: #f8f9fa; }}
-        .text-highlight {{ color: #2c5aa0; font-weight: 600; }}
-        .amount {{ color: #28a745; font-weight: 600; font-size: 16px; }}
-        .urgent {{ color: #dc3545; font-weight: 600; }}
-        .info-row {{ margin: 8px 0; }}
-        .info-label {{ font-weight: 600; color: #555; display: inline-block; width: 120px; }}
-    </title>
-</head>
-<body>
-    <div class="email-container">
-        <div class="header">
-            <h1>New Customer Order</h1>
-            <p>Crown Mega Store Order Management</p>
-        </div>
-        
-        <div class="content">
-            <div class="alert-box">
-                <strong class="urgent">Action Required:</strong> A new customer order has been placed and requires your attention within 2 hours.
-            </div>
-            
-            <div class="order-section">
-                <h2 style="margin-top: 0; color: #2c5aa0; font-size: 20px; border-bottom: 2px solid #e0e0e0; padding-bottom: 8px;">
-                    Order Details #{order_data['order_id']}
-                </h2>
-                
-                <table class="order-table" cellpadding="0" cellspacing="0">
-                    <thead>
-                        <tr>
-                            <th>Product Name</th>
-                            <th style="text-align: center; width: 80px;">Qty</th>
-                            <th style="text-align: right; width: 100px;">Unit Price</th>
-                            <th style="text-align: right; width: 100px;">Subtotal</th>
-                        </tr>
-                    </thead>
-                    <tbody>{items_html}
-                    </tbody>
-                    <tfoot>
-                        <tr class="total-row">
-                            <td colspan="3" style="padding: 15px; text-align: right; font-weight: 600;">Order Total:</td>
-                            <td style="padding: 15px; text-align: right;" class="amount">NGN {float(order_data['total']):.2f}</td>
-                        </tr>
-                    </tfoot>
-                </table>
-            </div>
-            
-            <div class="customer-section">
-                <h3 style="margin-top: 0; color: #2c5aa0;">Customer Information</h3>
-                <div class="info-row">
-                    <span class="info-label">Full Name:</span>
-                    <span>{order_data['customer_info']['name']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">Email Address:</span>
-                    <span>{order_data['customer_info']['email']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">Phone Number:</span>
-                    <span class="text-highlight">{order_data['customer_info']['phone']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">Delivery Info:</span>
-                    <span>{delivery_info}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">Payment Method:</span>
-                    <span>{order_data['customer_info']['payment_preference']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">Special Notes:</span>
-                    <span>{notes}</span>
-                </div>
-            </div>
-            
-            <div class="action-section">
-                <h3 style="margin-top: 0; color: #0066cc;">Recommended Actions</h3>
-                <ol style="margin: 10px 0; padding-left: 20px;">
-                    <li style="margin: 6px 0;"><strong>Contact customer immediately</strong> - Call {order_data['customer_info']['phone']}</li>
-                    <li style="margin: 6px 0;"><strong>Verify order accuracy</strong> - Confirm all items and delivery details</li>
-                    <li style="margin: 6px 0;"><strong>Process payment</strong> - Share bank account details if needed</li>
-                    <li style="margin: 6px 0;"><strong>Update order status</strong> - Mark as confirmed in your system</li>
-                </ol>
-            </div>
-        </div>
         
-        <div class="footer">
-            <p><strong>Crown Mega Store</strong></p>
-            <p>Order Management System | Placed: {order_data['created_at']}</p>
-            <p>This is an automated notification from your e-commerce system.</p>
-        </div>
-    </div>
-</body>
-</html>"""
+        return {
+            'order_id': order_data['order_id'],
+            'items': order_data['items'],
+            'customer_info': order_data['customer_info'],
+            'total': order_data['total'],
+            'created_at': order_data.get('created_at'),
+            'delivery_info': delivery_info,
+            'notes': order_data['customer_info'].get('order_notes', 'No special notes')
+        }
     
     @staticmethod
-    def format_order_email_customer(order_data: dict) -> str:
-        """Format HTML email for customer"""
-        items_html = ""
-        for item in order_data['items']:
-            subtotal = float(item['price']) * item['quantity']
-            items_html += f"""
-                <tr>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; font-size: 14px;">{item['product_name']}</td>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: center; font-size: 14px;">{item['quantity']}</td>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-size: 14px;">NGN {float(item['price']):.2f}</td>
-                    <td style="padding: 12px; border-bottom: 1px solid #e0e0e0; text-align: right; font-weight: 600; font-size: 14px;">NGN {subtotal:.2f}</td>
-                </tr>"""
-        
-        return f"""<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
-<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-    <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
-    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-    <title>Order Confirmation - Crown Mega Store</title>
-    <style type="text/css">
-        body {{ margin: 0; padding: 0; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; font-size: 14px; line-height: 1.6; color: #333333; background-color: #f4f4f4; }}
-        table {{ border-collapse: collapse; }}
-        .email-container {{ max-width: 600px; margin: 20px auto; background: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .header {{ background: linear-gradient(135deg, #27ae60 0%, #1e8449 100%); color: #ffffff; padding: 30px 25px; text-align: center; }}
-        .header h1 {{ margin: 0; font-size: 24px; font-weight: 600; }}
-        .header p {{ margin: 8px 0 0 0; font-size: 16px; opacity: 0.9; }}
-        .content {{ padding: 25px; }}
-        .greeting {{ font-size: 16px; margin-bottom: 20px; }}
-        .greeting strong {{ color: #27ae60; }}
-        .intro-text {{ margin-bottom: 20px; line-height: 1.6; }}
-        .next-steps {{ background: #fff8dc; border: 1px solid #ffd700; border-radius: 6px; padding: 18px; margin: 20px 0; }}
-        .next-steps strong {{ color: #e67e22; }}
-        .order-section {{ background: #fafafa; border: 1px solid #e0e0e0; border-radius: 6px; padding: 20px; margin: 20px 0; }}
-        .order-table {{ width: 100%; margin: 15px 0; }}
-        .order-table th {{ background: #f8f9fa; padding: 12px; text-align: left; font-weight: 600; font-size: 13px; color: #555; border-bottom: 2px solid #dee2e6; }}
-        .total-row {{ background: #e8f5e8; font-weight: 600; }}
-        .contact-section {{ background: #e8f4fd; border: 1px solid #b3d9ff; border-radius: 6px; padding: 18px; margin: 20px 0; }}
-        .footer {{ text-align: center; padding: 20px; color: #888; font-size: 12px; background: #f8f9fa; }}
-        .amount {{ color: #27ae60; font-weight: 600; font-size: 18px; }}
-        .contact-list {{ margin: 10px 0; padding: 0; list-style: none; }}
-        .contact-list li {{ margin: 8px 0; padding: 5px 0; }}
-        .contact-item {{ color: #2c5aa0; text-decoration: none; font-weight: 500; }}
-        .order-number {{ color: #2c5aa0; font-weight: 600; }}
-    </style>
-</head>
-<body>
-    <div class="email-container">
-        <div class="header">
-            <h1>Order Confirmation</h1>
-            <p>Crown Mega Store</p>
-        </div>
-        
-        <div class="content">
-            <div class="greeting">
-                Hi <strong>{order_data['customer_info']['name']}</strong>,
-            </div>
-            
-            <div class="intro-text">
-                Thank you for choosing Crown Mega Store! We have successfully received your order and our team will contact you shortly to confirm all details and arrange payment and delivery.
-            </div>
-            
-            <div class="next-steps">
-                <strong>What happens next?</strong><br>
-                Our customer service team will reach out to you within the next 2 hours via phone or email to confirm your order details and provide payment instructions.
-            </div>
-            
-            <div class="order-section">
-                <h2 style="margin-top: 0; color: #2c5aa0; font-size: 20px; border-bottom: 2px solid #e0e0e0; padding-bottom: 8px;">
-                    Your Order <span class="order-number">#{order_data['order_id']}</span>
-                </h2>
-                
-                <table class="order-table" cellpadding="0" cellspacing="0">
-                    <thead>
-                        <tr>
-                            <th>Product Name</th>
-                            <th style="text-align: center; width: 80px;">Qty</th>
-                            <th style="text-align: right; width: 100px;">Unit Price</th>
-                            <th style="text-align: right; width: 100px;">Subtotal</th>
-                        </tr>
-                    </thead>
-                    <tbody>{items_html}
-                    </tbody>
-                    <tfoot>
-                        <tr class="total-row">
-                            <td colspan="3" style="padding: 15px; text-align: right; font-weight: 600;">Order Total:</td>
-                            <td style="padding: 15px; text-align: right;" class="amount">NGN {float(order_data['total']):.2f}</td>
-                        </tr>
-                    </tfoot>
-                </table>
-            </div>
-            
-            <div class="contact-section">
-                <h3 style="margin-top: 0; color: #2c5aa0;">Need to Make Changes?</h3>
-                <p>If you need to modify or cancel this order, please contact us immediately using any of the following methods:</p>
-                <ul class="contact-list">
-                    <li>Email: <span class="contact-item">{settings.BUSINESS_EMAIL}</span></li>
-                    <li>Phone: <span class="contact-item">{settings.BUSINESS_PHONE}</span></li>
-                    <li>WhatsApp: <span class="contact-item">{settings.BUSINESS_WHATSAPP}</span></li>
-                </ul>
-            </div>
-        </div>
-        
-        <div class="footer">
-            <p><strong>Thank you for choosing Crown Mega Store!</strong></p>
-            <p>Order Reference: #{order_data['order_id']} | Please keep this email for your records</p>
-            <p>This is an automated confirmation from Crown Mega Store.</p>
-        </div>
-    </div>
-</body>
-</html>"""
+    def render_order_email_business(order_data: dict) -> RenderedEmail:
+        """Render the new-order email for the business owner (HTML and plain text)"""
+        return EmailTemplates.render('order_business.html', **EmailService._order_email_context(order_data))
     
     @staticmethod
-    def format_status_update_email(order: dict, new_status: str, notes: Optional[str] = None) -> tuple[str, str]:
-        """Format status update email - returns (subject, html_content)"""
-        status_messages = {
-            'confirmed': {
-                'title': 'Order Confirmed',
-                'message': "Great news! We have confirmed your order and will send payment details shortly.",
-                'color': '#27ae60'
-            },
-            'payment_received': {
-                'title': 'Payment Received',
-                'message': "We have received your payment! Your order is now being processed.",
-                'color': '#2c5aa0'
-            },
-            'processing': {
-                'title': 'Order Processing',
-                'message': "Your order is being prepared for delivery.",
-                'color': '#f39c12'
-            },
-            'shipped': {
-                'title': 'Order Shipped',
-                'message': "Your order has been shipped and is on its way to you!",
-                'color': '#e67e22'
-            },
-            'delivered': {
-                'title': 'Order Delivered',
-                'message': "Your order has been delivered successfully! Thank you for shopping with us.",
-                'color': '#27ae60'
-            },
-            'cancelled': {
-                'title': 'Order Cancelled',
-                'message': "Your order has been cancelled as requested.",
-                'color': '#e74c3c'
-            }
-        }
-        
-        status_info = status_messages.get(new_status, {
+    def render_order_email_customer(order_data: dict) -> RenderedEmail:
+        """Render the order confirmation email for the customer (HTML and plain text)"""
+        return EmailTemplates.render('order_customer.html', **EmailService._order_email_context(order_data))
+    
+    @staticmethod
+    def render_order_digest_email(orders: List[dict]) -> RenderedEmail:
+        """Render one business email summarising several orders (digest mode)"""
+        return EmailTemplates.render(
+            'order_digest.html',
+            orders=[EmailService._order_email_context(order_data) for order_data in orders],
+            total=sum(float(order_data['total']) for order_data in orders)
+        )
+    
+    @staticmethod
+    def render_status_update_email(order: dict, new_status: str, notes: Optional[str] = None) -> Tuple[str, RenderedEmail]:
+        """Render a status update email - returns (subject, rendered email)"""
+        status_info = STATUS_MESSAGES.get(new_status, {
             'title': 'Order Status Update',
             'message': f"Your order status has been updated to: {new_status.replace('_', ' ').title()}",
             'color': '#2c5aa0'
         })
         
         subject = f"Order Update: {status_info['title']} - #{order['order_id']}"
-        
-        html_content = f"""<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Transitional//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-transitional.dtd">
-<html xmlns="http://www.w3.org/1999/xhtml">
-<head>
-    <meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
-    <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-    <title>{status_info['title']} - Crown Mega Store</title>
-    <style type="text/css">
-        body {{ margin: 0; padding: 0; font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; font-size: 14px; line-height: 1.6; color: #333333; background-color: #f4f4f4; }}
-        table {{ border-collapse: collapse; }}
-        .email-container {{ max-width: 600px; margin: 20px auto; background: #ffffff; border-radius: 8px; overflow: hidden; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .header {{ background: linear-gradient(135deg, {status_info['color']} 0%, {status_info['color']}dd 100%); color: #ffffff; padding: 30px 25px; text-align: center; }}
-        .header h1 {{ margin: 0; font-size: 24px; font-weight: 600; }}
-        .content {{ padding: 25px; }}
-        .message-box {{ background: #f8f9fa; border-left: 4px solid {status_info['color']}; padding: 18px; margin: 20px 0; border-radius: 0 6px 6px 0; }}
-        .order-details {{ background: #fafafa; border: 1px solid #e0e0e0; border-radius: 6px; padding: 20px; margin: 20px 0; }}
-        .footer {{ text-align: center; padding: 20px; color: #888; font-size: 12px; background: #f8f9fa; }}
-        .status-highlight {{ color: {status_info['color']}; font-weight: 600; }}
-        .amount {{ color: #27ae60; font-weight: 600; }}
-        .note-box {{ background: #fff8dc; border: 1px solid #ffd700; border-radius: 6px; padding: 15px; margin: 15px 0; }}
-        .info-row {{ margin: 8px 0; }}
-        .info-label {{ font-weight: 600; color: #555; display: inline-block; width: 80px; }}
-    </style>
-</head>
-<body>
-    <div class="email-container">
-        <div class="header">
-            <h1>{status_info['title']}</h1>
-            <p>Crown Mega Store</p>
-        </div>
-        
-        <div class="content">
-            <p style="font-size: 16px;">Hi <strong>{order['customer_name']}</strong>,</p>
-            
-            <div class="message-box">
-                <p style="margin: 0; font-size: 15px;">{status_info['message']}</p>
-            </div>
-            
-            {f'<div class="note-box"><strong>Additional Information:</strong><br>{notes}</div>' if notes else ''}
-            
-            <div class="order-details">
-                <h3 style="margin-top: 0; color: #2c5aa0;">Order Summary</h3>
-                <div class="info-row">
-                    <span class="info-label">Order ID:</span>
-                    <span class="status-highlight">#{order['order_id']}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">Total:</span>
-                    <span class="amount">NGN {float(order['total']):.2f}</span>
-                </div>
-                <div class="info-row">
-                    <span class="info-label">Status:</span>
-                    <span class="status-highlight">{new_status.replace('_', ' ').title()}</span>
-                </div>
-            </div>
-            
-            <p>Thank you for choosing Crown Mega Store! We appreciate your business.</p>
-            
-            <div style="background: #e8f4fd; border: 1px solid #b3d9ff; border-radius: 6px; padding: 15px; margin: 20px 0;">
-                <p style="margin: 5px 0; font-size: 13px; color: #555;">
-                    <strong>Questions or concerns?</strong><br>
-                    Contact us at {settings.BUSINESS_EMAIL} or call {settings.BUSINESS_PHONE}
-                </p>
-            </div>
-        </div>
-        
-        <div class="footer">
-            <p><strong>Crown Mega Store</strong></p>
-            <p>This is an automated update from your order management system.</p>
-        </div>
-    </div>
-</body>
-</html>"""
-        
-        return subject, html_content
\ No newline at end of file
+        rendered = EmailTemplates.render(
+            'status_update.html',
+            order=order,
+            notes=notes,
+            status_label=new_status.replace('_', ' ').title(),
+            **status_info
+        )
+        return subject, rendered
+    
+    @staticmethod
+    def format_order_email_business(order_data: dict) -> str:
+        """Format HTML email for business owner"""
+        return EmailService.render_order_email_business(order_data).html
+    
+    @staticmethod
+    def format_order_email_customer(order_data: dict) -> str:
+        """Format HTML email for customer"""
+        return EmailService.render_order_email_customer(order_data).html
+    
+    @staticmethod
+    def format_status_update_email(order: dict, new_status: str, notes: Optional[str] = None) -> tuple[str, str]:
+        """Format status update email - returns (subject, html_content)"""
+        subject, rendered = EmailService.render_status_update_email(order, new_status, notes)
+        return subject, rendered.html
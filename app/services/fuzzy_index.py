@@ -0,0 +1,125 @@
+from typing import Dict, List, Set, Tuple
+from collections import Counter
+import re
+
+WORD_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def trigrams(word: str) -> Set[str]:
+    """pg_trgm-style trigrams: the word padded with two leading spaces and one trailing"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Typo-tolerant lookup over the words in product names and categories.
+    Query words are matched to indexed words through trigram postings, so a
+    lookup only touches words sharing a trigram with the query instead of
+    comparing against every product.
+    """
+
+    def __init__(self):
+        self.word_trigrams: Dict[str, Set[str]] = {}
+        self.trigram_words: Dict[str, Set[str]] = {}
+        self.word_products: Dict[str, Set[str]] = {}
+        self.product_words: Dict[str, Set[str]] = {}
+        self._signatures: Dict[str, Tuple] = {}
+        self._synced_snapshot = None
+
+    @staticmethod
+    def _signature(product: dict) -> Tuple:
+        return (product.get('name'), product.get('category'))
+
+    def upsert(self, product: dict):
+        """Index (or re-index) one product"""
+        product_id = str(product['id'])
+        signature = self._signature(product)
+        if self._signatures.get(product_id) == signature:
+            return
+        self.remove(product_id)
+
+        words = set()
+        for text in signature:
+            if text:
+                words.update(WORD_PATTERN.findall(text.lower()))
+
+        for word in words:
+            if word not in self.word_products:
+                self.word_products[word] = set()
+                grams = trigrams(word)
+                self.word_trigrams[word] = grams
+                for gram in grams:
+                    self.trigram_words.setdefault(gram, set()).add(word)
+            self.word_products[word].add(product_id)
+
+        self.product_words[product_id] = words
+        self._signatures[product_id] = signature
+
+    def remove(self, product_id: str):
+        """Drop one product from the index"""
+        product_id = str(product_id)
+        words = self.product_words.pop(product_id, None)
+        if words is None:
+            return
+        for word in words:
+            products = self.word_products.get(word)
+            if products is None:
+                continue
+            products.discard(product_id)
+            if not products:
+                del self.word_products[word]
+                for gram in self.word_trigrams.pop(word, ()):
+                    gram_words = self.trigram_words.get(gram)
+                    if gram_words is not None:
+                        gram_words.discard(word)
+                        if not gram_words:
+                            del self.trigram_words[gram]
+        self._signatures.pop(product_id, None)
+
+    def sync(self, snapshot):
+        """Reconcile with a catalog snapshot; only products whose text changed are re-indexed"""
+        if snapshot is self._synced_snapshot:
+            return
+        for product in snapshot.products:
+            self.upsert(product)
+        for product_id in list(self.product_words):
+            if product_id not in snapshot.by_id:
+                self.remove(product_id)
+        self._synced_snapshot = snapshot
+
+    def similar_words(self, word: str, threshold: float) -> List[Tuple[str, float]]:
+        """Indexed words whose trigram (Jaccard) similarity to word is at least threshold"""
+        query_grams = trigrams(word)
+        overlaps: Counter = Counter()
+        for gram in query_grams:
+            for candidate in self.trigram_words.get(gram, ()):
+                overlaps[candidate] += 1
+
+        matches = []
+        for candidate, shared in overlaps.items():
+            similarity = shared / (len(query_grams) + len(self.word_trigrams[candidate]) - shared)
+            if similarity >= threshold:
+                matches.append((candidate, similarity))
+        return matches
+
+    def search(self, query: str, limit: int = 20, threshold: float = 0.3) -> List[Tuple[str, float]]:
+        """
+        Return (product_id, score) pairs, best first. A product scores the sum,
+        over query words, of its most similar word's similarity.
+        """
+        scores: Dict[str, float] = {}
+        for query_word in set(WORD_PATTERN.findall(query.lower())):
+            best: Dict[str, float] = {}
+            for word, similarity in self.similar_words(query_word, threshold):
+                for product_id in self.word_products[word]:
+                    if similarity > best.get(product_id, 0.0):
+                        best[product_id] = similarity
+            for product_id, similarity in best.items():
+                scores[product_id] = scores.get(product_id, 0.0) + similarity
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+product_fuzzy_index = TrigramIndex()
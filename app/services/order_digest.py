@@ -0,0 +1,130 @@
+from typing import List, Optional
+from app.core.config import settings
+from app.services.email_service import EmailService
+from app.services.email_outbox import EmailOutbox
+from app.utils.periodic import PeriodicWorker
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class BusinessOrderDigest:
+    """
+    Coalesces "New Order" emails to BUSINESS_EMAIL when ORDER_DIGEST_ENABLED.
+    Orders are held in memory and queued on the outbox as one summary email
+    ORDER_DIGEST_WINDOW_SECONDS after the first of them, or as soon as
+    ORDER_DIGEST_MAX_ORDERS are waiting. Urgent orders (total of at least
+    ORDER_DIGEST_URGENT_MIN_TOTAL) still get their own email. Held orders are
+    flushed on shutdown but lost if the process dies; every order is in the
+    database and its customer email is queued immediately either way.
+    """
+    _pending: List[dict] = []
+    _window_started: Optional[float] = None
+    _flush_lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def is_urgent(email_data: dict) -> bool:
+        return float(email_data['total']) >= settings.ORDER_DIGEST_URGENT_MIN_TOTAL
+
+    @classmethod
+    def holds(cls, email_data: dict) -> bool:
+        """Whether add() would hold this order (digest mode on and the order is not urgent)"""
+        return settings.ORDER_DIGEST_ENABLED and not cls.is_urgent(email_data)
+
+    @classmethod
+    async def add(cls, email_data: dict) -> bool:
+        """
+        Hold an order's business notification for the next digest. Returns
+        False when the order should be emailed on its own instead (see holds()).
+        """
+        if not cls.holds(email_data):
+            return False
+
+        cls._pending.append(email_data)
+        if cls._window_started is None:
+            cls._window_started = time.monotonic()
+            cls._worker.wake()
+        if len(cls._pending) >= settings.ORDER_DIGEST_MAX_ORDERS:
+            try:
+                await cls.flush()
+            except Exception as e:
+                # flush() kept the orders; the periodic flush retries them
+                logger.error(f"Order digest flush failed, {len(cls._pending)} orders held: {str(e)}")
+        return True
+
+    @classmethod
+    def pending(cls) -> List[dict]:
+        """Orders waiting for the next digest"""
+        return list(cls._pending)
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Queue the held orders as one business email; returns how many orders it covered"""
+        if cls._flush_lock is None:
+            cls._flush_lock = asyncio.Lock()
+        async with cls._flush_lock:
+            if not cls._pending:
+                return 0
+
+            # Swap the buffer out so orders placed while queueing start the next digest
+            orders, cls._pending, cls._window_started = cls._pending, [], None
+            try:
+                await EmailOutbox.enqueue([cls._build_message(orders)])
+            except Exception:
+                # Put the orders back so they go out with the next flush
+                cls._pending = orders + cls._pending
+                cls._window_started = time.monotonic()
+                raise
+            return len(orders)
+
+    @staticmethod
+    def _build_message(orders: List[dict]) -> tuple:
+        if len(orders) == 1:
+            # A quiet window: the usual single-order email reads better than a digest of one
+            order = orders[0]
+            rendered = EmailService.render_order_email_business(order)
+            subject = f"New Order #{order['order_id']} - ₦{float(order['total']):.2f}"
+        else:
+            rendered = EmailService.render_order_digest_email(orders)
+            total = sum(float(order['total']) for order in orders)
+            subject = f"{len(orders)} New Orders - ₦{total:.2f}"
+        return (settings.BUSINESS_EMAIL, subject, rendered.html, rendered.text)
+
+    @classmethod
+    def start(cls):
+        """Start the digest timer (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        """Stop the timer and queue whatever is still held"""
+        await cls._worker.stop()
+
+    @classmethod
+    async def _final_flush(cls):
+        try:
+            await cls.flush()
+        except Exception as e:
+            logger.error(f"Final order digest failed, {len(cls._pending)} business notifications unsent: {str(e)}")
+
+    @classmethod
+    async def _flush_if_due(cls):
+        if cls._window_started is not None and cls._until_due() <= 0:
+            # On failure flush() restarts the window, so the retry comes one window later
+            await cls.flush()
+
+    @classmethod
+    def _until_due(cls) -> Optional[float]:
+        """Seconds until the open window is due, or None (wait for add() to open one)"""
+        if cls._window_started is None:
+            return None
+        return max(0.0, cls._window_started + settings.ORDER_DIGEST_WINDOW_SECONDS - time.monotonic())
+
+    _worker = PeriodicWorker(
+        'Order digest',
+        lambda: BusinessOrderDigest._flush_if_due(),
+        lambda: BusinessOrderDigest._until_due(),
+        on_stop=lambda: BusinessOrderDigest._final_flush()
+    )
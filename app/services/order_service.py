@@ -1,11 +1,15 @@
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_async_db, get_async_service_db
+from app.services.product_loader import get_product_loader
 from app.utils.order_id_generator import generate_order_id
+from app.utils.cursor import encode_cursor, decode_cursor, keyset_filter
 from app.services.email_service import EmailService
+from app.services.email_outbox import EmailOutbox
+from app.services.order_digest import BusinessOrderDigest
+from app.services.stock_watcher import LowStockWatcher
 from datetime import datetime
 from app.core.config import settings
 import logging
-import asyncio
 
 logger = logging.getLogger(__name__)
 
@@ -14,8 +18,9 @@ class OrderService:
     
     @staticmethod
     async def create_order(order_data: dict, user_id: Optional[str] = None):
-        """Create new order and send email notifications"""
-        db = get_db()
+        """Create new order and queue its email notifications"""
+        # create_checkout_order writes the outbox, which clients cannot reach, so it runs with the service key
+        db = get_async_service_db()
         
         # Generate unique order ID
         order_id = generate_order_id()
@@ -41,42 +46,15 @@ class OrderService:
             'updated_at': datetime.utcnow().isoformat()
         }
         
-        # Insert order into database
-        order_result = db.table('orders').insert(order_record).execute()
-        created_order = order_result.data[0]
-        
-        # Insert order items
-        for item in order_data['items']:
-            item_record = {
-                'order_id': created_order['id'],
-                'product_id': item['product_id'],
-                'product_name': item['product_name'],
-                'quantity': item['quantity'],
-                'price': float(item['price']),
-                'created_at': datetime.utcnow().isoformat(),
-            }
-            db.table('order_items').insert(item_record).execute()
-        
-        # Create initial status history entry
-        status_history = {
-            'order_id': created_order['id'],
-            'status': 'pending',
-            'updated_by': 'system',
-            'notes': 'Order created from website checkout',
-            'created_at': datetime.utcnow().isoformat()
-        }
-        db.table('order_status_history').insert(status_history).execute()
-        
-        # Update product order counts
-        for item in order_data['items']:
-            product = db.table('products').select('order_count').eq('id', item['product_id']).execute()
-            if product.data:
-                new_count = product.data[0].get('order_count', 0) + item['quantity']
-                db.table('products').update({
-                    'order_count': new_count,
-                    'updated_at': datetime.utcnow().isoformat()
-                }).eq('id', item['product_id']).execute()
-            
+        # Order, items, status history, order_count bumps and order emails in one transaction
+        # (sql/create_checkout_order_function.sql)
+        items = [{
+            'product_id': item['product_id'],
+            'product_name': item['product_name'],
+            'quantity': item['quantity'],
+            'price': float(item['price'])
+        } for item in order_data['items']]
+        
         # Prepare email data
         email_data = {
             'order_id': order_id,
@@ -86,55 +64,46 @@ class OrderService:
             'created_at': datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        # Send emails (non-blocking)
+        # In digest mode the business hears about routine orders in batches
+        digest = BusinessOrderDigest.holds(email_data)
+        messages = []
         try:
-            business_html = EmailService.format_order_email_business(email_data)
-            customer_html = EmailService.format_order_email_customer(email_data)
-            
-            # Send emails in parallel but don't block order creation if they fail
-            business_email_task = EmailService.send_email(
-                settings.BUSINESS_EMAIL,
-                f"New Order #{order_id} - ₦{total:.2f}",
-                business_html
-            )
-            
-            customer_email_task = EmailService.send_email(
-                order_data['customer_info']['email'],
-                f"Order Confirmation #{order_id} - Crown Mega Store",
-                customer_html
-            )
-            
-            # Run email tasks concurrently
-            business_result, customer_result = await asyncio.gather(
-                business_email_task, 
-                customer_email_task, 
-                return_exceptions=True
-            )
-            
-            # Log email results
-            if business_result is True:
-                logger.info(f"Business notification email sent for order {order_id}")
-            else:
-                logger.warning(f"Failed to send business email for order {order_id}: {business_result}")
-                
-            if customer_result is True:
-                logger.info(f"Customer confirmation email sent for order {order_id}")
-            else:
-                logger.warning(f"Failed to send customer email for order {order_id}: {customer_result}")
-                
+            customer_email = EmailService.render_order_email_customer(email_data)
+            messages.append((order_data['customer_info']['email'], f"Order Confirmation #{order_id} - Crown Mega Store", customer_email.html, customer_email.text))
+            if not digest:
+                business_email = EmailService.render_order_email_business(email_data)
+                messages.insert(0, (settings.BUSINESS_EMAIL, f"New Order #{order_id} - ₦{total:.2f}", business_email.html, business_email.text))
         except Exception as e:
-            logger.error(f"Email service failed for order {order_id}: {str(e)}")
+            logger.error(f"Failed to render emails for order {order_id}: {str(e)}")
             # Continue anyway - don't let email failures block order creation
         
+        order_result = await db.rpc('create_checkout_order', {
+            'p_order': order_record,
+            'p_items': items,
+            'p_messages': EmailOutbox.rows(messages)
+        }).execute()
+        created_order = order_result.data
+        
+        # The emails committed with the order; the outbox worker delivers them after we return
+        EmailOutbox.wake()
+        if digest:
+            await BusinessOrderDigest.add(email_data)
+        
+        # order_count changed in the database; drop any memoized copies
+        loader = get_product_loader()
+        for item in items:
+            loader.clear(item['product_id'])
+            LowStockWatcher.record_sale(item['product_id'], item['quantity'])
+        
         return created_order
 
     @staticmethod
-    def get_order_by_id(order_id: str, include_items: bool = True):
+    async def get_order_by_id(order_id: str, include_items: bool = True):
         """Get order details with items"""
-        db = get_db()
+        db = get_async_db()
         
         # Get order
-        result = db.table('orders').select('*').eq('order_id', order_id).execute()
+        result = await db.table('orders').select('*').eq('order_id', order_id).execute()
         
         if not result.data:
             return None
@@ -143,11 +112,11 @@ class OrderService:
         
         if include_items:
             # Get order items
-            items_result = db.table('order_items').select('*').eq('order_id', order['id']).execute()
+            items_result = await db.table('order_items').select('*').eq('order_id', order['id']).execute()
             order['items'] = items_result.data
             
             # Get status history
-            history_result = db.table('order_status_history').select('*').eq('order_id', order['id']).order('created_at').execute()
+            history_result = await db.table('order_status_history').select('*').eq('order_id', order['id']).order('created_at').execute()
             order['status_history'] = history_result.data
         
         return order
@@ -155,10 +124,10 @@ class OrderService:
     @staticmethod
     async def update_order_status(order_id: str, status_update: dict):
         """Update order status and send notifications"""
-        db = get_db()
+        db = get_async_db()
         
         # Get order
-        order = OrderService.get_order_by_id(order_id, include_items=False)
+        order = await OrderService.get_order_by_id(order_id, include_items=False)
         if not order:
             return None
         
@@ -166,7 +135,7 @@ class OrderService:
         new_status = status_update['status']
         
         # Update order status
-        db.table('orders').update({
+        await db.table('orders').update({
             'status': new_status,
             'updated_at': datetime.utcnow().isoformat()
         }).eq('order_id', order_id).execute()
@@ -179,28 +148,31 @@ class OrderService:
             'notes': status_update.get('notes'),
             'created_at': datetime.utcnow().isoformat()
         }
-        db.table('order_status_history').insert(history_entry).execute()
+        await db.table('order_status_history').insert(history_entry).execute()
         
-        # Send customer notification email
-        subject, html_content = EmailService.format_status_update_email(order, new_status, status_update.get('notes'))
-        await EmailService.send_email(order['customer_email'], subject, html_content)
+        # Queue customer notification email
+        try:
+            subject, rendered = EmailService.render_status_update_email(order, new_status, status_update.get('notes'))
+            await EmailOutbox.enqueue([(order['customer_email'], subject, rendered.html, rendered.text)])
+        except Exception as e:
+            logger.error(f"Failed to queue status email for order {order_id}: {str(e)}")
         
         # Get updated order
-        updated_order = OrderService.get_order_by_id(order_id)
+        updated_order = await OrderService.get_order_by_id(order_id)
         
         return updated_order
     
     @staticmethod
     async def record_payment(order_id: str, payment_data: dict):
         """Record payment for order"""
-        db = get_db()
+        db = get_async_db()
         
-        order = OrderService.get_order_by_id(order_id, include_items=False)
+        order = await OrderService.get_order_by_id(order_id, include_items=False)
         if not order:
             return None
         
         # Update order with payment info
-        db.table('orders').update({
+        await db.table('orders').update({
             'payment_confirmed': True,
             'payment_amount': float(payment_data.get('amount')),
             'payment_method': payment_data.get('method'),
@@ -217,29 +189,32 @@ class OrderService:
             'notes': notes,
             'created_at': datetime.utcnow().isoformat()
         }
-        db.table('order_status_history').insert(history_entry).execute()
+        await db.table('order_status_history').insert(history_entry).execute()
         
-        # Send email notification
-        subject, html_content = EmailService.format_status_update_email(order, 'payment_received', notes)
-        await EmailService.send_email(order['customer_email'], subject, html_content)
+        # Queue email notification
+        try:
+            subject, rendered = EmailService.render_status_update_email(order, 'payment_received', notes)
+            await EmailOutbox.enqueue([(order['customer_email'], subject, rendered.html, rendered.text)])
+        except Exception as e:
+            logger.error(f"Failed to queue payment email for order {order_id}: {str(e)}")
         
         # Get updated order
-        updated_order = OrderService.get_order_by_id(order_id)
+        updated_order = await OrderService.get_order_by_id(order_id)
         
         return updated_order
     
     @staticmethod
-    def get_user_orders(user_id: str, status: Optional[str] = None):
+    async def get_user_orders(user_id: str, status: Optional[str] = None):
         """Get all orders for a user"""
         try:
-            db = get_db()
+            db = get_async_db()
             
             query = db.table('orders').select('*').eq('user_id', user_id)
             
             if status:
                 query = query.eq('status', status)
                 
-            result = query.order('created_at', desc=True).execute()
+            result = await query.order('created_at', desc=True).execute()
             
             print(f"Database query for user_id: {user_id}")
             print(f"Query result: {result}")
@@ -252,32 +227,52 @@ class OrderService:
             raise e
     
     @staticmethod
-    def get_all_orders(status: Optional[str] = None, limit: int = 50, page: int = 1):
-        """Get all orders with pagination (admin)"""
-        db = get_db()
+    async def get_all_orders(
+        status: Optional[str] = None,
+        limit: int = 50,
+        page: int = 1,
+        cursor: Optional[str] = None,
+        count: Optional[str] = 'exact'
+    ):
+        """
+        Get all orders with pagination (admin).
+        Pass the previous page's next_cursor as cursor for keyset pagination on
+        (created_at, id); count selects exact/planned/estimated totals or None to skip.
+        """
+        db = get_async_db()
         
         offset = (page - 1) * limit
         
-        query = db.table('orders').select('*')
+        query = db.table('orders').select('*', count=count) if count else db.table('orders').select('*')
         
         if status:
             query = query.eq('status', status)
-
-        result = query.order('created_at', desc=True).limit(limit).range(offset, offset + limit - 1).execute()
         
-        # Get total count for pagination
-        count_query = db.table('orders').select('id', count='exact')
-        if status:
-            count_query = count_query.eq('status', status)
-        count_result = count_query.execute()
+        if cursor:
+            created_at, last_id = decode_cursor(cursor, 'created_at')
+            query = query.or_(keyset_filter('created_at', created_at, last_id, desc=True, id_desc=True))
+        
+        query = query.order('created_at', desc=True, nullsfirst=False).order('id', desc=True)
+        
+        # Fetch one extra row to know whether another page exists
+        if cursor:
+            result = await query.limit(limit + 1).execute()
+        else:
+            result = await query.range(offset, offset + limit).execute()
+        
+        orders = result.data[:limit]
+        next_cursor = None
+        if len(result.data) > limit:
+            next_cursor = encode_cursor('created_at', orders[-1]['created_at'], orders[-1]['id'])
         
-        total_count = count_result.count if hasattr(count_result, 'count') else len(result.data)
-        total_pages = (total_count + limit - 1) // limit
+        total_count = result.count if count else None
+        total_pages = (total_count + limit - 1) // limit if total_count is not None else None
         
         return {
-            'orders': result.data,
-            'count': len(result.data),
-            'page': page,
+            'orders': orders,
+            'count': len(orders),
+            'page': None if cursor else page,
             'total_pages': total_pages,
-            'total_count': total_count
+            'total_count': total_count,
+            'next_cursor': next_cursor
         }
\ No newline at end of file
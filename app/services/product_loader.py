@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional
+from contextvars import ContextVar, Token
+from app.core.database import get_async_db
+import asyncio
+
+_current_loader: ContextVar[Optional['ProductLoader']] = ContextVar('product_loader', default=None)
+
+
+class ProductLoader:
+    """
+    Request-scoped batching loader for product rows by id.
+    Ids requested in the same event loop tick are fetched with a single
+    in_('id', [...]) query and memoized for the rest of the request.
+    """
+
+    max_batch_size = 100
+
+    def __init__(self):
+        self._futures: Dict[str, asyncio.Future] = {}
+        self._queue: List[tuple] = []
+        self._dispatch_scheduled = False
+        self._dispatch_task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def start_request() -> Token:
+        """Give the current request its own loader (call from middleware)"""
+        return _current_loader.set(ProductLoader())
+
+    @staticmethod
+    def end_request(token: Token):
+        _current_loader.reset(token)
+
+    def load(self, product_id: str) -> 'asyncio.Future[Optional[dict]]':
+        """Return an awaitable resolving to the product row, or None if it does not exist"""
+        future = self._futures.get(product_id)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[product_id] = future
+        self._queue.append((product_id, future))
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._schedule_dispatch, loop)
+        return future
+
+    async def load_many(self, product_ids: List[str]) -> List[Optional[dict]]:
+        """Load several products in one batch, preserving the order of product_ids"""
+        return list(await asyncio.gather(*[self.load(product_id) for product_id in product_ids]))
+
+    def prime(self, product: dict):
+        """Seed the memo with a row the caller already has"""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(product)
+        self._futures[product['id']] = future
+
+    def clear(self, product_id: str):
+        """Forget a memoized row after it has been written"""
+        self._futures.pop(product_id, None)
+
+    def _schedule_dispatch(self, loop: asyncio.AbstractEventLoop):
+        # Deferred by one tick so every load() issued before the caller yields joins the batch
+        self._dispatch_task = loop.create_task(self._dispatch())
+
+    async def _dispatch(self):
+        queue, self._queue = self._queue, []
+        self._dispatch_scheduled = False
+
+        db = get_async_db()
+        for start in range(0, len(queue), self.max_batch_size):
+            batch = queue[start:start + self.max_batch_size]
+            try:
+                result = await db.table('products').select('*').in_('id', [product_id for product_id, _ in batch]).execute()
+            except Exception as e:
+                for product_id, future in batch:
+                    # Drop failed lookups so a later load() retries them
+                    if self._futures.get(product_id) is future:
+                        del self._futures[product_id]
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            rows = {str(row['id']): row for row in result.data}
+            for product_id, future in batch:
+                if not future.done():
+                    future.set_result(rows.get(str(product_id)))
+
+
+def get_product_loader() -> ProductLoader:
+    """Get the loader for the current request (a fresh one outside of a request)"""
+    loader = _current_loader.get()
+    if loader is None:
+        loader = ProductLoader()
+        _current_loader.set(loader)
+    return loader
@@ -1,18 +1,42 @@
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_async_db
+from app.services.catalog_cache import CatalogCache
+from app.services.view_counter import ViewCounter
+from app.services.unique_views import UniqueViewCounter
+from app.services.search_index import product_search_index
+from app.services.fuzzy_index import product_fuzzy_index
+from app.services.suggest_index import product_suggest_index
+from app.core.config import settings
+from app.utils.cursor import encode_cursor, decode_cursor, keyset_filter
 from datetime import datetime, timedelta
 
 
 class ProductService:
     
+    # sort_by -> (column, descending); balanced/popularity are persisted calculate_product_score values
+    SORT_COLUMNS = {
+        'balanced': ('balanced_score', True),
+        'popularity': ('popularity_score', True),
+        'price_low': ('price', False),
+        'price_high': ('price', True),
+        'newest': ('created_at', True),
+        'rating': ('rating', True)
+    }
+    
     @staticmethod
     def calculate_product_score(product: dict, strategy: str = 'balanced') -> float:
-        """Calculate product ranking score"""
+        """
+        Calculate product ranking score.
+        Views are the estimated distinct viewers over the rolling window
+        (products.unique_views, written by UniqueViewCounter.flush), not the raw view_count.
+        """
+        views = product.get('unique_views') or 0
+        
         if strategy == 'popularity':
-            return (product.get('view_count', 0) * 0.3) + (product.get('order_count', 0) * 0.7)
+            return (views * 0.3) + (product.get('order_count', 0) * 0.7)
         
         elif strategy == 'balanced':
-            popularity = (product.get('view_count', 0) * 0.2) + (product.get('order_count', 0) * 0.4)
+            popularity = (views * 0.2) + (product.get('order_count', 0) * 0.4)
             rating_score = float(product.get('rating', 0)) * 20
             stock_score = min(product.get('stock_quantity', 0), 20)
             
@@ -26,16 +50,16 @@ class ProductService:
         return 0
     
     @staticmethod
-    def get_product_images(product_id: str):
+    async def get_product_images(product_id: str):
         """Get all images for a product"""
-        db = get_db()
-        result = db.table('product_images').select('*').eq('product_id', product_id).order('display_order').execute()
+        db = get_async_db()
+        result = await db.table('product_images').select('*').eq('product_id', product_id).order('display_order').execute()
         return result.data
     
     @staticmethod
-    def add_product_images(product_id: str, images: List[dict]):
+    async def add_product_images(product_id: str, images: List[dict]):
         """Add multiple images to a product"""
-        db = get_db()
+        db = get_async_db()
         
         # Prepare image data
         image_data = []
@@ -52,25 +76,25 @@ class ProductService:
             image_data.append(image_record)
         
         if image_data:
-            result = db.table('product_images').insert(image_data).execute()
+            result = await db.table('product_images').insert(image_data).execute()
             return result.data
         return []
     
     @staticmethod
-    def update_product_images(product_id: str, images: List[dict]):
+    async def update_product_images(product_id: str, images: List[dict]):
         """Update product images (replace existing)"""
-        db = get_db()
+        db = get_async_db()
         
         # Delete existing images
-        db.table('product_images').delete().eq('product_id', product_id).execute()
+        await db.table('product_images').delete().eq('product_id', product_id).execute()
         
         # Add new images
-        return ProductService.add_product_images(product_id, images)
+        return await ProductService.add_product_images(product_id, images)
     
     @staticmethod
-    def get_products_with_images(products: List[dict]) -> List[dict]:
+    async def get_products_with_images(products: List[dict]) -> List[dict]:
         """Enrich products with their images"""
-        db = get_db()
+        db = get_async_db()
         
         if not products:
             return products
@@ -79,7 +103,7 @@ class ProductService:
         product_ids = [p['id'] for p in products]
         
         # Get all images for these products in one query
-        images_result = db.table('product_images').select('*').in_('product_id', product_ids).order('display_order').execute()
+        images_result = await db.table('product_images').select('*').in_('product_id', product_ids).order('display_order').execute()
         images_by_product = {}
         
         for img in images_result.data:
@@ -107,57 +131,70 @@ class ProductService:
         return products
     
     @staticmethod
-    def get_all_products(
+    async def get_all_products(
         category: Optional[str] = None,
         sort_by: str = 'balanced',
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count: Optional[str] = 'exact'
     ):
-        """Get products with filtering and sorting"""
-        db = get_db()
+        """
+        Get products with filtering and sorting.
+        Pass the previous page's next_cursor as cursor for keyset pagination
+        (offset is then ignored); count selects exact/planned/estimated totals or None to skip.
+        """
+        db = get_async_db()
         
-        # Build query
-        query = db.table('products').select('*')
+        # Build query - sorting and pagination run in the database
+        query = db.table('products').select('*', count=count) if count else db.table('products').select('*')
         
         if category:
             query = query.eq('category', category)
         
-        # Execute query
-        result = query.execute()
-        products = result.data
-        
-        # Add images to products
-        products = ProductService.get_products_with_images(products)
-        
-        # Apply sorting
-        if sort_by == 'balanced':
-            products.sort(key=lambda p: ProductService.calculate_product_score(p, 'balanced'), reverse=True)
-        elif sort_by == 'popularity':
-            products.sort(key=lambda p: ProductService.calculate_product_score(p, 'popularity'), reverse=True)
-        elif sort_by == 'price_low':
-            products.sort(key=lambda p: float(p['price']))
-        elif sort_by == 'price_high':
-            products.sort(key=lambda p: float(p['price']), reverse=True)
-        elif sort_by == 'newest':
-            products.sort(key=lambda p: p['created_at'], reverse=True)
-        elif sort_by == 'rating':
-            products.sort(key=lambda p: float(p.get('rating', 0)), reverse=True)
-        
-        # Apply pagination
-        paginated_products = products[offset:offset + limit]
+        # Apply sorting (see sql/add_product_ranking_scores.sql for the persisted scores)
+        column, desc = ProductService.SORT_COLUMNS.get(sort_by, ('id', False))
+        if cursor:
+            value, last_id = decode_cursor(cursor, sort_by)
+            if column == 'id':
+                query = query.gt('id', last_id)
+            else:
+                query = query.or_(keyset_filter(column, value, last_id, desc))
         
-        return {
+        if column != 'id':
+            query = query.order(column, desc=desc, nullsfirst=False)
+        query = query.order('id')
+        
+        # Apply pagination - one extra row tells us whether another page exists
+        if cursor:
+            result = await query.limit(limit + 1).execute()
+        else:
+            result = await query.range(offset, offset + limit).execute()
+        
+        rows = result.data[:limit]
+        next_cursor = None
+        if len(result.data) > limit:
+            last = rows[-1]
+            next_cursor = encode_cursor(sort_by, last[column], last['id'])
+        
+        # Add images to the returned page only
+        paginated_products = await ProductService.get_products_with_images(rows)
+        
+        response = {
             'products': paginated_products,
-            'total_count': len(products),
-            'page': offset // limit + 1,
-            'page_size': limit
+            'total_count': result.count if count else None,
+            'page_size': limit,
+            'next_cursor': next_cursor
         }
+        if not cursor:
+            response['page'] = offset // limit + 1
+        return response
     
     @staticmethod
-    def get_product_by_id(product_id: str):
+    async def get_product_by_id(product_id: str):
         """Get single product by ID with images"""
-        db = get_db()
-        result = db.table('products').select('*').eq('id', product_id).execute()
+        db = get_async_db()
+        result = await db.table('products').select('*').eq('id', product_id).execute()
         
         if not result.data:
             return None
@@ -165,47 +202,78 @@ class ProductService:
         product = result.data[0]
         
         # Add images
-        products_with_images = ProductService.get_products_with_images([product])
+        products_with_images = await ProductService.get_products_with_images([product])
         return products_with_images[0] if products_with_images else product
     
     @staticmethod
-    def increment_view_count(product_id: str):
-        """Increment product view count"""
-        db = get_db()
-        product = ProductService.get_product_by_id(product_id)
-        
-        if product:
-            new_count = product.get('view_count', 0) + 1
-            db.table('products').update({
-                'view_count': new_count,
-                'updated_at': datetime.utcnow().isoformat()
-            }).eq('id', product_id).execute()
-        
+    def increment_view_count(product_id: str, viewer_key: Optional[str] = None):
+        """Record a product view; buffered and flushed in batches by ViewCounter"""
+        ViewCounter.record(product_id)
+        if viewer_key:
+            UniqueViewCounter.record(product_id, viewer_key)
+    
     @staticmethod
-    def search_products(search_term: str, limit: int = 20):
-        """Search products by name or description"""
-        db = get_db()
+    async def search_products(search_term: str, limit: int = 20):
+        """
+        Search products by name, category or description (BM25-ranked, served from memory).
+        Falls back to trigram fuzzy matching on names and categories when nothing matches exactly.
+        """
+        snapshot = await CatalogCache.get_snapshot()
+        
+        # No-op unless the catalog snapshot changed since the last search
+        product_search_index.sync(snapshot)
+        hits = product_search_index.search(search_term, limit)
+        
+        if not hits:
+            product_fuzzy_index.sync(snapshot)
+            hits = product_fuzzy_index.search(search_term, limit, settings.SEARCH_FUZZY_THRESHOLD)
+        
+        results = []
+        for product_id, score in hits:
+            product = snapshot.by_id.get(product_id)
+            if product:
+                results.append(snapshot.with_images(product))
         
-        result = db.table('products').select('*').execute()
-        products = result.data
+        # Queries that found something feed autocomplete's popular searches
+        if results:
+            product_suggest_index.record_query(search_term)
         
-        # Filter by search term
-        search_lower = search_term.lower()
-        filtered = [
-            p for p in products
-            if search_lower in p['name'].lower() or (p.get('description') and search_lower in p['description'].lower())
-        ]
+        return results
+    
+    @staticmethod
+    async def suggest(prefix: str, limit: int = 8):
+        """
+        Autocomplete a partial search term from memory: product names,
+        categories and popular past searches starting with prefix
+        """
+        snapshot = await CatalogCache.get_snapshot()
+        product_suggest_index.sync(
+            snapshot,
+            lambda product: ProductService.calculate_product_score(product, 'balanced')
+        )
         
-        # Add images to filtered products
-        filtered = ProductService.get_products_with_images(filtered)
+        products = []
+        for product_id in product_suggest_index.suggest_products(prefix, limit):
+            product = snapshot.by_id[product_id]
+            images = snapshot.images_by_product.get(product_id)
+            products.append({
+                'id': product['id'],
+                'name': product['name'],
+                'category': product.get('category'),
+                'price': product.get('price'),
+                'image_url': images[0]['image_url'] if images else product.get('image_url')
+            })
         
-        return filtered[:limit]
+        return {
+            'products': products,
+            'categories': product_suggest_index.suggest_categories(prefix, limit),
+            'queries': product_suggest_index.suggest_queries(prefix, limit)
+        }
     
     @staticmethod
-    def get_categories():
+    async def get_categories():
         """Get all unique product categories"""
-        db = get_db()
-        result = db.table('products').select('category').execute()
+        products = await CatalogCache.get_products()
         
-        categories = list(set(p['category'] for p in result.data))
+        categories = list(set(p['category'] for p in products))
         return sorted(categories)
\ No newline at end of file
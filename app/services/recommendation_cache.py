@@ -0,0 +1,91 @@
+from typing import Dict, List, Optional
+from collections import OrderedDict
+from app.core.config import settings
+from app.services.catalog_cache import CatalogCache
+import time
+
+
+class RecommendationCache:
+    """
+    Ranked /for-you product ids per user (and limit), least recently used
+    first. Entries live for RECOMMENDATION_CACHE_TTL_SECONDS and the cache
+    holds at most RECOMMENDATION_CACHE_MAX_PRODUCT_IDS ids in total, evicting
+    the least recently used users beyond that. Only ids are kept; rows are
+    hydrated from the catalog cache, so prices and stock are current.
+    A purchase invalidates the user's entry (see RecommendationService.track_activity).
+    """
+    _entries: "OrderedDict[str, Dict[int, tuple]]" = OrderedDict()
+    _size: int = 0
+    _generation: int = 0
+
+    @classmethod
+    def generation(cls) -> int:
+        """Read before computing; put() drops the result if anything was invalidated since"""
+        return cls._generation
+
+    @classmethod
+    def get_ids(cls, user_id: str, limit: int) -> Optional[List[str]]:
+        """Cached ranked ids, or None on a miss or once the entry expired"""
+        by_limit = cls._entries.get(user_id)
+        if by_limit is None:
+            return None
+        entry = by_limit.get(limit)
+        if entry is None:
+            return None
+        product_ids, expires_at = entry
+        if time.monotonic() >= expires_at:
+            cls.forget(user_id, limit)
+            return None
+        cls._entries.move_to_end(user_id)
+        return product_ids
+
+    @classmethod
+    async def get(cls, user_id: str, limit: int) -> Optional[List[dict]]:
+        """Cached recommendations hydrated from the catalog snapshot, or None on a miss"""
+        product_ids = cls.get_ids(user_id, limit)
+        if product_ids is None:
+            return None
+        snapshot = await CatalogCache.get_snapshot()
+        products = [snapshot.by_id.get(product_id) for product_id in product_ids]
+        products = [product for product in products if product and product['stock_quantity'] > 0]
+        if len(products) < len(product_ids):
+            # Deleted or sold out since the entry was computed: recompute rather than serve a short list
+            cls.forget(user_id, limit)
+            return None
+        return products
+
+    @classmethod
+    def forget(cls, user_id: str, limit: int):
+        """Drop one cached list"""
+        by_limit = cls._entries.get(user_id)
+        if by_limit is None or limit not in by_limit:
+            return
+        product_ids, _ = by_limit.pop(limit)
+        cls._size -= len(product_ids)
+        if not by_limit:
+            del cls._entries[user_id]
+
+    @classmethod
+    def put(cls, user_id: str, limit: int, product_ids: List[str], generation: int):
+        if generation != cls._generation:
+            return  # A purchase was recorded while this was being computed
+
+        by_limit = cls._entries.setdefault(user_id, {})
+        previous = by_limit.get(limit)
+        if previous is not None:
+            cls._size -= len(previous[0])
+        by_limit[limit] = (product_ids, time.monotonic() + settings.RECOMMENDATION_CACHE_TTL_SECONDS)
+        cls._size += len(product_ids)
+        cls._entries.move_to_end(user_id)
+
+        while cls._size > settings.RECOMMENDATION_CACHE_MAX_PRODUCT_IDS and len(cls._entries) > 1:
+            _, evicted = cls._entries.popitem(last=False)
+            cls._size -= sum(len(ids) for ids, _ in evicted.values())
+
+    @classmethod
+    def invalidate(cls, user_id: str):
+        """Forget a user's recommendations after their activity changed them"""
+        cls._generation += 1
+        by_limit = cls._entries.pop(user_id, None)
+        if by_limit is not None:
+            cls._size -= sum(len(ids) for ids, _ in by_limit.values())
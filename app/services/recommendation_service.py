@@ -1,45 +1,71 @@
-from typing import List, Optional, Dict
-from collections import Counter, defaultdict
-from app.core.database import get_db
-from datetime import datetime, timedelta
+from typing import List, Optional, Dict, NamedTuple
+from collections import Counter
+from app.core.database import get_async_db
+from app.services.product_loader import get_product_loader
+from app.services.catalog_cache import CatalogCache
+from app.services.recommendation_cache import RecommendationCache
+from app.services.co_purchase import CoPurchaseIndex
+from app.services.similar_users import SimilarUsers
+from app.services.trending import TrendingCounter
+from datetime import datetime
+
+
+class UserProfile(NamedTuple):
+    """What scoring needs from a user's activity history, computed once per request"""
+    category_counts: Counter
+    activity_count: int
+    avg_purchase_price: Optional[float]
 
 
 class RecommendationService:
     
     @staticmethod
-    def get_user_recommendations(user_id: str, limit: int = 8) -> List[Dict]:
+    async def get_user_recommendations(user_id: str, limit: int = 8) -> List[Dict]:
+        """
+        Personalized product recommendations for a user, served from
+        RecommendationCache until they expire or the user buys something
+        """
+        cached = await RecommendationCache.get(user_id, limit)
+        if cached is not None:
+            return cached
+        
+        generation = RecommendationCache.generation()
+        recommendations = await RecommendationService.compute_user_recommendations(user_id, limit)
+        RecommendationCache.put(user_id, limit, [str(product['id']) for product in recommendations], generation)
+        return recommendations
+    
+    @staticmethod
+    async def compute_user_recommendations(user_id: str, limit: int = 8) -> List[Dict]:
         """
         Generate personalized product recommendations for a user
         Based on their view/purchase history and similar users
         """
-        db = get_db()
+        db = get_async_db()
         
         # Get user's activity history
-        user_activities = db.table('user_activities').select('*').eq('user_id', user_id).execute()
+        user_activities = await db.table('user_activities').select('*').eq('user_id', user_id).execute()
         
         if not user_activities.data:
             # New user - return popular products
-            return RecommendationService.get_popular_products(limit)
+            return await RecommendationService.get_popular_products(limit)
         
         activities = user_activities.data
         
         # Extract preferences
         viewed_products = [a['product_id'] for a in activities if a['activity_type'] == 'view']
         purchased_products = [a['product_id'] for a in activities if a['activity_type'] == 'purchase']
-        preferred_categories = [a['category'] for a in activities]
-        
+
         # Get category preferences
-        category_scores = Counter(preferred_categories)
-        top_categories = [cat for cat, _ in category_scores.most_common(3)]
+        profile = await RecommendationService.build_user_profile(activities)
+        top_categories = [cat for cat, _ in profile.category_counts.most_common(3)]
         
         recommedations = []
         seen_ids = set(viewed_products)
         
-        # 1. Content-based: Similar categories (40% of recommendations)
+        # 1. Content-based: Similar categories (40% of recommendations), from the catalog snapshot
+        snapshot = await CatalogCache.get_snapshot()
         for category in top_categories:
-            category_products = db.table('products').select('*').eq('category', category).execute()
-            
-            for product in category_products.data:
+            for product in snapshot.by_category.get(category, []):
                 if product['id'] not in seen_ids and product['stock_quantity'] > 0:
                     recommedations.append(product)
                     seen_ids.add(product['id'])
@@ -50,103 +76,75 @@ class RecommendationService:
                 break
         
         # 2. Collaborative: Similar users (30% of recommendations)
-        similar_user_products = RecommendationService.get_collaborative_recommendations(user_id, purchased_products, seen_ids)
+        similar_user_products = await RecommendationService.get_collaborative_recommendations(user_id, purchased_products, seen_ids)
         recommedations.extend(similar_user_products[:int(limit * 0.3)])
         
         # 3. Trending products (30% of recommendations)
-        trending = RecommendationService.get_trending_products(seen_ids)
+        trending = await RecommendationService.get_trending_products(seen_ids)
         recommedations.extend(trending[:int(limit * 0.3)])
         
-        # Score and sort all recommendations
-        scored = []
-        for product in recommedations[:limit]:
-            score = RecommendationService.calculate_recommendation_score(product, activities)
-            scored.append((product, score))
+        # Score and sort all recommendations against the profile (no queries per candidate).
+        # At most `limit` (<= 20) candidates and a handful of arithmetic terms each: a plain loop
+        # costs microseconds, so there is nothing for numpy-style vectorizing to win here
+        scored = [
+            (product, RecommendationService.calculate_recommendation_score(product, profile))
+            for product in recommedations[:limit]
+        ]
         
         scored.sort(key=lambda x: x[1], reverse=True)
         
         return [product for product, score in scored[:limit]]
     
     @staticmethod
-    def get_collaborative_recommendations(user_id: str, user_purchases: List[str], exclude_ids: set) -> List[dict]:
-        """Find products that similar users purchased"""
-        db = get_db()
-        
+    async def get_collaborative_recommendations(user_id: str, user_purchases: List[str], exclude_ids: set) -> List[dict]:
+        """Find products bought with the user's purchases, and by users with similar purchases"""
         if not user_purchases:
             return []
         
-        # Get all purchase activities
-        all_purchases = db.table('user_activities').select('*').eq('activity_type', 'purchase').execute()
+        # Item-item: top neighbours of each purchase in the precomputed matrix (see CoPurchaseIndex)
+        matrix = CoPurchaseIndex.get()
+        similar_products = matrix.scores(user_purchases, exclude_ids) if matrix else Counter()
         
-        # Group by user
-        user_purchase_map = defaultdict(set)
-        for activity in all_purchases.data:
-            if activity['user_id'] != user_id:
-                user_purchase_map[activity['user_id']].add(activity['product_id'])
+        # User-user: similar users come from MinHash LSH bucket collisions, compared by exact Jaccard
+        for other_user_id, similarity in SimilarUsers.similar(user_id):
+            for product_id in SimilarUsers.purchases(other_user_id):
+                if product_id not in exclude_ids:
+                    similar_products[product_id] += similarity
         
-        # Find similar users (Jaccard similarity)
-        user_purchase_set = set(user_purchases)
-        similar_products = Counter()
+        top_ids = [product_id for product_id, score in similar_products.most_common(10)]
         
-        for other_user_id, other_purchases in user_purchase_map.items():
-            intersection = len(user_purchase_set & other_purchases)
-            union = len(user_purchase_set | other_purchases)
-            
-            if union > 0:
-                similarity = intersection / union
-                
-                if similarity > 0.2: # At least 20% similarity
-                    # Add their purchases to recommendations
-                    for product_id in other_purchases:
-                        if product_id not in exclude_ids:
-                            similar_products[product_id] += similarity
-        
-        # Get product details for top recommendations
-        recommendations = []
-        for product_id, score in similar_products.most_common(10):
-            product_result = db.table('products').select('*').eq('id', product_id).execute()
-            if product_result.data and product_result.data[0]['stock_quantity'] > 0:
-                recommendations.append(product_result.data[0])
+        # Get product details for top recommendations (one batched query)
+        products = await get_product_loader().load_many(top_ids)
+        recommendations = [product for product in products if product and product['stock_quantity'] > 0]
         
         return recommendations
     
     @staticmethod
-    def get_trending_products(exclude_ids: set, days: int = 7) -> List[dict]:
-        """Get products with high recent activity"""
-        db = get_db()
+    async def get_trending_products(exclude_ids: set, limit: int = 20) -> List[dict]:
+        """Get products with the highest time-decayed recent activity (see TrendingCounter)"""
+        snapshot = await CatalogCache.get_snapshot()
         
-        cutoff_date = (datetime.utcnow() - timedelta(days=days)).isoformat()
-        
-        # Get recent activities
-        recent_activities = db.table('user_activities').select('*').gte('created_at', cutoff_date).execute()
-        
-        # Count activity by product
-        product_scores = Counter()
-        for activity in recent_activities.data:
-            if activity['product_id'] not in exclude_ids:
-                weight = 3 if activity['activity_type'] == 'purchase' else 1
-                product_scores[activity['product_id']] += weight
-        
-        # Get product details
         trending = []
-        for product_id, score in product_scores.most_common(20):
-            product_result = db.table('products').select('*').eq('id', product_id).execute()
-            if product_result.data and product_result.data[0]['stock_quantity'] > 0:
-                trending.append(product_result.data[0])
+        for product_id in TrendingCounter.top():
+            if product_id in exclude_ids:
+                continue
+            product = snapshot.by_id.get(product_id)
+            if product and product['stock_quantity'] > 0:
+                trending.append(product)
+                if len(trending) >= limit:
+                    break
         
         return trending
     
     @staticmethod
-    def get_popular_products(limit: int = 8) -> List[dict]:
+    async def get_popular_products(limit: int = 8) -> List[dict]:
         """Get most popular products overall"""
-        db = get_db()
-        
-        # Get all prodcuts
-        all_products = db.table('products').select('*').gt('stock_quantity', 0).execute()
+        # Get all in-stock products from the catalog cache
+        in_stock = [p for p in await CatalogCache.get_products() if p['stock_quantity'] > 0]
         
         # Sort by order count and rating
         products = sorted(
-            all_products.data,
+            in_stock,
             key=lambda p: (p.get('order_count', 0) * 0.7 + float(p.get('rating', 0)) * 10),
             reverse=True
         )
@@ -154,7 +152,26 @@ class RecommendationService:
         return products[:limit]
     
     @staticmethod
-    def calculate_recommendation_score(product: dict, user_activities: List[dict]) -> float:
+    async def build_user_profile(user_activities: List[dict]) -> UserProfile:
+        """Category frequencies and average purchase price of a user's activity history"""
+        purchased_ids = [a['product_id'] for a in user_activities if a['activity_type'] == 'purchase']
+        
+        avg_price = None
+        if purchased_ids:
+            # One batched query for every purchased product
+            purchased_products = await get_product_loader().load_many(purchased_ids)
+            purchased_prices = [float(p['price']) for p in purchased_products if p]
+            if purchased_prices:
+                avg_price = sum(purchased_prices) / len(purchased_prices)
+        
+        return UserProfile(
+            category_counts=Counter(a['category'] for a in user_activities),
+            activity_count=len(user_activities),
+            avg_purchase_price=avg_price
+        )
+    
+    @staticmethod
+    def calculate_recommendation_score(product: dict, profile: UserProfile) -> float:
         """Calculate how well a product mathces user preferences"""
         score = 0.0
         
@@ -163,25 +180,13 @@ class RecommendationService:
         score += min(product.get('order_count', 0), 50)
         
         # Category preference
-        user_categories = [a['category'] for a in user_activities]
-        if user_categories:
-            category_frequency = user_categories.count(product['category']) / len(user_categories)
+        if profile.activity_count:
+            category_frequency = profile.category_counts[product['category']] / profile.activity_count
             score += category_frequency * 30
         
-        # Price preference
-        purchased_activities = [a for a in user_activities if a['activity_type'] == 'purchase']
-        if purchased_activities:
-            db = get_db()
-            purchased_prices = []
-            
-            for acitivity in purchased_activities:
-                product_result = db.table('products').select('price').eq('id', acitivity['product_id']).execute()
-                if product_result.data:
-                    purchased_prices.append(float(product_result.data[0]['price']))
-            
-            if purchased_prices:
-                avg_price = sum(purchased_prices) / len(purchased_prices)
-            price_diff = abs(float(product['price']) - avg_price) / avg_price
+        # Price preference (only once we know what the user's purchases cost)
+        if profile.avg_purchase_price:
+            price_diff = abs(float(product['price']) - profile.avg_purchase_price) / profile.avg_purchase_price
             score += max(0, 20 - (price_diff * 20))
         
         # Stock availability bonus
@@ -197,12 +202,12 @@ class RecommendationService:
         return score
     
     @staticmethod
-    def get_similar_products(product_id: str, limit: int = 6) -> List[dict]:
+    async def get_similar_products(product_id: str, limit: int = 6) -> List[dict]:
         """Get products similar to a specific product"""
-        db = get_db()
+        db = get_async_db()
         
         # Get the source product
-        product_result = db.table('products').select('*').eq('id', product_id).execute()
+        product_result = await db.table('products').select('*').eq('id', product_id).execute()
         
         if not product_result.data:
             return []
@@ -210,7 +215,7 @@ class RecommendationService:
         source_product = product_result.data[0]
         
         # Get products in same category
-        similar_products = db.table('products').select('*').eq('category', source_product['category']).execute()
+        similar_products = await db.table('products').select('*').eq('category', source_product['category']).execute()
         
         recommendations = []
         for product in similar_products.data:
@@ -233,15 +238,15 @@ class RecommendationService:
     @staticmethod
     async def track_activity(user_id: str, product_id: str, activity_type: str):
         """Track user activity for recommendations"""
-        db = get_db()
+        db = get_async_db()
         
         # Get product category
-        product_result = db.table('products').select('category').eq('id', product_id).execute()
+        product = await get_product_loader().load(product_id)
         
-        if not product_result.data:
+        if not product:
             return False
         
-        category = product_result.data[0]['category']
+        category = product['category']
         
         # Save activity
         activity_data = {
@@ -252,6 +257,11 @@ class RecommendationService:
             'created_at': datetime.utcnow().isoformat()
         }
         
-        db.table('user_activities').insert(activity_data).execute()
+        await db.table('user_activities').insert(activity_data).execute()
+        
+        TrendingCounter.record(product_id, activity_type)
+        if activity_type == 'purchase':
+            SimilarUsers.record_purchase(user_id, product_id)
+            RecommendationCache.invalidate(user_id)
         
         return True
\ No newline at end of file
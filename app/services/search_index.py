@@ -0,0 +1,183 @@
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
+import bisect
+import math
+import re
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'its', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with', 'your', 'you'
+}
+
+# Weighted term frequency per field (BM25F-style): a name hit counts more than a description hit
+FIELD_WEIGHTS = (('name', 3.0), ('category', 2.0), ('description', 1.0))
+
+VOWELS = set('aeiou')
+
+
+def stem(word: str) -> str:
+    """Light Porter-style suffix stripping for English product text"""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    # Plurals
+    if word.endswith('sses'):
+        word = word[:-2]
+    elif word.endswith('ies') and len(word) > 4:
+        word = word[:-3] + 'y'
+    elif word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        word = word[:-1]
+
+    # Verb endings
+    for suffix in ('ingly', 'edly', 'ing', 'ed'):
+        base = word[:-len(suffix)]
+        if word.endswith(suffix) and len(base) >= 3 and VOWELS & set(base):
+            word = base
+            if word.endswith(('at', 'bl', 'iz')):
+                word += 'e'
+            elif len(word) > 3 and word[-1] == word[-2] and word[-1] not in 'lsz' and word[-1] not in VOWELS:
+                word = word[:-1]
+            break
+
+    # Derivational endings
+    for suffix in ('fulness', 'ness', 'ful', 'ly'):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            word = word[:-len(suffix)]
+            break
+
+    # Trailing e, so "charge" and "charged" meet at "charg"
+    if word.endswith('e') and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and stem"""
+    if not text:
+        return []
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class SearchIndex:
+    """
+    In-memory inverted index over product name, category and description,
+    ranked with BM25. Kept current incrementally via upsert()/remove() and
+    reconciled against each new catalog snapshot with sync().
+    """
+
+    k1 = 1.2
+    b = 0.75
+    max_prefix_expansions = 20
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self._signatures: Dict[str, Tuple] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._synced_snapshot = None
+
+    @staticmethod
+    def _signature(product: dict) -> Tuple:
+        return tuple(product.get(field) for field, _ in FIELD_WEIGHTS)
+
+    def upsert(self, product: dict):
+        """Index (or re-index) one product"""
+        product_id = str(product['id'])
+        signature = self._signature(product)
+        if self._signatures.get(product_id) == signature:
+            return
+        self.remove(product_id)
+
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(product.get(field)):
+                terms[token] += weight
+
+        for term, tf in terms.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                self._vocabulary_dirty = True
+            self.postings[term][product_id] = tf
+
+        length = sum(terms.values())
+        self.doc_terms[product_id] = dict(terms)
+        self.doc_lengths[product_id] = length
+        self.total_length += length
+        self._signatures[product_id] = signature
+
+    def remove(self, product_id: str):
+        """Drop one product from the index"""
+        product_id = str(product_id)
+        terms = self.doc_terms.pop(product_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            docs.pop(product_id, None)
+            if not docs:
+                del self.postings[term]
+                self._vocabulary_dirty = True
+        self.total_length -= self.doc_lengths.pop(product_id, 0.0)
+        self._signatures.pop(product_id, None)
+
+    def sync(self, snapshot):
+        """Reconcile with a catalog snapshot; only products whose text changed are re-indexed"""
+        if snapshot is self._synced_snapshot:
+            return
+        for product in snapshot.products:
+            self.upsert(product)
+        for product_id in list(self.doc_terms):
+            if product_id not in snapshot.by_id:
+                self.remove(product_id)
+        self._synced_snapshot = snapshot
+
+    def _expand(self, term: str) -> List[str]:
+        """The term itself if indexed, otherwise indexed terms it is a prefix of"""
+        if term in self.postings:
+            return [term]
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self.postings)
+            self._vocabulary_dirty = False
+        start = bisect.bisect_left(self._vocabulary, term)
+        expansions = []
+        for candidate in self._vocabulary[start:start + self.max_prefix_expansions]:
+            if not candidate.startswith(term):
+                break
+            expansions.append(candidate)
+        return expansions
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Return (product_id, BM25 score) pairs, best first"""
+        doc_count = len(self.doc_terms)
+        if not doc_count:
+            return []
+        avg_length = self.total_length / doc_count
+
+        # Unstemmed query tokens also go through prefix expansion, so partial words still match
+        raw_tokens = [t for t in TOKEN_PATTERN.findall(query.lower()) if t not in STOPWORDS]
+        terms = set()
+        for raw in raw_tokens:
+            stemmed = stem(raw)
+            expanded = self._expand(stemmed) or self._expand(raw)
+            terms.update(expanded)
+
+        scores: Dict[str, float] = {}
+        for term in terms:
+            docs = self.postings[term]
+            idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for product_id, tf in docs.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[product_id] / avg_length)
+                scores[product_id] = scores.get(product_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+product_search_index = SearchIndex()
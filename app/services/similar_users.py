@@ -0,0 +1,48 @@
+from typing import Dict, List, Set, Tuple
+from app.core.config import settings
+from app.utils.minhash import MinHashLSH
+
+
+class SimilarUsers:
+    """
+    Users with similar purchase histories, from a MinHash LSH index over each
+    user's set of purchased products. track_activity adds purchases as they
+    happen; the periodic co-purchase rebuild (CoPurchaseIndex) reloads the
+    whole index from user_activities, which also picks up purchases recorded
+    by other instances. Candidates come from LSH bucket collisions and only
+    they get an exact Jaccard comparison.
+    """
+    _index: MinHashLSH = MinHashLSH(settings.SIMILAR_USERS_LSH_BANDS, settings.SIMILAR_USERS_LSH_ROWS)
+
+    @classmethod
+    def record_purchase(cls, user_id: str, product_id: str):
+        cls._index.add(str(user_id), [str(product_id)])
+
+    @staticmethod
+    def build(baskets: Dict[str, Set[str]]) -> MinHashLSH:
+        """New index over every user's purchases (CPU-bound; run it off the event loop)"""
+        index = MinHashLSH(settings.SIMILAR_USERS_LSH_BANDS, settings.SIMILAR_USERS_LSH_ROWS)
+        for user_id, products in baskets.items():
+            index.add(str(user_id), products)
+        return index
+
+    @classmethod
+    def replace(cls, index: MinHashLSH):
+        """Swap in a rebuilt index, keeping purchases recorded here while it was being built"""
+        for user_id in cls._index.keys():
+            index.add(user_id, cls._index.items(user_id))
+        cls._index = index
+
+    @classmethod
+    def purchases(cls, user_id: str) -> Set[str]:
+        return cls._index.items(str(user_id))
+
+    @classmethod
+    def similar(cls, user_id: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """(user_id, Jaccard similarity) of the most similar users, best first"""
+        return cls._index.query(
+            str(user_id),
+            settings.SIMILAR_USERS_MIN_JACCARD,
+            limit,
+            settings.SIMILAR_USERS_MAX_CANDIDATES
+        )
@@ -0,0 +1,160 @@
+from typing import Optional
+from collections import deque
+from email.message import Message
+from app.core.config import settings
+import aiosmtplib
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Errors after which a connection can't be trusted and is thrown away
+CONNECTION_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, ConnectionError, OSError)
+
+# The server refused this message but the session is still usable
+MESSAGE_ERRORS = (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused)
+
+
+class SMTPConnectionPool:
+    """
+    Small pool of connected, STARTTLS'd and authenticated aiosmtplib.SMTP
+    clients, so a message costs one SMTP transaction instead of a TCP + TLS +
+    AUTH handshake. Connections idle for noop_after seconds are checked with
+    NOOP before reuse, connections idle longer than idle_timeout are replaced,
+    and a send that fails because the server dropped the connection is
+    retried once on a fresh one.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        start_tls: Optional[bool] = True,
+        size: int = 4,
+        timeout: float = 30,
+        noop_after: float = 30,
+        idle_timeout: float = 240
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.size = size
+        self.timeout = timeout
+        self.noop_after = noop_after
+        self.idle_timeout = idle_timeout
+        self._idle: deque = deque()
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            timeout=self.timeout
+        )
+        # Connects, upgrades with STARTTLS and logs in
+        await smtp.connect()
+        return smtp
+
+    @staticmethod
+    def _discard(smtp: aiosmtplib.SMTP):
+        try:
+            smtp.close()
+        except Exception:
+            pass
+
+    async def _checkout(self) -> aiosmtplib.SMTP:
+        """An idle connection that still answers, or a new one"""
+        while self._idle:
+            smtp, last_used = self._idle.pop()
+            idle_for = time.monotonic() - last_used
+            if not smtp.is_connected or idle_for > self.idle_timeout:
+                self._discard(smtp)
+                continue
+            if idle_for > self.noop_after:
+                try:
+                    await smtp.noop()
+                except Exception:
+                    self._discard(smtp)
+                    continue
+            return smtp
+        return await self._connect()
+
+    def _checkin(self, smtp: aiosmtplib.SMTP):
+        if smtp.is_connected:
+            self._idle.append((smtp, time.monotonic()))
+        else:
+            self._discard(smtp)
+
+    async def send(self, message: Message):
+        """Send a message on a pooled connection"""
+        async with self._slots:
+            smtp = await self._checkout()
+            try:
+                try:
+                    result = await smtp.send_message(message)
+                except CONNECTION_ERRORS as e:
+                    # Most likely the server closed an idle connection; retry once on a new one
+                    logger.info(f"SMTP connection lost ({type(e).__name__}), reconnecting")
+                    self._discard(smtp)
+                    smtp = await self._connect()
+                    result = await smtp.send_message(message)
+            except MESSAGE_ERRORS:
+                # The server rejected this message; reset so the connection can be reused
+                try:
+                    await smtp.rset()
+                except Exception:
+                    self._discard(smtp)
+                    raise
+                self._checkin(smtp)
+                raise
+            except BaseException:
+                self._discard(smtp)
+                raise
+            self._checkin(smtp)
+            return result
+
+    async def close(self):
+        """Close every idle connection"""
+        while self._idle:
+            smtp, _ = self._idle.pop()
+            try:
+                await smtp.quit()
+            except Exception:
+                self._discard(smtp)
+
+
+_smtp_pool: Optional[SMTPConnectionPool] = None
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Get the process-wide SMTP pool for the configured server"""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPConnectionPool(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            username=settings.SMTP_USER,
+            password=settings.SMTP_PASSWORD,
+            start_tls=True,
+            size=settings.SMTP_POOL_SIZE,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+            noop_after=settings.SMTP_POOL_NOOP_AFTER_SECONDS,
+            idle_timeout=settings.SMTP_POOL_IDLE_TIMEOUT_SECONDS
+        )
+    return _smtp_pool
+
+
+async def close_smtp_pool():
+    """Close the process-wide SMTP pool (called on app shutdown)"""
+    global _smtp_pool
+    if _smtp_pool is not None:
+        await _smtp_pool.close()
+        _smtp_pool = None
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional, Set
+from app.core.config import settings
+from app.services.catalog_cache import CatalogCache
+from app.services.email_outbox import EmailOutbox
+from app.utils.email_templates import EmailTemplates
+from app.utils.periodic import PeriodicWorker
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LowStockWatcher:
+    """
+    Emails BUSINESS_EMAIL when products run low.
+    Checkout does not decrement stock_quantity (admins set it), so the watcher
+    keeps, per product, the last stock level it saw and the units ordered
+    since then; stock_quantity minus those units is compared with the
+    product's low_stock_threshold. Checkout and admin product writes only
+    update these in-memory levels. A background check every
+    LOW_STOCK_CHECK_SECONDS evaluates the touched products against the
+    catalog cache and queues one email on the outbox for everything that
+    went low, with at most one alert per product per
+    LOW_STOCK_ALERT_COOLDOWN_SECONDS. Units ordered since the last stock
+    update are forgotten on restart.
+    """
+    _levels: Dict[str, dict] = {}
+    _sales: Dict[str, int] = {}
+    _touched: Set[str] = set()
+    _last_alerted: Dict[str, float] = {}
+    _check_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def record_sale(cls, product_id: str, quantity: int):
+        """Count units ordered at checkout; no I/O"""
+        product_id = str(product_id)
+        cls._sales[product_id] = cls._sales.get(product_id, 0) + quantity
+
+    @classmethod
+    def record_stock(cls, product: dict):
+        """An admin set a product's stock level (or threshold); no I/O"""
+        product_id = str(product['id'])
+        cls._set_level(product_id, product)
+        cls._touched.add(product_id)
+
+    @classmethod
+    def _set_level(cls, product_id: str, product: dict) -> dict:
+        threshold = product.get('low_stock_threshold')
+        level = cls._levels[product_id] = {
+            'stock': product.get('stock_quantity') or 0,
+            'sold': 0,
+            'threshold': settings.LOW_STOCK_DEFAULT_THRESHOLD if threshold is None else threshold,
+            'product': product
+        }
+        if level['stock'] > level['threshold']:
+            # Restocked: the next time it runs low is a new alert
+            cls._last_alerted.pop(product_id, None)
+        return level
+
+    @classmethod
+    def remaining(cls, product_id: str) -> Optional[int]:
+        """Estimated units left: last known stock minus units ordered since"""
+        level = cls._levels.get(str(product_id))
+        if level is None:
+            return None
+        return level['stock'] - level['sold'] - cls._sales.get(str(product_id), 0)
+
+    @classmethod
+    async def check(cls) -> List[dict]:
+        """Evaluate touched products and queue one alert email; returns the products alerted"""
+        if cls._check_lock is None:
+            cls._check_lock = asyncio.Lock()
+        async with cls._check_lock:
+            if not cls._sales and not cls._touched:
+                return []
+            snapshot = await CatalogCache.get_snapshot()
+
+            # Swap the buffers out so checkouts during the check count towards the next one
+            sales, cls._sales = cls._sales, {}
+            touched, cls._touched = cls._touched | set(sales), set()
+
+            now = time.monotonic()
+            low = []
+            for product_id in touched:
+                row = snapshot.by_id.get(product_id)
+                level = cls._levels.get(product_id)
+                if row is None and level is None:
+                    continue  # Deleted, or not in the catalog yet
+                if level is None or (row is not None and (row.get('stock_quantity') or 0) != level['stock']):
+                    # First sighting, or the stock level was set since (maybe by another instance)
+                    level = cls._set_level(product_id, row)
+                level['sold'] += sales.get(product_id, 0)
+
+                remaining = level['stock'] - level['sold']
+                if remaining > level['threshold']:
+                    continue
+                last = cls._last_alerted.get(product_id)
+                if last is not None and now - last < settings.LOW_STOCK_ALERT_COOLDOWN_SECONDS:
+                    continue
+                low.append({
+                    **(row or level['product']),
+                    'stock_quantity': max(remaining, 0),
+                    'sold_since_restock': level['sold']
+                })
+
+            if not low:
+                return []
+            try:
+                await cls._send(low)
+            except Exception:
+                # Alert again at the next check
+                cls._touched.update(str(product['id']) for product in low)
+                raise
+            for product in low:
+                cls._last_alerted[str(product['id'])] = now
+            return low
+
+    @staticmethod
+    async def _send(products: List[dict]):
+        rendered = EmailTemplates.render('low_stock_alert.html', products=products)
+        if len(products) == 1:
+            subject = f"Low Stock Alert: {products[0].get('name')}"
+        else:
+            subject = f"Low Stock Alert: {len(products)} products"
+        await EmailOutbox.enqueue([(settings.BUSINESS_EMAIL, subject, rendered.html, rendered.text)])
+        logger.info(f"Queued low stock alert for {len(products)} products")
+
+    @classmethod
+    def start(cls):
+        """Start the periodic check (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        """Stop the periodic check and queue any alerts still pending"""
+        await cls._worker.stop()
+
+    @classmethod
+    async def _final_check(cls):
+        try:
+            await cls.check()
+        except Exception as e:
+            logger.error(f"Final low stock check failed: {str(e)}")
+
+    _worker = PeriodicWorker(
+        'Low stock check',
+        lambda: LowStockWatcher.check(),
+        lambda: settings.LOW_STOCK_CHECK_SECONDS,
+        run_first=False,
+        on_stop=lambda: LowStockWatcher._final_check()
+    )
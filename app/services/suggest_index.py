@@ -0,0 +1,125 @@
+from typing import Callable, Dict, List, Tuple
+from collections import Counter
+from app.core.config import settings
+import bisect
+import heapq
+import re
+
+WORD_START = re.compile(r'(?:^|(?<=\s))\S')
+
+
+def _keys(text: str) -> List[str]:
+    """The lowercased text from each word onwards, so 'galaxy' also completes 'Samsung Galaxy S24'"""
+    text = ' '.join(text.lower().split())
+    return [text[match.start():] for match in WORD_START.finditer(text)]
+
+
+class SuggestIndex:
+    """
+    Sorted-array prefix index for autocomplete over product names,
+    categories and popular past search queries. Matches for a prefix are a
+    contiguous slice found with two bisects; the top results for every 1-2
+    character prefix are precomputed because those slices are the widest.
+    """
+
+    precomputed_prefix_length = 2
+    precomputed_top_k = 20
+
+    def __init__(self, max_tracked_queries: int = 1000):
+        self.max_tracked_queries = max_tracked_queries
+        self._product_keys: List[str] = []
+        self._product_ids: List[str] = []
+        self._product_scores: Dict[str, float] = {}
+        self._short_prefix_products: Dict[str, List[str]] = {}
+        self._category_keys: List[str] = []
+        self._categories: List[str] = []
+        self._category_scores: Dict[str, float] = {}
+        self._query_counts: Counter = Counter()
+        self._query_keys: List[str] = []
+        self._synced_snapshot = None
+
+    def sync(self, snapshot, score: Callable[[dict], float]):
+        """Rebuild the product and category arrays from a new catalog snapshot, ranking products by score"""
+        if snapshot is self._synced_snapshot:
+            return
+
+        entries: List[Tuple[str, str]] = []
+        scores: Dict[str, float] = {}
+        category_scores: Dict[str, float] = {}
+        for product in snapshot.products:
+            product_id = str(product['id'])
+            product_score = score(product)
+            scores[product_id] = product_score
+            entries.extend((key, product_id) for key in _keys(product['name']))
+            category = product.get('category')
+            if category:
+                category_scores[category] = max(product_score, category_scores.get(category, product_score))
+        entries.sort()
+
+        short_prefixes: Dict[str, set] = {}
+        for key, product_id in entries:
+            for length in range(1, self.precomputed_prefix_length + 1):
+                if len(key) >= length:
+                    short_prefixes.setdefault(key[:length], set()).add(product_id)
+
+        category_entries = sorted(
+            (key, category) for category in category_scores for key in _keys(category)
+        )
+
+        self._product_keys = [key for key, _ in entries]
+        self._product_ids = [product_id for _, product_id in entries]
+        self._product_scores = scores
+        self._short_prefix_products = {
+            prefix: heapq.nlargest(self.precomputed_top_k, ids, key=lambda i: (scores[i], i))
+            for prefix, ids in short_prefixes.items()
+        }
+        self._category_keys = [key for key, _ in category_entries]
+        self._categories = [category for _, category in category_entries]
+        self._category_scores = category_scores
+        self._synced_snapshot = snapshot
+
+    def record_query(self, query: str):
+        """Count a search query that returned results"""
+        query = ' '.join(query.lower().split())
+        if not query:
+            return
+        if query not in self._query_counts:
+            bisect.insort(self._query_keys, query)
+        self._query_counts[query] += 1
+
+        # Keep memory bounded: forget the long tail once we track twice the limit
+        if len(self._query_counts) > 2 * self.max_tracked_queries:
+            self._query_counts = Counter(dict(self._query_counts.most_common(self.max_tracked_queries)))
+            self._query_keys = sorted(self._query_counts)
+
+    @staticmethod
+    def _prefix_range(keys: List[str], prefix: str) -> Tuple[int, int]:
+        return bisect.bisect_left(keys, prefix), bisect.bisect_left(keys, prefix + '\uffff')
+
+    def suggest_products(self, prefix: str, limit: int) -> List[str]:
+        """Ids of products with a name word starting with prefix, ranked by calculate_product_score"""
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+        if len(prefix) <= self.precomputed_prefix_length and limit <= self.precomputed_top_k:
+            return self._short_prefix_products.get(prefix, [])[:limit]
+
+        start, end = self._prefix_range(self._product_keys, prefix)
+        ids = set(self._product_ids[start:end])
+        return heapq.nlargest(limit, ids, key=lambda i: (self._product_scores[i], i))
+
+    def suggest_categories(self, prefix: str, limit: int) -> List[str]:
+        """Categories with a word starting with prefix, ranked by their best product's score"""
+        prefix = ' '.join(prefix.lower().split())
+        start, end = self._prefix_range(self._category_keys, prefix)
+        categories = set(self._categories[start:end])
+        return heapq.nlargest(limit, categories, key=lambda c: (self._category_scores[c], c))
+
+    def suggest_queries(self, prefix: str, limit: int) -> List[str]:
+        """Popular past queries starting with prefix, most frequent first"""
+        prefix = ' '.join(prefix.lower().split())
+        start, end = self._prefix_range(self._query_keys, prefix)
+        return heapq.nlargest(limit, self._query_keys[start:end], key=lambda q: (self._query_counts[q], q))
+
+
+product_suggest_index = SuggestIndex(settings.SUGGEST_MAX_TRACKED_QUERIES)
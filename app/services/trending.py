@@ -0,0 +1,177 @@
+from typing import Dict, List, Optional
+from app.core.database import get_async_service_db
+from app.core.config import settings
+from app.utils.periodic import PeriodicWorker
+import asyncio
+import heapq
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+# Weight of one activity; anything not listed counts 1
+ACTIVITY_WEIGHTS = {'purchase': 3.0}
+
+# Scores are rescaled to a new landmark before exp() gets large enough to lose precision
+MAX_LANDMARK_EXPONENT = 30.0
+
+
+class TrendingCounter:
+    """
+    Exponentially time-decayed activity score per product: every activity
+    adds its weight, and weights halve every TRENDING_HALF_LIFE_HOURS.
+    Scores are stored relative to a landmark time (weight * e^(rate * (t - landmark))),
+    so old scores never need touching and their order never changes as time
+    passes; record() is O(log k) and keeps the TRENDING_TOP_K best products
+    in a min-heap, which top() reads without looking at any other product.
+    Every TRENDING_CHECKPOINT_SECONDS the increments since the last
+    checkpoint are merged into product_trending_scores (see
+    sql/create_product_trending_scores_table.sql) and the merged scores,
+    which include other instances' activity, replace the in-memory ones.
+    """
+    _scores: Dict[str, float] = {}
+    _pending: Dict[str, float] = {}
+    _landmark: float = time.time()
+    _top: Dict[str, float] = {}
+    _heap: List[tuple] = []
+    _checkpoint_lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def _rate() -> float:
+        return math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+
+    @classmethod
+    def record(cls, product_id: str, activity_type: str):
+        """Count one activity; no I/O"""
+        now = time.time()
+        exponent = (now - cls._landmark) * cls._rate()
+        if exponent > MAX_LANDMARK_EXPONENT:
+            cls._rescale(now)
+            exponent = 0.0
+
+        product_id = str(product_id)
+        weight = ACTIVITY_WEIGHTS.get(activity_type, 1.0) * math.exp(exponent)
+        cls._pending[product_id] = cls._pending.get(product_id, 0.0) + weight
+        cls._set_score(product_id, cls._scores.get(product_id, 0.0) + weight)
+
+    @classmethod
+    def _set_score(cls, product_id: str, score: float):
+        """Raise a product's score and keep the top-k heap exact"""
+        cls._scores[product_id] = score
+        if product_id in cls._top:
+            cls._top[product_id] = score
+            heapq.heappush(cls._heap, (score, product_id))
+        elif len(cls._top) < settings.TRENDING_TOP_K:
+            cls._top[product_id] = score
+            heapq.heappush(cls._heap, (score, product_id))
+        else:
+            # Scores only grow between rescales, so a product outside the top can only enter past the minimum
+            lowest_score, lowest_id = cls._lowest()
+            if score > lowest_score:
+                heapq.heappop(cls._heap)
+                del cls._top[lowest_id]
+                cls._top[product_id] = score
+                heapq.heappush(cls._heap, (score, product_id))
+
+        if len(cls._heap) > 4 * settings.TRENDING_TOP_K:
+            cls._rebuild_heap()
+
+    @classmethod
+    def _lowest(cls) -> tuple:
+        # Drop entries left behind by score increases and evictions
+        while cls._top.get(cls._heap[0][1]) != cls._heap[0][0]:
+            heapq.heappop(cls._heap)
+        return cls._heap[0]
+
+    @classmethod
+    def _rebuild_heap(cls):
+        cls._heap = [(score, product_id) for product_id, score in cls._top.items()]
+        heapq.heapify(cls._heap)
+
+    @classmethod
+    def _rebuild_top(cls):
+        best = heapq.nlargest(settings.TRENDING_TOP_K, cls._scores.items(), key=lambda item: item[1])
+        cls._top = dict(best)
+        cls._rebuild_heap()
+
+    @classmethod
+    def _rescale(cls, now: float):
+        """Move the landmark to now, dropping products whose score decayed away"""
+        factor = math.exp(-(now - cls._landmark) * cls._rate())
+        cls._scores = {
+            product_id: score * factor
+            for product_id, score in cls._scores.items()
+            if score * factor >= settings.TRENDING_MIN_SCORE or product_id in cls._pending
+        }
+        cls._pending = {product_id: score * factor for product_id, score in cls._pending.items()}
+        cls._landmark = now
+        cls._rebuild_top()
+
+    @classmethod
+    def top(cls, limit: Optional[int] = None) -> List[str]:
+        """Product ids by current decayed score, best first (at most TRENDING_TOP_K)"""
+        ranked = sorted(cls._top.items(), key=lambda item: item[1], reverse=True)
+        return [product_id for product_id, _ in ranked[:limit]]
+
+    @classmethod
+    async def checkpoint(cls) -> int:
+        """Merge increments into the shared scores and load them back; returns how many products are scored"""
+        if cls._checkpoint_lock is None:
+            cls._checkpoint_lock = asyncio.Lock()
+        async with cls._checkpoint_lock:
+            now = time.time()
+            rate = cls._rate()
+            to_now = math.exp(-(now - cls._landmark) * rate)
+
+            # Swap the buffer out so activity recorded during the RPC goes to the next checkpoint
+            pending, cls._pending = cls._pending, {}
+            deltas = {product_id: weight * to_now for product_id, weight in pending.items()}
+            try:
+                db = get_async_service_db()
+                result = await db.rpc('checkpoint_trending_scores', {
+                    'p_deltas': deltas,
+                    'p_half_life_seconds': settings.TRENDING_HALF_LIFE_HOURS * 3600,
+                    'p_min_score': settings.TRENDING_MIN_SCORE
+                }).execute()
+            except Exception:
+                # Put the increments back (the landmark may have moved meanwhile) so they are retried
+                from_now = math.exp((now - cls._landmark) * rate)
+                for product_id, weight in deltas.items():
+                    cls._pending[product_id] = cls._pending.get(product_id, 0.0) + weight * from_now
+                raise
+
+            # Shared scores as of the RPC, plus whatever was recorded while it ran
+            from_now = math.exp((now - cls._landmark) * rate)
+            scores = {str(row['product_id']): float(row['score']) * from_now for row in result.data or []}
+            for product_id, weight in cls._pending.items():
+                scores[product_id] = scores.get(product_id, 0.0) + weight
+            cls._scores = scores
+            cls._rebuild_top()
+            return len(scores)
+
+    @classmethod
+    def start(cls):
+        """Load the shared scores, then checkpoint periodically (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        """Stop the periodic checkpoint and write out whatever is still pending"""
+        await cls._worker.stop()
+
+    @classmethod
+    async def _final_checkpoint(cls):
+        if not cls._pending:
+            return
+        try:
+            await cls.checkpoint()
+        except Exception as e:
+            logger.error(f"Final trending checkpoint failed, {len(cls._pending)} products unsaved: {str(e)}")
+
+    _worker = PeriodicWorker(
+        'Trending checkpoint',
+        lambda: TrendingCounter.checkpoint(),
+        lambda: settings.TRENDING_CHECKPOINT_SECONDS,
+        on_stop=lambda: TrendingCounter._final_checkpoint()
+    )
@@ -0,0 +1,190 @@
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.database import get_async_service_db
+from app.core.config import settings
+from app.utils.hyperloglog import HyperLogLog
+from app.utils.periodic import PeriodicWorker
+import asyncio
+import base64
+import hashlib
+import logging
+import math
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class UniqueViewCounter:
+    """
+    Estimated distinct viewers per product over a rolling window.
+    Each product keeps one HyperLogLog sketch per time bucket
+    (UNIQUE_VIEWS_BUCKET_HOURS); a window estimate merges the buckets it
+    covers, so refreshes and repeat visits from the same viewer count once.
+    Memory is bounded at window / bucket sketches of 2**UNIQUE_VIEWS_PRECISION
+    bytes per product viewed within the window. On start and every
+    UNIQUE_VIEWS_FLUSH_SECONDS the sketches changed since the last flush are
+    merged register-wise into product_view_sketches, the merged sketches of
+    every instance are folded back in, and the window estimates are written
+    to products.unique_views, which the persisted ranking scores use in place
+    of view_count (see sql/add_unique_view_scores.sql).
+    """
+    _sketches: Dict[str, Dict[int, HyperLogLog]] = {}
+    _changed: Set[Tuple[str, int]] = set()
+    _flush_lock: Optional[asyncio.Lock] = None
+
+    @staticmethod
+    def viewer_key(user_id: Optional[str], client_ip: Optional[str], user_agent: Optional[str]) -> str:
+        """Identify a viewer by user id when signed in, otherwise by a client fingerprint"""
+        if user_id:
+            return f'user:{user_id}'
+        fingerprint = hashlib.sha256(f'{client_ip}|{user_agent}'.encode()).hexdigest()
+        return f'client:{fingerprint}'
+
+    @staticmethod
+    def _bucket_seconds() -> int:
+        return int(settings.UNIQUE_VIEWS_BUCKET_HOURS * 3600)
+
+    @classmethod
+    def _current_bucket(cls) -> int:
+        return int(time.time()) // cls._bucket_seconds()
+
+    @classmethod
+    def _window_buckets(cls, hours: Optional[float] = None) -> int:
+        hours = settings.UNIQUE_VIEWS_WINDOW_HOURS if hours is None else min(hours, settings.UNIQUE_VIEWS_WINDOW_HOURS)
+        return max(1, math.ceil(hours * 3600 / cls._bucket_seconds()))
+
+    @classmethod
+    def record(cls, product_id: str, viewer_key: str):
+        """Add a viewer to the product's sketch for the current bucket"""
+        product_id = str(product_id)
+        bucket = cls._current_bucket()
+        buckets = cls._sketches.setdefault(product_id, {})
+
+        sketch = buckets.get(bucket)
+        if sketch is None:
+            # New bucket: drop the ones that have rolled out of the longest window
+            cls._expire(buckets, bucket)
+            sketch = buckets[bucket] = HyperLogLog(settings.UNIQUE_VIEWS_PRECISION)
+        sketch.add(viewer_key)
+        cls._changed.add((product_id, bucket))
+
+    @classmethod
+    def _expire(cls, buckets: Dict[int, HyperLogLog], current_bucket: int):
+        oldest = current_bucket - cls._window_buckets() + 1
+        for expired in [b for b in buckets if b < oldest]:
+            del buckets[expired]
+
+    @classmethod
+    def estimate(cls, product_id: str, hours: Optional[float] = None) -> int:
+        """Estimated distinct viewers of a product in the last `hours` (default: the full window)"""
+        buckets = cls._sketches.get(str(product_id))
+        if not buckets:
+            return 0
+        oldest = cls._current_bucket() - cls._window_buckets(hours) + 1
+        in_window = [sketch for bucket, sketch in buckets.items() if bucket >= oldest]
+        if not in_window:
+            return 0
+        if len(in_window) == 1:
+            return in_window[0].estimate()
+        return HyperLogLog.union(in_window, settings.UNIQUE_VIEWS_PRECISION).estimate()
+
+    @classmethod
+    def top(cls, limit: int = 20, hours: Optional[float] = None) -> List[Tuple[str, int]]:
+        """(product_id, estimated unique viewers) pairs, most viewed first"""
+        estimates = [(product_id, cls.estimate(product_id, hours)) for product_id in list(cls._sketches)]
+        estimates = [item for item in estimates if item[1] > 0]
+        estimates.sort(key=lambda item: (-item[1], item[0]))
+        return estimates[:limit]
+
+    @classmethod
+    def _rotate(cls) -> Dict[str, List[HyperLogLog]]:
+        """Drop aged-out buckets, and products left with none; returns the remaining sketches per product"""
+        current = cls._current_bucket()
+        in_window = {}
+        for product_id in list(cls._sketches):
+            buckets = cls._sketches[product_id]
+            cls._expire(buckets, current)
+            if buckets:
+                in_window[product_id] = list(buckets.values())
+            else:
+                del cls._sketches[product_id]
+        return in_window
+
+    @staticmethod
+    def _estimates(in_window: Dict[str, List[HyperLogLog]]) -> Dict[str, int]:
+        return {
+            product_id: (sketches[0] if len(sketches) == 1 else HyperLogLog.union(sketches, settings.UNIQUE_VIEWS_PRECISION)).estimate()
+            for product_id, sketches in in_window.items()
+        }
+
+    @classmethod
+    def _fold(cls, rows: List[dict]):
+        """Merge shared sketches into the local ones; max is idempotent, so local views since the snapshot stay"""
+        for row in rows:
+            shared = HyperLogLog.from_bytes(base64.b64decode(row['registers']))
+            if shared.precision != settings.UNIQUE_VIEWS_PRECISION:
+                continue  # Written before UNIQUE_VIEWS_PRECISION changed; ages out with its bucket
+            buckets = cls._sketches.setdefault(str(row['product_id']), {})
+            bucket = int(row['bucket'])
+            if bucket in buckets:
+                buckets[bucket].merge(shared)
+            else:
+                buckets[bucket] = shared
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Share changed sketches, take in everyone else's and write the window estimates; returns how many products have viewers"""
+        if cls._flush_lock is None:
+            cls._flush_lock = asyncio.Lock()
+        async with cls._flush_lock:
+            oldest = cls._current_bucket() - cls._window_buckets() + 1
+            changed, cls._changed = cls._changed, set()
+            sketches = [{
+                'product_id': product_id,
+                'bucket': bucket,
+                'registers': base64.b64encode(cls._sketches[product_id][bucket].registers).decode()
+            } for product_id, bucket in changed if bucket >= oldest and bucket in cls._sketches.get(product_id, {})]
+
+            db = get_async_service_db()
+            try:
+                result = await db.rpc('merge_product_view_sketches', {
+                    'p_sketches': sketches,
+                    'p_oldest_bucket': oldest
+                }).execute()
+            except Exception:
+                # Resending is harmless (merging is a max), so keep them for the next flush
+                cls._changed |= changed
+                raise
+            cls._fold(result.data or [])
+
+            in_window = cls._rotate()
+            # Merging sketches is CPU-bound; keep it off the event loop
+            estimates = await asyncio.to_thread(cls._estimates, in_window)
+            # Every instance writes the same estimates from the same merged sketches;
+            # products left out (no viewers in the window) drop to zero
+            await db.rpc('set_product_unique_views', {'p_counts': estimates}).execute()
+            return len(estimates)
+
+    @classmethod
+    def start(cls):
+        """Load the shared sketches, then flush periodically (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        """Stop the periodic flush and share whatever changed since the last one"""
+        await cls._worker.stop()
+
+    @classmethod
+    async def _final_flush(cls):
+        try:
+            await cls.flush()
+        except Exception as e:
+            logger.error(f"Final unique views flush failed: {str(e)}")
+
+    # The first flush loads the shared sketches, so a restart keeps its counts
+    _worker = PeriodicWorker(
+        'Unique views flush',
+        lambda: UniqueViewCounter.flush(),
+        lambda: settings.UNIQUE_VIEWS_FLUSH_SECONDS,
+        on_stop=lambda: UniqueViewCounter._final_flush()
+    )
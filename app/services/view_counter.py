@@ -0,0 +1,78 @@
+from typing import Dict, Optional
+from app.core.database import get_async_db
+from app.core.config import settings
+from app.utils.periodic import PeriodicWorker
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    """
+    Write-behind buffer for product view counts.
+    record() only bumps an in-memory counter; a background task flushes the
+    accumulated counts every VIEW_FLUSH_INTERVAL_SECONDS as one
+    increment_product_views RPC (see sql/add_increment_product_views.sql).
+    Views buffered when the process dies unexpectedly are lost, which is an
+    acceptable trade for a popularity signal.
+    """
+    _pending: Dict[str, int] = {}
+    _flush_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def record(cls, product_id: str, views: int = 1):
+        """Count a product view; no I/O"""
+        product_id = str(product_id)
+        cls._pending[product_id] = cls._pending.get(product_id, 0) + views
+
+    @classmethod
+    def pending(cls) -> Dict[str, int]:
+        """Views recorded but not yet flushed"""
+        return dict(cls._pending)
+
+    @classmethod
+    async def flush(cls) -> int:
+        """Write buffered views to the database; returns how many products were updated"""
+        if cls._flush_lock is None:
+            cls._flush_lock = asyncio.Lock()
+        async with cls._flush_lock:
+            if not cls._pending:
+                return 0
+
+            # Swap the buffer out so views recorded during the RPC go to the next flush
+            counts, cls._pending = cls._pending, {}
+            try:
+                db = get_async_db()
+                await db.rpc('increment_product_views', {'p_counts': counts}).execute()
+            except Exception:
+                # Put the counts back so they are retried with the next flush
+                for product_id, views in counts.items():
+                    cls.record(product_id, views)
+                raise
+            return len(counts)
+
+    @classmethod
+    def start(cls):
+        """Start the periodic flush task (called on app startup)"""
+        cls._worker.start()
+
+    @classmethod
+    async def stop(cls):
+        """Stop the periodic flush and write out whatever is still buffered"""
+        await cls._worker.stop()
+
+    @classmethod
+    async def _final_flush(cls):
+        try:
+            await cls.flush()
+        except Exception as e:
+            logger.error(f"Final view count flush failed, {len(cls._pending)} products unsaved: {str(e)}")
+
+    _worker = PeriodicWorker(
+        'View count flush',
+        lambda: ViewCounter.flush(),
+        lambda: settings.VIEW_FLUSH_INTERVAL_SECONDS,
+        run_first=False,
+        on_stop=lambda: ViewCounter._final_flush()
+    )
@@ -0,0 +1,46 @@
+from typing import Any, Tuple
+import base64
+import json
+
+
+def encode_cursor(sort_by: str, value: Any, row_id: str) -> str:
+    """Encode the (sort value, id) of the last row on a page as an opaque cursor"""
+    payload = json.dumps([sort_by, value, row_id], separators=(',', ':'), default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: str) -> Tuple[Any, str]:
+    """Decode a cursor into (sort value, id); raises ValueError if invalid or for another sort"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    
+    if cursor_sort != sort_by:
+        raise ValueError('Cursor was issued for a different sort order')
+    return value, row_id
+
+
+def keyset_filter(column: str, value: Any, row_id: str, desc: bool, id_desc: bool = False) -> str:
+    """
+    PostgREST or=() filter selecting rows after (value, row_id) for
+    ORDER BY column [DESC] NULLS LAST, id [DESC]; pair it with
+    order(column, desc=desc, nullsfirst=False) so NULLs sort the same way
+    """
+    op = 'lt' if desc else 'gt'
+    id_op = 'lt' if id_desc else 'gt'
+    if value is None:
+        # Already among the trailing NULLs: only the id can move forward
+        return f'and({column}.is.null,id.{id_op}.{_quote(row_id)})'
+    return (
+        f'{column}.{op}.{_quote(value)},and({column}.eq.{_quote(value)},id.{id_op}.{_quote(row_id)}),'
+        f'{column}.is.null'
+    )
+
+
+def _quote(value: Any) -> str:
+    # Double quotes keep reserved characters (commas, parentheses, colons) literal
+    text = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{text}"'
+
@@ -1,234 +1,136 @@
-from typing import Dict, Any
+from typing import Any, Dict, NamedTuple
+from pathlib import Path
+from html import unescape
+from jinja2 import BaseLoader, Environment, FileSystemLoader, StrictUndefined, Template, select_autoescape
+from app.core.config import settings
+import re
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / 'templates' / 'email'
+
+JINJA_TAG = re.compile(r'{{.*?}}|{%.*?%}|{#.*?#}', re.S)
+HEAD = re.compile(r'<head\b.*?</head>', re.S | re.I)
+PARAGRAPH_END = re.compile(r'</(?:p|h[1-6]|ul|ol|table)>', re.I)
+LINE_END = re.compile(r'<br\s*/?>|</(?:div|li|tr)>', re.I)
+CELL_END = re.compile(r'</t[dh]>', re.I)
+HTML_TAG = re.compile(r'<[^<]+?>')
+BLOCK_GAP = re.compile(r'(?<=\x01) (?=\x01)')
+BLOCK_EDGE_SPACE = re.compile(r'^((?:\x01\d+\x01)+) | ((?:\x01\d+\x01)+)$')
+
+
+class RenderedEmail(NamedTuple):
+    html: str
+    text: str
+
+
+def money(value: Any) -> str:
+    """Format an amount with two decimals, like the old f'{float(x):.2f}'"""
+    return f"{float(value):.2f}"
+
+
+def html_to_text(html_content: str) -> str:
+    """Strip tags from arbitrary HTML (for ad-hoc messages that have no template)"""
+    plain_text = re.sub('<[^<]+?>', '', html_content)
+    return re.sub(r'\s+', ' ', plain_text).strip()
+
+
+def text_skeleton(source: str) -> str:
+    """
+    Turn an HTML template's source into a plain-text template: <head> and tags
+    are dropped, block ends become line breaks and Jinja tags are kept, so
+    rendering it with the same context gives the message's text part.
+    """
+    placeholders = []
+
+    def hide(match):
+        placeholders.append(match.group(0))
+        marker = '\x01' if match.group(0).startswith('{%') else '\x00'
+        return f'{marker}{len(placeholders) - 1}{marker}'
+
+    text = JINJA_TAG.sub(hide, source)
+    # Source line breaks mean nothing in HTML; only block ends break the text
+    text = re.sub(r'\s+', ' ', HEAD.sub('', text))
+    text = PARAGRAPH_END.sub('\n\n', text)
+    text = LINE_END.sub('\n', text)
+    text = CELL_END.sub(' ', text)
+    text = unescape(HTML_TAG.sub('', text))
+
+    lines = [re.sub(r'[ \t]+', ' ', line).strip() for line in text.split('\n')]
+    # A {% %} tag opening or closing a line must not leave a stray space there
+    lines = [BLOCK_EDGE_SPACE.sub(lambda m: m.group(1) or m.group(2), BLOCK_GAP.sub('', line)) for line in lines]
+    text = re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip() + '\n'
+    return re.sub(r'([\x00\x01])(\d+)\1', lambda m: placeholders[int(m.group(2))], text)
+
+
+class TextSkeletonLoader(BaseLoader):
+    """Serves text_skeleton() of each HTML template, so includes resolve to text too"""
+
+    def __init__(self, html_loader: BaseLoader):
+        self.html_loader = html_loader
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = self.html_loader.get_source(environment, template)
+        return text_skeleton(source), filename, uptodate
+
+    def list_templates(self):
+        return self.html_loader.list_templates()
+
+
+class EmailTemplates:
+    """
+    Registry of precompiled email templates (app/templates/email).
+    Every template is compiled twice at startup: the HTML itself (autoescaped)
+    and its plain-text skeleton, so a send renders both without re-parsing
+    templates or regex-stripping HTML.
+    """
+    _html: Dict[str, Template] = {}
+    _text: Dict[str, Template] = {}
+
+    @staticmethod
+    def _environment(loader: BaseLoader, autoescape) -> Environment:
+        env = Environment(loader=loader, autoescape=autoescape, undefined=StrictUndefined, trim_blocks=True, lstrip_blocks=True)
+        env.filters['money'] = money
+        env.globals['settings'] = settings
+        return env
+
+    @classmethod
+    def load(cls):
+        """Compile every template (called on app startup; render() loads lazily otherwise)"""
+        html_loader = FileSystemLoader(str(TEMPLATE_DIR))
+        html_env = cls._environment(html_loader, select_autoescape(['html']))
+        text_env = cls._environment(TextSkeletonLoader(html_loader), False)
+
+        html, text = {}, {}
+        for name in html_loader.list_templates():
+            if name.startswith('_'):
+                continue  # partials are compiled into the templates that include them
+            html[name] = html_env.get_template(name)
+            text[name] = text_env.get_template(name)
+        cls._html, cls._text = html, text
+
+    @classmethod
+    def render(cls, name: str, **context) -> RenderedEmail:
+        """Render a template's HTML and plain-text parts"""
+        if not cls._html:
+            cls.load()
+        return RenderedEmail(cls._html[name].render(**context), cls._text[name].render(**context))
+
 
 def get_welcome_email(user_name: str) -> str:
     """Welcome email template for new users"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: #2c5aa0; color: white; padding: 20px; text-align: center; }}
-            .content {{ padding: 20px; background: #f9f9f9; }}
-            .button {{ background: #27ae60; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block; margin: 15px 0; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Welcome to Crown Mega Store! 🎉</h1>
-            </div>
-            
-            <div class="content">
-                <p>Hi <strong>{user_name}</strong>,</p>
-                
-                <p>Thank you for joining Crown Mega Store! We're excited to have you as part of our community.</p>
-                
-                <p>Here's what you can do now:</p>
-                <ul>
-                    <li>Browse our wide selection of products</li>
-                    <li>Get personalized product recommendations</li>
-                    <li>Track your orders in real-time</li>
-                    <li>Enjoy exclusive deals and offers</li>
-                </ul>
-                
-                <a href="https://crownmegastore.com/shop" class="button">Start Shopping</a>
-                
-                <p>If you have any questions, feel free to reach out to us!</p>
-                
-                <p>Happy shopping!<br>
-                The Crown Mega Store Team</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return EmailTemplates.render('welcome.html', user_name=user_name).html
 
 def get_password_reset_email(user_name: str, reset_link: str) -> str:
     """Password reset email template"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: #2c5aa0; color: white; padding: 20px; text-align: center; }}
-            .content {{ padding: 20px; background: #f9f9f9; }}
-            .button {{ background: #e74c3c; color: white; padding: 12px 24px; text-decoration: none; border-radius: 5px; display: inline-block; margin: 15px 0; }}
-            .warning {{ background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 15px 0; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>Password Reset Request</h1>
-            </div>
-            
-            <div class="content">
-                <p>Hi <strong>{user_name}</strong>,</p>
-                
-                <p>We received a request to reset your password. Click the button below to create a new password:</p>
-                
-                <a href="{reset_link}" class="button">Reset Password</a>
-                
-                <div class="warning">
-                    <strong>⚠️ Security Notice:</strong><br>
-                    This link will expire in 1 hour. If you didn't request this reset, please ignore this email.
-                </div>
-                
-                <p>Or copy and paste this link into your browser:</p>
-                <p style="word-break: break-all;">{reset_link}</p>
-                
-                <p>Best regards,<br>
-                Crown Mega Store Security Team</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return EmailTemplates.render('password_reset.html', user_name=user_name, reset_link=reset_link).html
 
 def get_order_shipped_email(order_data: Dict[str, Any]) -> str:
     """Order shipped notification email template"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: #27ae60; color: white; padding: 20px; text-align: center; }}
-            .content {{ padding: 20px; background: #f9f9f9; }}
-            .tracking-box {{ background: white; padding: 20px; border-radius: 5px; margin: 15px 0; text-align: center; }}
-            .tracking-number {{ font-size: 24px; font-weight: bold; color: #2c5aa0; letter-spacing: 2px; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🚚 Your Order is On The Way!</h1>
-            </div>
-            
-            <div class="content">
-                <p>Hi <strong>{order_data.get('customer_name')}</strong>,</p>
-                
-                <p>Great news! Your order <strong>#{order_data.get('order_id')}</strong> has been shipped and is on its way to you!</p>
-                
-                <div class="tracking-box">
-                    <p style="margin: 0; color: #666;">Tracking Number:</p>
-                    <p class="tracking-number">{order_data.get('tracking_number', 'N/A')}</p>
-                </div>
-                
-                <p><strong>Estimated Delivery:</strong> {order_data.get('estimated_delivery', '2-3 business days')}</p>
-                
-                <p><strong>Order Summary:</strong></p>
-                <ul>
-                    <li>Order Total: ${order_data.get('total', 0):.2f}</li>
-                    <li>Delivery Address: {order_data.get('delivery_address', 'N/A')}</li>
-                </ul>
-                
-                <p>Thank you for shopping with Crown Mega Store!</p>
-                
-                <p>Best regards,<br>
-                Crown Mega Store Team</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return EmailTemplates.render('order_shipped.html', data=order_data).html
 
 def get_low_stock_alert_email(product_data: Dict[str, Any]) -> str:
     """Low stock alert email for admin"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: #e74c3c; color: white; padding: 20px; text-align: center; }}
-            .content {{ padding: 20px; background: #f9f9f9; }}
-            .alert {{ background: #fff3cd; padding: 15px; border-left: 4px solid #ffc107; margin: 15px 0; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>⚠️ Low Stock Alert</h1>
-            </div>
-            
-            <div class="content">
-                <p>Hi Admin,</p>
-                
-                <div class="alert">
-                    <strong>Action Required:</strong> The following product is running low on stock.
-                </div>
-                
-                <p><strong>Product Details:</strong></p>
-                <ul>
-                    <li>Name: {product_data.get('name')}</li>
-                    <li>Category: {product_data.get('category')}</li>
-                    <li>Current Stock: <strong style="color: #e74c3c;">{product_data.get('stock_quantity')} units</strong></li>
-                    <li>Price: ${product_data.get('price', 0):.2f}</li>
-                </ul>
-                
-                <p>Consider restocking this item to avoid running out.</p>
-                
-                <p>Crown Mega Store Inventory System</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
+    return EmailTemplates.render('low_stock_alert.html', products=[product_data]).html
 
 def get_promotional_email(promo_data: Dict[str, Any]) -> str:
     """Promotional email template"""
-    return f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px; text-align: center; }}
-            .content {{ padding: 20px; background: #f9f9f9; }}
-            .promo-box {{ background: #fff3cd; padding: 20px; border-radius: 10px; text-align: center; margin: 20px 0; }}
-            .promo-code {{ font-size: 28px; font-weight: bold; color: #e74c3c; letter-spacing: 3px; }}
-            .button {{ background: #27ae60; color: white; padding: 15px 30px; text-decoration: none; border-radius: 5px; display: inline-block; margin: 15px 0; font-weight: bold; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <h1>🎉 {promo_data.get('title', 'Special Offer Just For You!')}</h1>
-            </div>
-            
-            <div class="content">
-                <p>Hi there! 👋</p>
-                
-                <p>{promo_data.get('message', 'We have an exclusive offer just for you!')}</p>
-                
-                <div class="promo-box">
-                    <p style="margin: 0; color: #666; font-size: 14px;">Use Promo Code:</p>
-                    <p class="promo-code">{promo_data.get('promo_code', 'SAVE20')}</p>
-                    <p style="margin: 0; color: #666;">Get {promo_data.get('discount', '20')}% OFF</p>
-                </div>
-                
-                <p><strong>Offer Valid Until:</strong> {promo_data.get('expiry_date', 'Limited Time')}</p>
-                
-                <div style="text-align: center;">
-                    <a href="{promo_data.get('shop_link', 'https://crownmegastore.com')}" class="button">Shop Now</a>
-                </div>
-                
-                <p style="font-size: 12px; color: #666;">
-                    Terms and conditions apply. This offer cannot be combined with other promotions.
-                </p>
-                
-                <p>Happy Shopping!<br>
-                Crown Mega Store Team</p>
-            </div>
-        </div>
-    </body>
-    </html>
-    """
\ No newline at end of file
+    return EmailTemplates.render('promotional.html', data=promo_data).html
@@ -0,0 +1,65 @@
+from typing import Iterable
+import hashlib
+import math
+
+
+class HyperLogLog:
+    """
+    Cardinality sketch: estimates how many distinct values were added using
+    2**precision one-byte registers (1 KB at precision 10, ~3% standard error)
+    no matter how many values go in. Sketches with the same precision merge
+    by taking the register-wise maximum.
+    """
+
+    def __init__(self, precision: int = 10):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(self.size)
+
+    def add(self, value: str):
+        """Add one value (e.g. a viewer id)"""
+        x = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), 'big')
+        index = x >> (64 - self.precision)
+        rest = x & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1 bit in the remaining 64 - p bits
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        """Fold another sketch into this one (union of the two value sets)"""
+        if other.precision != self.precision:
+            raise ValueError('Cannot merge sketches with different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    @classmethod
+    def from_bytes(cls, registers: bytes) -> 'HyperLogLog':
+        """Sketch from registers saved with bytes(sketch.registers)"""
+        precision = len(registers).bit_length() - 1
+        if len(registers) != 1 << precision:
+            raise ValueError('register count must be a power of two')
+        sketch = cls(precision)
+        sketch.registers = bytearray(registers)
+        return sketch
+
+    @classmethod
+    def union(cls, sketches: Iterable['HyperLogLog'], precision: int = 10) -> 'HyperLogLog':
+        """New sketch covering every value in sketches"""
+        merged = cls(precision)
+        for sketch in sketches:
+            merged.merge(sketch)
+        return merged
+
+    def estimate(self) -> int:
+        """Estimated number of distinct values added"""
+        m = self.size
+        alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+        raw = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small cardinalities: linear counting over empty registers is more accurate
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(raw)
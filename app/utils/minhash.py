@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from array import array
+import hashlib
+import random
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+PRIME = (1 << 61) - 1
+
+
+class MinHashLSH:
+    """
+    Near-duplicate index over sets (e.g. each user's purchased products).
+    Every set gets a MinHash signature of bands * rows values; two sets agree
+    on any one value with probability equal to their Jaccard similarity.
+    Signatures are split into bands, and sets whose band values are all
+    equal share a bucket, so a query only compares sets that collide in some
+    band. The chance that two sets collide is 1 - (1 - J**rows)**bands, which
+    rises steeply around J = (1 / bands) ** (1 / rows).
+    Adding an item only lowers signature values, so sets grow incrementally.
+    """
+
+    def __init__(self, bands: int = 32, rows: int = 2, seed: int = 1):
+        self.bands = bands
+        self.rows = rows
+        rng = random.Random(seed)
+        self._coefficients = [(rng.randrange(1, PRIME), rng.randrange(0, PRIME)) for _ in range(bands * rows)]
+        self._sets: Dict[str, Set[str]] = {}
+        self._signatures: Dict[str, array] = {}
+        self._buckets: Dict[int, Set[str]] = {}
+        # Items are products, so the same few thousand hash vectors come up again and again
+        self._item_hashes: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def _hashes(self, item: str) -> array:
+        hashes = self._item_hashes.get(item)
+        if hashes is None:
+            x = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), 'big')
+            hashes = self._item_hashes[item] = array('Q', [(a * x + b) % PRIME for a, b in self._coefficients])
+        return hashes
+
+    def _bands(self, signature: array) -> List[int]:
+        """One bucket key per band (the band number is part of the key)"""
+        return [hash((band, *signature[band * self.rows:(band + 1) * self.rows])) for band in range(self.bands)]
+
+    def _reindex(self, key: str, old: Optional[array], new: array):
+        """Move key to the buckets of the bands that changed"""
+        old_bands = self._bands(old) if old else [None] * self.bands
+        for before, after in zip(old_bands, self._bands(new)):
+            if before == after:
+                continue
+            if before is not None:
+                bucket = self._buckets.get(before)
+                if bucket is not None:
+                    bucket.discard(key)
+                    if not bucket:
+                        del self._buckets[before]
+            self._buckets.setdefault(after, set()).add(key)
+
+    def add(self, key: str, items: Iterable[str]):
+        """Add items to key's set"""
+        current = self._sets.setdefault(key, set())
+        new_items = [item for item in items if item not in current]
+        if not new_items:
+            return
+        current.update(new_items)
+
+        old = self._signatures.get(key)
+        vectors = [self._hashes(item) for item in new_items]
+        if old:
+            vectors.append(old)
+        signature = array('Q', map(min, zip(*vectors)))
+        self._signatures[key] = signature
+        self._reindex(key, old, signature)
+
+    def keys(self) -> List[str]:
+        return list(self._sets)
+
+    def items(self, key: str) -> Set[str]:
+        return self._sets.get(key, set())
+
+    def query(self, key: str, min_similarity: float, limit: int, max_candidates: int = 1000) -> List[Tuple[str, float]]:
+        """
+        Keys whose sets have exact Jaccard similarity >= min_similarity with
+        key's set, best first. Only bucket collisions are compared, at most
+        max_candidates of them.
+        """
+        signature = self._signatures.get(key)
+        if not signature:
+            return []
+        target = self._sets[key]
+
+        candidates: Set[str] = set()
+        for bucket_key in self._bands(signature):
+            candidates.update(self._buckets.get(bucket_key, ()))
+            if len(candidates) >= max_candidates:
+                break
+        candidates.discard(key)
+
+        matches = []
+        for other in candidates:
+            other_set = self._sets[other]
+            similarity = len(target & other_set) / len(target | other_set)
+            if similarity >= min_similarity:
+                matches.append((other, similarity))
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches[:limit]
@@ -0,0 +1,79 @@
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicWorker:
+    """
+    Background task that runs step() over and over on the event loop.
+    After each step it waits interval() seconds, or until wake() is called;
+    an interval of None waits for wake() alone. A step that returns True has
+    more work waiting and runs again straight away. A failing step is logged
+    and retried after the usual wait. stop() cancels the task and then awaits
+    on_stop, for a final flush of whatever is still buffered.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        step: Callable[[], Awaitable[Any]],
+        interval: Callable[[], Optional[float]],
+        run_first: bool = True,
+        on_stop: Optional[Callable[[], Awaitable]] = None
+    ):
+        self.name = name
+        self.step = step
+        self.interval = interval
+        self.run_first = run_first
+        self.on_stop = on_stop
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start the task (called on app startup); a no-op if it is already running"""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def wake(self):
+        """Cut the current wait short so the next step runs now"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Cancel the task, then run on_stop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        if self.on_stop is not None:
+            await self.on_stop()
+
+    async def _wait(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval())
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def _run(self):
+        if not self.run_first:
+            await self._wait()
+        while True:
+            try:
+                if await self.step() is True:
+                    continue
+            except Exception as e:
+                logger.error(f"{self.name} failed, will retry: {str(e)}")
+            await self._wait()
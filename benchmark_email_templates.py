@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Email Template Benchmark Script
+Compares the precompiled EmailTemplates registry (HTML and plain text both
+rendered from compiled templates) with the code it replaced: the f-string
+format_order_email_* builders plus the re.sub text part every provider
+derived at send time (benchmark_email_templates_legacy.py).
+
+Usage:  python benchmark_email_templates.py [renders]
+"""
+
+import sys
+import os
+import time
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.email_templates import EmailTemplates
+from app.services.email_service import EmailService
+from benchmark_email_templates_legacy import LegacyEmailService, plain_text
+
+
+def sample_order(items: int = 5) -> dict:
+    order_items = [{
+        'product_name': f'Product {i}',
+        'quantity': i + 1,
+        'price': 2500.0,
+        'subtotal': 2500.0 * (i + 1)
+    } for i in range(items)]
+    return {
+        'order_id': 'ORD-20250101-ABC123',
+        'items': order_items,
+        'customer_info': {
+            'name': 'Test Customer',
+            'email': 'customer@example.com',
+            'phone': '+2348012345678',
+            'payment_preference': 'bank_transfer',
+            'delivery_address': '12 Test Street, Lagos',
+            'order_notes': 'Please call before delivery'
+        },
+        'total': sum(item['subtotal'] for item in order_items),
+        'created_at': '2025-01-01 12:00:00'
+    }
+
+
+def run(label: str, render, renders: int) -> float:
+    start = time.perf_counter()
+    for _ in range(renders):
+        render()
+    elapsed = time.perf_counter() - start
+    rate = renders / elapsed
+    print(f"{label:<34} {renders} renders in {elapsed:.2f}s  ->  {rate:,.0f} renders/s")
+    return rate
+
+
+def main():
+    renders = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print("=" * 70)
+    print("CROWN MEGA STORE - EMAIL TEMPLATE BENCHMARK")
+    print("=" * 70)
+    print("Order emails with 5 items, HTML + plain text\n")
+
+    order = sample_order()
+    EmailTemplates.load()
+
+    for audience, legacy_format, render in [
+        ('business', LegacyEmailService.format_order_email_business, EmailService.render_order_email_business),
+        ('customer', LegacyEmailService.format_order_email_customer, EmailService.render_order_email_customer),
+    ]:
+        def legacy():
+            html = legacy_format(order)
+            return html, plain_text(html)
+
+        def precompiled():
+            return render(order)
+
+        baseline = run(f'{audience}: f-string + re.sub', legacy, renders)
+        compiled = run(f'{audience}: precompiled', precompiled, renders)
+        print(f"   precompiled / previous: {compiled / baseline:.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+SMTP Pool Benchmark Script
+Compares connect-per-send (aiosmtplib.send) with the pooled connections used
+by EmailService.send_email_via_smtp, against a local aiosmtpd sink.
+
+Requires aiosmtpd (development only):  pip install aiosmtpd
+Usage:  python benchmark_smtp_pool.py [messages] [concurrency]
+
+The local sink has no TLS, no AUTH and no network latency, so the gap measured
+here is a lower bound; against Gmail each new connection also pays STARTTLS
+and AUTH round-trips.
+"""
+
+import asyncio
+import sys
+import os
+import time
+from email.mime.text import MIMEText
+
+# Add the project root to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import aiosmtplib
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    # Development-only dependency, deliberately left out of requirements.txt
+    print('Skipping SMTP pool benchmark: aiosmtpd is not installed (pip install aiosmtpd)', file=sys.stderr)
+    sys.exit(0)
+
+from app.services.smtp_pool import SMTPConnectionPool
+
+HOST = '127.0.0.1'
+PORT = 8025
+
+
+class SinkHandler:
+    """Accept and drop every message"""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 OK'
+
+
+def build_message(i: int) -> MIMEText:
+    message = MIMEText(f'<p>Benchmark message {i}</p>', 'html', 'utf-8')
+    message['Subject'] = f'Benchmark #{i}'
+    message['From'] = 'Crown Mega Store <bench@example.com>'
+    message['To'] = 'customer@example.com'
+    return message
+
+
+async def run(label: str, send, messages: int, concurrency: int) -> float:
+    limit = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with limit:
+            await send(build_message(i))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(messages)))
+    elapsed = time.perf_counter() - start
+    rate = messages / elapsed
+    print(f"{label:<20} {messages} messages in {elapsed:.2f}s  ->  {rate:,.0f} msg/s")
+    return rate
+
+
+async def benchmark(messages: int, concurrency: int):
+    print("=" * 60)
+    print("CROWN MEGA STORE - SMTP POOL BENCHMARK")
+    print("=" * 60)
+    print(f"Sink: {HOST}:{PORT}, concurrency: {concurrency}\n")
+
+    async def connect_per_send(message):
+        await aiosmtplib.send(message, hostname=HOST, port=PORT, start_tls=False, timeout=30)
+
+    pool = SMTPConnectionPool(hostname=HOST, port=PORT, start_tls=False, size=concurrency)
+
+    baseline = await run('connect-per-send', connect_per_send, messages, concurrency)
+    pooled = await run('pooled', pool.send, messages, concurrency)
+    await pool.close()
+
+    print(f"\n📈 Pool speedup: {pooled / baseline:.1f}x")
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+
+    handler = SinkHandler()
+    controller = Controller(handler, hostname=HOST, port=PORT)
+    controller.start()
+    try:
+        asyncio.run(benchmark(messages, concurrency))
+    finally:
+        controller.stop()
+    print(f"Sink received {handler.received} messages")
+
+
+if __name__ == "__main__":
+    main()
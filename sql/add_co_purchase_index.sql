@@ -0,0 +1,3 @@
+-- Backs the paged purchase scan in CoPurchaseIndex.rebuild (app/services/co_purchase.py):
+-- WHERE activity_type = 'purchase' AND id > <last id> ORDER BY id LIMIT n
+CREATE INDEX IF NOT EXISTS idx_user_activities_purchase_id ON user_activities(id) WHERE activity_type = 'purchase';
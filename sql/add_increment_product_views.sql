@@ -0,0 +1,19 @@
+-- Batched, atomic view counter increments for the write-behind buffer in app/services/view_counter.py
+-- p_counts maps product id -> number of views since the last flush, e.g. {"<uuid>": 3, "<uuid>": 1}
+CREATE OR REPLACE FUNCTION increment_product_views(p_counts JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  updated_rows INTEGER;
+BEGIN
+  -- view_count = view_count + n happens under the row lock, so concurrent flushes never lose views;
+  -- the ranking score trigger recalculates balanced/popularity scores for the touched rows
+  UPDATE products p
+  SET view_count = COALESCE(p.view_count, 0) + c.value::INTEGER,
+      updated_at = NOW()
+  FROM jsonb_each_text(p_counts) AS c
+  WHERE p.id = c.key::UUID;
+
+  GET DIAGNOSTICS updated_rows = ROW_COUNT;
+  RETURN updated_rows;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,15 @@
+-- Indexes backing cursor (keyset) pagination. Cursor pages sort NULLs last in both
+-- directions (see app/utils/cursor.py), so nullable DESC columns need NULLS LAST indexes.
+
+-- Admin order listing: ORDER BY created_at DESC NULLS LAST, id DESC, optionally filtered by status
+DROP INDEX IF EXISTS idx_orders_created_at_id;
+DROP INDEX IF EXISTS idx_orders_status_created_at_id;
+CREATE INDEX IF NOT EXISTS idx_orders_created_at_id ON orders(created_at DESC NULLS LAST, id DESC);
+CREATE INDEX IF NOT EXISTS idx_orders_status_created_at_id ON orders(status, created_at DESC NULLS LAST, id DESC);
+
+-- Product listings use the (score/column, id) indexes from add_product_ranking_scores.sql;
+-- the scores are NOT NULL and price sorts ascending, where NULLS LAST is already the default
+DROP INDEX IF EXISTS idx_products_created_at;
+DROP INDEX IF EXISTS idx_products_rating;
+CREATE INDEX IF NOT EXISTS idx_products_created_at ON products(created_at DESC NULLS LAST, id);
+CREATE INDEX IF NOT EXISTS idx_products_rating ON products(rating DESC NULLS LAST, id);
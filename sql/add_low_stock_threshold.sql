@@ -0,0 +1,3 @@
+-- Per-product low stock threshold for the LowStockWatcher in app/services/stock_watcher.py
+-- NULL means LOW_STOCK_DEFAULT_THRESHOLD from the app settings
+ALTER TABLE products ADD COLUMN IF NOT EXISTS low_stock_threshold INTEGER CHECK (low_stock_threshold >= 0);
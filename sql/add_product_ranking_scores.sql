@@ -0,0 +1,37 @@
+-- Persist product ranking scores so every /api/products sort mode is an indexed ORDER BY ... LIMIT
+-- Formulas mirror ProductService.calculate_product_score
+ALTER TABLE products ADD COLUMN IF NOT EXISTS balanced_score NUMERIC NOT NULL DEFAULT 0;
+ALTER TABLE products ADD COLUMN IF NOT EXISTS popularity_score NUMERIC NOT NULL DEFAULT 0;
+
+-- Create function to keep the scores current
+CREATE OR REPLACE FUNCTION update_product_ranking_scores()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.popularity_score = (COALESCE(NEW.view_count, 0) * 0.3) + (COALESCE(NEW.order_count, 0) * 0.7);
+  NEW.balanced_score = (COALESCE(NEW.view_count, 0) * 0.2)
+    + (COALESCE(NEW.order_count, 0) * 0.4)
+    + (COALESCE(NEW.rating, 0) * 20)
+    + LEAST(COALESCE(NEW.stock_quantity, 0), 20)
+    + (CASE WHEN NEW.is_featured THEN 50 ELSE 0 END)
+    + (CASE WHEN NEW.is_new THEN 30 ELSE 0 END);
+  RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Recalculate whenever a field that feeds the scores changes
+DROP TRIGGER IF EXISTS update_product_ranking_scores ON products;
+CREATE TRIGGER update_product_ranking_scores
+  BEFORE INSERT OR UPDATE OF view_count, order_count, rating, stock_quantity, is_featured, is_new ON products
+  FOR EACH ROW EXECUTE PROCEDURE update_product_ranking_scores();
+
+-- Backfill existing rows (fires the trigger)
+UPDATE products SET view_count = view_count;
+
+-- Create indexes for each sort mode; id is the tie-breaker so pages are stable
+CREATE INDEX IF NOT EXISTS idx_products_balanced ON products(balanced_score DESC, id);
+CREATE INDEX IF NOT EXISTS idx_products_popularity ON products(popularity_score DESC, id);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products(price, id);
+CREATE INDEX IF NOT EXISTS idx_products_created_at ON products(created_at DESC, id);
+CREATE INDEX IF NOT EXISTS idx_products_rating ON products(rating DESC, id);
+CREATE INDEX IF NOT EXISTS idx_products_category_balanced ON products(category, balanced_score DESC, id);
+CREATE INDEX IF NOT EXISTS idx_products_category_popularity ON products(category, popularity_score DESC, id);
@@ -0,0 +1,116 @@
+-- Rank products on estimated distinct viewers instead of raw view_count
+-- (run after add_product_ranking_scores.sql). unique_views is written by UniqueViewCounter
+-- (app/services/unique_views.py) from HyperLogLog sketches over the last
+-- UNIQUE_VIEWS_WINDOW_HOURS; every product is on that one scale, and a product nobody
+-- viewed within the window scores 0 views. Rankings fill in over the first window.
+ALTER TABLE products ADD COLUMN IF NOT EXISTS unique_views INTEGER NOT NULL DEFAULT 0;
+-- Earlier versions of this script added the column as nullable
+UPDATE products SET unique_views = 0 WHERE unique_views IS NULL;
+ALTER TABLE products ALTER COLUMN unique_views SET DEFAULT 0;
+ALTER TABLE products ALTER COLUMN unique_views SET NOT NULL;
+
+-- Same formulas as ProductService.calculate_product_score
+CREATE OR REPLACE FUNCTION update_product_ranking_scores()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.popularity_score = (NEW.unique_views * 0.3) + (COALESCE(NEW.order_count, 0) * 0.7);
+  NEW.balanced_score = (NEW.unique_views * 0.2)
+    + (COALESCE(NEW.order_count, 0) * 0.4)
+    + (COALESCE(NEW.rating, 0) * 20)
+    + LEAST(COALESCE(NEW.stock_quantity, 0), 20)
+    + (CASE WHEN NEW.is_featured THEN 50 ELSE 0 END)
+    + (CASE WHEN NEW.is_new THEN 30 ELSE 0 END);
+  RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+-- Recalculate whenever a field that feeds the scores changes
+DROP TRIGGER IF EXISTS update_product_ranking_scores ON products;
+CREATE TRIGGER update_product_ranking_scores
+  BEFORE INSERT OR UPDATE OF unique_views, order_count, rating, stock_quantity, is_featured, is_new ON products
+  FOR EACH ROW EXECUTE PROCEDURE update_product_ranking_scores();
+
+-- Backfill existing rows (fires the trigger)
+UPDATE products SET unique_views = unique_views;
+
+-- HyperLogLog registers per product and time bucket (bucket = unix time / UNIQUE_VIEWS_BUCKET_HOURS),
+-- shared by every app instance and kept across restarts
+CREATE TABLE IF NOT EXISTS product_view_sketches (
+  product_id UUID NOT NULL REFERENCES products(id) ON DELETE CASCADE,
+  bucket BIGINT NOT NULL,
+  registers BYTEA NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  PRIMARY KEY (product_id, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_product_view_sketches_bucket ON product_view_sketches(bucket);
+
+-- Register-wise maximum of two sketches: the sketch of the union of their viewers.
+-- Sketches of different precision cannot be merged; the newer one (b) wins.
+CREATE OR REPLACE FUNCTION hll_register_max(a BYTEA, b BYTEA)
+RETURNS BYTEA AS $$
+DECLARE
+  merged BYTEA := b;
+BEGIN
+  IF a IS NULL OR length(a) <> length(b) THEN
+    RETURN b;
+  END IF;
+  FOR i IN 0 .. length(a) - 1 LOOP
+    IF get_byte(a, i) > get_byte(b, i) THEN
+      merged := set_byte(merged, i, get_byte(a, i));
+    END IF;
+  END LOOP;
+  RETURN merged;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+-- Merge one instance's changed sketches, drop buckets older than p_oldest_bucket and
+-- return every sketch still in the window, registers base64 encoded.
+-- p_sketches: [{"product_id": "<uuid>", "bucket": 20000, "registers": "<base64>"}, ...]
+-- Merging is a register-wise max, so concurrent instances and resent sketches never lose viewers.
+CREATE OR REPLACE FUNCTION merge_product_view_sketches(p_sketches JSONB, p_oldest_bucket BIGINT)
+RETURNS TABLE(product_id UUID, bucket BIGINT, registers TEXT) AS $$
+  INSERT INTO product_view_sketches AS s (product_id, bucket, registers, updated_at)
+  SELECT p.id, (k->>'bucket')::BIGINT, decode(k->>'registers', 'base64'), NOW()
+  FROM jsonb_array_elements(p_sketches) AS k
+  JOIN products p ON p.id = (k->>'product_id')::UUID
+  WHERE (k->>'bucket')::BIGINT >= p_oldest_bucket
+  ON CONFLICT (product_id, bucket) DO UPDATE
+  SET registers = hll_register_max(s.registers, EXCLUDED.registers),
+      updated_at = NOW();
+
+  DELETE FROM product_view_sketches s WHERE s.bucket < p_oldest_bucket;
+
+  SELECT s.product_id, s.bucket, replace(encode(s.registers, 'base64'), E'\n', '')
+  FROM product_view_sketches s;
+$$ LANGUAGE sql;
+
+-- Window estimates from UniqueViewCounter.flush, for every product with viewers in the window
+-- p_counts maps product id -> estimated distinct viewers, e.g. {"<uuid>": 42}; products not
+-- listed have no viewers left in the window and drop to 0. Only rows that change are written.
+CREATE OR REPLACE FUNCTION set_product_unique_views(p_counts JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+  updated_rows INTEGER;
+BEGIN
+  -- The ranking score trigger recalculates balanced/popularity scores for the touched rows
+  UPDATE products p
+  SET unique_views = COALESCE((p_counts->>p.id::TEXT)::INTEGER, 0)
+  WHERE p.unique_views <> COALESCE((p_counts->>p.id::TEXT)::INTEGER, 0);
+
+  GET DIAGNOSTICS updated_rows = ROW_COUNT;
+  RETURN updated_rows;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Enable RLS (Row Level Security)
+-- No policies: the sketches are only read and written through merge_product_view_sketches,
+-- which the backend calls with its service key (app/core/database.get_async_service_db)
+ALTER TABLE product_view_sketches ENABLE ROW LEVEL SECURITY;
+
+-- Both RPCs move product rankings, so clients must not call them; Supabase grants
+-- EXECUTE on new functions to anon and authenticated by default
+REVOKE EXECUTE ON FUNCTION merge_product_view_sketches(JSONB, BIGINT) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION set_product_unique_views(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION merge_product_view_sketches(JSONB, BIGINT) TO service_role;
+GRANT EXECUTE ON FUNCTION set_product_unique_views(JSONB) TO service_role;
@@ -0,0 +1,54 @@
+-- Checkout in one round-trip and one transaction: the order, all of its items,
+-- the initial status history entry, the product order_count bumps and the order emails,
+-- so a committed order always has its confirmation queued (run after create_email_outbox_table.sql).
+-- Called from OrderService.create_order with the service key (see app/core/database.py)
+-- p_order: order columns as JSON (same keys as the orders table)
+-- p_items: [{"product_id": ..., "product_name": ..., "quantity": ..., "price": ...}, ...]
+-- p_messages: email_outbox rows, [{"to_email": ..., "subject": ..., "html_content": ..., "text_content": ..., "max_attempts": ...}, ...]
+DROP FUNCTION IF EXISTS create_checkout_order(JSONB, JSONB);
+CREATE OR REPLACE FUNCTION create_checkout_order(p_order JSONB, p_items JSONB, p_messages JSONB DEFAULT '[]')
+RETURNS orders AS $$
+DECLARE
+  new_order orders;
+BEGIN
+  INSERT INTO orders (
+    order_id, user_id, customer_name, customer_email, customer_phone, delivery_address,
+    pickup_preference, order_notes, payment_preference, total, status, payment_confirmed,
+    created_at, updated_at
+  )
+  SELECT
+    o.order_id, o.user_id, o.customer_name, o.customer_email, o.customer_phone, o.delivery_address,
+    o.pickup_preference, o.order_notes, o.payment_preference, o.total, o.status, o.payment_confirmed,
+    NOW(), NOW()
+  FROM jsonb_populate_record(NULL::orders, p_order) AS o
+  RETURNING * INTO new_order;
+
+  INSERT INTO order_items (order_id, product_id, product_name, quantity, price, created_at)
+  SELECT new_order.id, i.product_id, i.product_name, i.quantity, i.price, NOW()
+  FROM jsonb_populate_recordset(NULL::order_items, p_items) AS i;
+
+  INSERT INTO order_status_history (order_id, status, updated_by, notes, created_at)
+  VALUES (new_order.id, new_order.status, 'system', 'Order created from website checkout', NOW());
+
+  -- One atomic increment per product, even if it appears on several lines
+  UPDATE products p
+  SET order_count = COALESCE(p.order_count, 0) + q.quantity,
+      updated_at = NOW()
+  FROM (
+    SELECT i.product_id, SUM(i.quantity) AS quantity
+    FROM jsonb_populate_recordset(NULL::order_items, p_items) AS i
+    GROUP BY i.product_id
+  ) AS q
+  WHERE p.id = q.product_id;
+
+  INSERT INTO email_outbox (to_email, subject, html_content, text_content, status, max_attempts)
+  SELECT m.to_email, m.subject, m.html_content, m.text_content, 'pending', COALESCE(m.max_attempts, 6)
+  FROM jsonb_populate_recordset(NULL::email_outbox, p_messages) AS m;
+
+  RETURN new_order;
+END;
+$$ LANGUAGE plpgsql;
+
+-- It writes the outbox, so clients must not be able to call it directly
+REVOKE EXECUTE ON FUNCTION create_checkout_order(JSONB, JSONB, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION create_checkout_order(JSONB, JSONB, JSONB) TO service_role;
@@ -0,0 +1,75 @@
+-- Promotional email campaigns sent to every user by the EmailCampaigns worker
+-- (app/services/email_campaigns.py).
+-- Recipients are read from users in id order; last_user_id is the checkpoint, so a
+-- campaign interrupted by a restart resumes after the last page it finished.
+-- status: pending -> running -> completed, or cancelled by an admin, or failed once
+-- max attempts claims in a row ended without finishing a page (attempts resets on progress)
+CREATE TABLE IF NOT EXISTS email_campaigns (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  subject TEXT NOT NULL,
+  promo_data JSONB NOT NULL DEFAULT '{}'::jsonb,
+  status TEXT NOT NULL DEFAULT 'pending',
+  last_user_id UUID,
+  sent_count INTEGER NOT NULL DEFAULT 0,
+  failed_count INTEGER NOT NULL DEFAULT 0,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  lease_expires_at TIMESTAMP WITH TIME ZONE,
+  last_error TEXT,
+  created_by UUID REFERENCES users(id),
+  started_at TIMESTAMP WITH TIME ZONE,
+  completed_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE email_campaigns ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_email_campaigns_runnable ON email_campaigns(created_at) WHERE status IN ('pending', 'running');
+
+-- Claim the oldest runnable campaign for one worker.
+-- The worker holds a lease for p_lease_seconds and extends it at every checkpoint;
+-- if the process dies, the lease runs out and another worker resumes from last_user_id.
+-- SKIP LOCKED keeps two app instances from sending the same campaign.
+-- Every claim counts an attempt; a campaign whose lease ran out on its last attempt is failed.
+DROP FUNCTION IF EXISTS claim_email_campaign(INTEGER);
+CREATE OR REPLACE FUNCTION claim_email_campaign(p_lease_seconds INTEGER, p_max_attempts INTEGER)
+RETURNS SETOF email_campaigns AS $$
+BEGIN
+  UPDATE email_campaigns
+  SET status = 'failed', lease_expires_at = NULL,
+      last_error = COALESCE(last_error, 'Lease expired on final attempt'), updated_at = NOW()
+  WHERE status = 'running' AND attempts >= p_max_attempts AND lease_expires_at <= NOW();
+
+  RETURN QUERY
+  UPDATE email_campaigns c
+  SET status = 'running',
+      attempts = c.attempts + 1,
+      started_at = COALESCE(c.started_at, NOW()),
+      lease_expires_at = NOW() + make_interval(secs => p_lease_seconds),
+      updated_at = NOW()
+  WHERE c.id IN (
+    SELECT id FROM email_campaigns
+    WHERE status IN ('pending', 'running')
+      AND (lease_expires_at IS NULL OR lease_expires_at <= NOW())
+    ORDER BY created_at
+    LIMIT 1
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING c.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Enable RLS (Row Level Security)
+-- No policies: an inserted row mails every customer, so campaigns are created and read only
+-- through the admin API, which uses the backend's service key (app/core/database.get_async_service_db)
+ALTER TABLE email_campaigns ENABLE ROW LEVEL SECURITY;
+
+-- Supabase grants EXECUTE on new functions to anon and authenticated by default
+REVOKE EXECUTE ON FUNCTION claim_email_campaign(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_email_campaign(INTEGER, INTEGER) TO service_role;
+
+-- Remove the client policies earlier versions of this script created
+DROP POLICY IF EXISTS "Allow read access to email_campaigns" ON email_campaigns;
+DROP POLICY IF EXISTS "Allow insert email_campaigns" ON email_campaigns;
+DROP POLICY IF EXISTS "Allow update email_campaigns" ON email_campaigns;
@@ -0,0 +1,66 @@
+-- Durable outbox for transactional email (order confirmations, status updates)
+-- Checkout queues its rows inside create_checkout_order; other requests insert them through
+-- EmailOutbox.enqueue, and the EmailOutbox worker in app/services/email_outbox.py sends them.
+-- status: pending -> sending -> sent, or back to pending with a backoff, or dead after max_attempts
+CREATE TABLE IF NOT EXISTS email_outbox (
+  id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+  to_email TEXT NOT NULL,
+  subject TEXT NOT NULL,
+  html_content TEXT NOT NULL,
+  text_content TEXT,
+  status TEXT NOT NULL DEFAULT 'pending',
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL DEFAULT 6,
+  next_attempt_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW(),
+  last_error TEXT,
+  sent_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due ON email_outbox(next_attempt_at) WHERE status IN ('pending', 'sending');
+CREATE INDEX IF NOT EXISTS idx_email_outbox_dead ON email_outbox(created_at DESC) WHERE status = 'dead';
+
+-- Claim up to p_limit due messages for one worker.
+-- Claimed rows are leased for p_lease_seconds: if the worker dies mid-send they become due again.
+-- SKIP LOCKED lets several app instances drain the outbox without sending a message twice.
+CREATE OR REPLACE FUNCTION claim_email_outbox(p_limit INTEGER, p_lease_seconds INTEGER)
+RETURNS SETOF email_outbox AS $$
+BEGIN
+  -- Leases that expired on the final attempt go to the dead-letter state
+  UPDATE email_outbox
+  SET status = 'dead', last_error = COALESCE(last_error, 'Lease expired on final attempt'), updated_at = NOW()
+  WHERE status = 'sending' AND attempts >= max_attempts AND next_attempt_at <= NOW();
+
+  RETURN QUERY
+  UPDATE email_outbox o
+  SET status = 'sending',
+      attempts = o.attempts + 1,
+      next_attempt_at = NOW() + make_interval(secs => p_lease_seconds),
+      updated_at = NOW()
+  WHERE o.id IN (
+    SELECT id FROM email_outbox
+    WHERE status IN ('pending', 'sending') AND next_attempt_at <= NOW()
+    ORDER BY next_attempt_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  )
+  RETURNING o.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Enable RLS (Row Level Security)
+-- No policies: rows hold customer addresses and order details, and anything inserted here
+-- gets mailed, so only the backend's service key (app/core/database.get_async_service_db),
+-- which bypasses RLS, may read or write them
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
+
+-- Supabase grants EXECUTE on new functions to anon and authenticated by default
+REVOKE EXECUTE ON FUNCTION claim_email_outbox(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_email_outbox(INTEGER, INTEGER) TO service_role;
+
+-- Remove the client policies earlier versions of this script created
+DROP POLICY IF EXISTS "Allow read access to email_outbox" ON email_outbox;
+DROP POLICY IF EXISTS "Allow insert email_outbox" ON email_outbox;
+DROP POLICY IF EXISTS "Allow update email_outbox" ON email_outbox;
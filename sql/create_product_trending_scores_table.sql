@@ -0,0 +1,58 @@
+-- Exponentially time-decayed activity scores per product for /api/recommendations/trending.
+-- Scores live in memory in each app instance (app/services/trending.py); this table is the
+-- shared checkpoint they merge into. score is the decayed value as of updated_at: an activity
+-- adds its weight (purchase 3, anything else 1) and loses half its weight every half-life.
+CREATE TABLE IF NOT EXISTS product_trending_scores (
+  product_id UUID PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+  score DOUBLE PRECISION NOT NULL DEFAULT 0,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Merge one instance's increments since its last checkpoint and return every current score.
+-- p_deltas maps product id -> decayed weight added since the last checkpoint, e.g. {"<uuid>": 4.2}
+-- Stored scores are decayed to NOW() before the delta is added, so concurrent instances never
+-- lose each other's activity; scores that decayed below p_min_score are dropped.
+CREATE OR REPLACE FUNCTION checkpoint_trending_scores(p_deltas JSONB, p_half_life_seconds DOUBLE PRECISION, p_min_score DOUBLE PRECISION)
+RETURNS TABLE(product_id UUID, score DOUBLE PRECISION) AS $$
+  INSERT INTO product_trending_scores AS t (product_id, score, updated_at)
+  SELECT p.id, d.value::DOUBLE PRECISION, NOW()
+  FROM jsonb_each_text(p_deltas) AS d
+  JOIN products p ON p.id = d.key::UUID
+  ON CONFLICT (product_id) DO UPDATE
+  SET score = t.score * exp(-ln(2) * extract(epoch FROM NOW() - t.updated_at) / p_half_life_seconds) + EXCLUDED.score,
+      updated_at = NOW();
+
+  DELETE FROM product_trending_scores t
+  WHERE t.score * exp(-ln(2) * extract(epoch FROM NOW() - t.updated_at) / p_half_life_seconds) < p_min_score;
+
+  SELECT t.product_id, t.score * exp(-ln(2) * extract(epoch FROM NOW() - t.updated_at) / p_half_life_seconds)
+  FROM product_trending_scores t;
+$$ LANGUAGE sql;
+
+-- Seed from the last 7 days of activity (48 hour half-life, the TRENDING_HALF_LIFE_HOURS default)
+INSERT INTO product_trending_scores (product_id, score, updated_at)
+SELECT a.product_id::UUID,
+       SUM(CASE WHEN a.activity_type = 'purchase' THEN 3 ELSE 1 END
+           * exp(-ln(2) * extract(epoch FROM NOW() - a.created_at::TIMESTAMP WITH TIME ZONE) / (48 * 3600))),
+       NOW()
+FROM user_activities a
+JOIN products p ON p.id = a.product_id::UUID
+WHERE a.created_at >= NOW() - INTERVAL '7 days'
+GROUP BY a.product_id
+ON CONFLICT (product_id) DO NOTHING;
+
+-- Enable RLS (Row Level Security)
+-- No policies: clients never read the table (the API serves trending from memory), and one that
+-- could write it would be able to push any product into /trending. The backend checkpoints
+-- with its service key (app/core/database.get_async_service_db), which bypasses RLS.
+ALTER TABLE product_trending_scores ENABLE ROW LEVEL SECURITY;
+
+-- Supabase grants EXECUTE on new functions to anon and authenticated by default
+REVOKE EXECUTE ON FUNCTION checkpoint_trending_scores(JSONB, DOUBLE PRECISION, DOUBLE PRECISION) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION checkpoint_trending_scores(JSONB, DOUBLE PRECISION, DOUBLE PRECISION) TO service_role;
+
+-- Remove the client policies earlier versions of this script created
+DROP POLICY IF EXISTS "Allow read access to product_trending_scores" ON product_trending_scores;
+DROP POLICY IF EXISTS "Allow insert product_trending_scores" ON product_trending_scores;
+DROP POLICY IF EXISTS "Allow update product_trending_scores" ON product_trending_scores;
+DROP POLICY IF EXISTS "Allow delete product_trending_scores" ON product_trending_scores;
@@ -0,0 +1,94 @@
+import os
+import time
+import pytest
+
+# Settings() requires these; unit tests never reach the services behind them
+for name in (
+    'FRONTEND_URL', 'BACKEND_URL', 'SUPABASE_URL', 'SUPABASE_KEY', 'SUPABASE_SERVICE_KEY',
+    'GOOGLE_CLIENT_ID', 'GOOGLE_CLIENT_SECRET', 'SECRET_KEY', 'SMTP_HOST', 'SMTP_USER',
+    'SMTP_PASSWORD', 'BUSINESS_EMAIL', 'SENDGRID_API_KEY', 'BUSINESS_WHATSAPP', 'BUSINESS_PHONE'
+):
+    os.environ.setdefault(name, 'test')
+os.environ.setdefault('SMTP_PORT', '587')
+
+
+class FakeResult:
+    def __init__(self, data=None):
+        self.data = data
+        self.count = None
+
+
+class FakeQuery:
+    """
+    Stand-in for a PostgREST request builder: filter and modifier calls are
+    recorded in ops and chain, execute() logs the query on the FakeDB and
+    returns what the test registered for it with FakeDB.on()
+    """
+
+    def __init__(self, db, name, params=None):
+        self.db = db
+        self.name = name
+        self.params = params
+        self.ops = []
+
+    def __getattr__(self, op):
+        def record(*args, **kwargs):
+            self.ops.append((op, args))
+            return self
+        return record
+
+    def op(self, name):
+        """Arguments of the first call to one builder method, e.g. query.op('update')"""
+        return next(args for op, args in self.ops if op == name)
+
+    async def execute(self):
+        self.db.calls.append(self)
+        response = self.db.responses.get(self.name)
+        if callable(response):
+            response = response(self)
+        if isinstance(response, Exception):
+            raise response
+        return FakeResult(response)
+
+
+class FakeDB:
+    """Async PostgREST client double; db.rpc(name, ...) and db.table(name) share one responses map"""
+
+    def __init__(self):
+        self.calls = []
+        self.responses = {}
+
+    def on(self, name, response):
+        """Data (or an exception to raise, or a callable taking the query) returned for an RPC or table"""
+        self.responses[name] = response
+
+    def rpc(self, name, params):
+        return FakeQuery(self, name, params)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def queries(self, name):
+        return [call for call in self.calls if call.name == name]
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """Returns install(*modules): routes the modules' database clients to one FakeDB"""
+    db = FakeDB()
+
+    def install(*modules):
+        for module in modules:
+            for getter in ('get_async_db', 'get_async_service_db'):
+                if hasattr(module, getter):
+                    monkeypatch.setattr(module, getter, lambda: db)
+        return db
+    return install
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.time(); tests move it forward with clock[0] += seconds"""
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: now[0])
+    return now
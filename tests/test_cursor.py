@@ -0,0 +1,37 @@
+from app.utils.cursor import decode_cursor, encode_cursor, keyset_filter
+import pytest
+
+
+@pytest.mark.parametrize('value', [19.99, 4, '2024-05-01T10:00:00+00:00', None, 'a,b("c")'])
+def test_cursor_round_trip(value):
+    cursor = encode_cursor('price_low', value, 'abc-123')
+    assert decode_cursor(cursor, 'price_low') == (value, 'abc-123')
+
+
+def test_cursor_for_another_sort_is_rejected():
+    cursor = encode_cursor('rating', 4.5, 'abc')
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 'price_low')
+
+
+def test_garbage_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor', 'rating')
+
+
+def test_filter_continues_into_trailing_nulls():
+    assert keyset_filter('rating', 4.5, 'abc', desc=True) == (
+        'rating.lt."4.5",and(rating.eq."4.5",id.gt."abc"),rating.is.null'
+    )
+
+
+def test_filter_after_a_null_only_advances_the_id():
+    assert keyset_filter('created_at', None, 'abc', desc=True, id_desc=True) == (
+        'and(created_at.is.null,id.lt."abc")'
+    )
+
+
+def test_filter_quotes_reserved_characters():
+    assert keyset_filter('name', 'a,"b"', 'x', desc=False) == (
+        r'name.gt."a,\"b\"",and(name.eq."a,\"b\"",id.gt."x"),name.is.null'
+    )
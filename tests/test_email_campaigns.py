@@ -0,0 +1,49 @@
+from app.services import email_campaigns
+from app.services.email_campaigns import EmailCampaigns
+from app.services.email_providers import EmailProviderError
+from app.core.config import settings
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def db(fake_db, monkeypatch):
+    db = fake_db(email_campaigns)
+    db.on('email_campaigns', [{'id': 'c1'}])
+    monkeypatch.setattr(settings, 'CAMPAIGN_MAX_ATTEMPTS', 3)
+    return db
+
+
+def claim(db, monkeypatch, attempts, send):
+    db.on('claim_email_campaign', [{'id': 'c1', 'subject': 'Sale', 'attempts': attempts}])
+    monkeypatch.setattr(EmailCampaigns, 'send', classmethod(lambda cls, campaign: send(campaign)))
+    assert asyncio.run(EmailCampaigns.process_next())
+    return [query.op('update')[0] for query in db.queries('email_campaigns')]
+
+
+def test_failure_before_the_last_attempt_leaves_the_campaign_to_resume(db, monkeypatch):
+    async def send(campaign):
+        raise EmailProviderError('all providers down')
+
+    updates = claim(db, monkeypatch, 2, send)
+    assert updates == [{'last_error': 'all providers down'}]
+    assert db.queries('claim_email_campaign')[0].params['p_max_attempts'] == 3
+
+
+def test_failure_on_the_last_attempt_marks_the_campaign_failed(db, monkeypatch):
+    async def send(campaign):
+        raise EmailProviderError('all providers down')
+
+    updates = claim(db, monkeypatch, 3, send)
+    assert len(updates) == 1
+    assert updates[0]['status'] == 'failed'
+    assert updates[0]['lease_expires_at'] is None
+
+
+def test_progress_resets_the_attempt_count(db, monkeypatch):
+    async def send(campaign):
+        campaign['attempts'] = 0  # As send() does after each finished page
+        raise EmailProviderError('all providers down')
+
+    updates = claim(db, monkeypatch, 3, send)
+    assert updates == [{'last_error': 'all providers down'}]
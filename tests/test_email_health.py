@@ -0,0 +1,87 @@
+from app.services import email_health
+from app.services.email_health import CLOSED, HALF_OPEN, OPEN, EmailProviderHealth, ProviderHealth
+from app.core.config import settings
+import pytest
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(email_health.time, 'monotonic', lambda: now[0])
+    monkeypatch.setattr(EmailProviderHealth, '_providers', {})
+    return now
+
+
+def trip(health):
+    for _ in range(settings.EMAIL_BREAKER_FAILURE_THRESHOLD):
+        health.record(False, 0.1)
+
+
+def test_consecutive_failures_open_the_breaker(clock):
+    health = ProviderHealth('resend')
+    health.record(False, 0.1)
+    assert health.state == CLOSED
+    trip(health)
+    assert health.state == OPEN
+    assert not health.ready()
+
+
+def test_half_open_allows_one_probe_then_closes(clock):
+    health = ProviderHealth('resend')
+    trip(health)
+    clock[0] += settings.EMAIL_BREAKER_OPEN_SECONDS
+
+    assert health.ready()
+    assert health.state == HALF_OPEN
+    assert health.claim()
+    assert not health.claim()  # A second concurrent send does not get the probe
+    assert not health.ready()
+
+    health.record(True, 0.1)
+    assert health.state == CLOSED and health.claim()
+
+
+def test_failed_probe_reopens(clock):
+    health = ProviderHealth('resend')
+    trip(health)
+    clock[0] += settings.EMAIL_BREAKER_OPEN_SECONDS
+    assert health.claim()
+    health.record(False, 0.1)
+    assert health.state == OPEN and not health.ready()
+
+
+def test_order_claims_nothing_so_untried_probes_stay_available(clock):
+    names = ['resend', 'smtp', 'sendgrid']
+    for name in names:
+        trip(EmailProviderHealth.get(name))
+    clock[0] += settings.EMAIL_BREAKER_OPEN_SECONDS
+
+    # The first probe succeeds and the send stops there, as send_email does
+    first = EmailProviderHealth.order(names)[0]
+    assert EmailProviderHealth.get(first).claim()
+    EmailProviderHealth.get(first).record(True, 0.1)
+
+    assert sorted(EmailProviderHealth.order(names)) == sorted(names)
+    for name in names:
+        assert EmailProviderHealth.get(name).ready()
+
+
+def test_order_puts_probes_first_then_preferred_then_best_score(clock):
+    names = ['resend', 'smtp', 'sendgrid']
+    EmailProviderHealth.get('sendgrid').record(True, 0.1)
+    EmailProviderHealth.get('smtp').record(True, 4.0)
+    assert EmailProviderHealth.order(names) == ['resend', 'sendgrid', 'smtp']
+
+    trip(EmailProviderHealth.get('sendgrid'))
+    assert EmailProviderHealth.order(names) == ['resend', 'smtp']
+    clock[0] += settings.EMAIL_BREAKER_OPEN_SECONDS
+    assert EmailProviderHealth.order(names)[0] == 'sendgrid'
+
+
+def test_all_open_returns_every_provider_as_last_resort(clock):
+    names = ['resend', 'smtp']
+    for name in names:
+        trip(EmailProviderHealth.get(name))
+    assert EmailProviderHealth.order(names) == names
+    # Open (not half-open) breakers hold no probe, so a last-resort send may go ahead
+    assert EmailProviderHealth.get('resend').claim()
@@ -0,0 +1,60 @@
+from app.services.email_service import EmailService
+from app.utils.email_templates import EmailTemplates, html_to_text, text_skeleton, HEAD
+from html import unescape
+import pytest
+
+
+def sample_order(items=3):
+    order_items = [{'product_name': f'Product {i}', 'quantity': i + 1, 'price': 2500.0} for i in range(items)]
+    return {
+        'order_id': 'ORD-20250101-ABC123',
+        'items': order_items,
+        'customer_info': {
+            'name': 'Ada & Co <Lagos>',
+            'email': 'customer@example.com',
+            'phone': '+2348012345678',
+            'payment_preference': 'bank_transfer',
+            'delivery_address': '12 Test Street, Lagos',
+            'order_notes': 'Please call before delivery'
+        },
+        'total': sum(item['price'] * item['quantity'] for item in order_items),
+        'created_at': '2025-01-01 12:00:00'
+    }
+
+
+RENDERS = {
+    'order_business': lambda: EmailService.render_order_email_business(sample_order()),
+    'order_customer': lambda: EmailService.render_order_email_customer(sample_order()),
+    'order_digest': lambda: EmailService.render_order_digest_email([sample_order(1), sample_order(2)]),
+    'status_update': lambda: EmailService.render_status_update_email(
+        {'order_id': 'ORD-20250101-ABC123', 'customer_name': 'Ada', 'total': 7500.0}, 'shipped', 'On its way'
+    )[1],
+    'low_stock_alert': lambda: EmailTemplates.render('low_stock_alert.html', products=[{'name': 'Kettle', 'category': 'Home', 'stock_quantity': 2, 'price': 100}]),
+    'promotional': lambda: EmailTemplates.render('promotional.html', data={'title': 'Sale', 'discount': 30}),
+    'welcome': lambda: EmailTemplates.render('welcome.html', user_name='Ada'),
+}
+
+
+def characters(text):
+    # Whitespace is where the two differ on purpose: the text part breaks lines at block ends
+    return ''.join(text.split())
+
+
+@pytest.mark.parametrize('name', sorted(RENDERS))
+def test_text_part_matches_the_stripped_html(name):
+    rendered = RENDERS[name]()
+    # html_to_text keeps <head> (CSS) and entities; the text part drops the one and decodes the other
+    assert characters(rendered.text) == characters(unescape(html_to_text(HEAD.sub('', rendered.html))))
+
+
+def test_text_part_keeps_line_breaks_between_blocks():
+    text = RENDERS['order_customer']().text
+    assert '\n' in text
+    assert 'Ada & Co <Lagos>' in text  # Not HTML-escaped in the plain part
+
+
+def test_skeleton_keeps_jinja_and_drops_markup():
+    source = '<head><style>p { color: red; }</style></head><p>Hi <b>{{ name }}</b></p>{% for i in items %}<li>{{ i }}</li>{% endfor %}'
+    skeleton = text_skeleton(source)
+    assert 'color' not in skeleton and '<' not in skeleton
+    assert '{{ name }}' in skeleton and '{% for i in items %}' in skeleton
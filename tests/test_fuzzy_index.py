@@ -0,0 +1,25 @@
+from app.services.fuzzy_index import TrigramIndex, trigrams
+
+
+def test_trigrams_are_padded_like_pg_trgm():
+    assert trigrams('cat') == {'  c', ' ca', 'cat', 'at '}
+
+
+def test_misspelling_finds_product():
+    index = TrigramIndex()
+    index.upsert({'id': 'a', 'name': 'Samsung Galaxy', 'category': 'Phones'})
+    index.upsert({'id': 'b', 'name': 'Nokia Lumia', 'category': 'Phones'})
+
+    assert [product_id for product_id, _ in index.search('samsnug')] == ['a']
+    assert index.search('xyz') == []
+
+
+def test_remove_drops_words_no_other_product_uses():
+    index = TrigramIndex()
+    index.upsert({'id': 'a', 'name': 'Red kettle', 'category': 'Kitchen'})
+    index.upsert({'id': 'b', 'name': 'Red mug', 'category': 'Kitchen'})
+    index.remove('a')
+
+    assert 'kettle' not in index.word_products
+    assert not any('kettle' in words for words in index.trigram_words.values())
+    assert index.word_products['red'] == {'b'}
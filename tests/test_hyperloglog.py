@@ -0,0 +1,43 @@
+from app.utils.hyperloglog import HyperLogLog
+import pytest
+
+
+@pytest.mark.parametrize('count', [10, 1000, 50000])
+def test_estimate_within_error_bound(count):
+    sketch = HyperLogLog(precision=10)
+    for i in range(count):
+        sketch.add(f'viewer-{i}')
+    # Standard error at precision 10 is ~3.3%; allow three of them
+    assert abs(sketch.estimate() - count) <= 0.1 * count
+
+
+def test_duplicates_count_once():
+    sketch = HyperLogLog(precision=10)
+    for _ in range(5):
+        for i in range(200):
+            sketch.add(f'viewer-{i}')
+    assert abs(sketch.estimate() - 200) <= 20
+
+
+def test_union_matches_sketch_of_all_values():
+    a, b, both = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+    for i in range(3000):
+        (a if i % 2 else b).add(str(i))
+        both.add(str(i))
+    assert HyperLogLog.union([a, b], 10).registers == both.registers
+
+
+def test_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
+    with pytest.raises(ValueError):
+        HyperLogLog(3)
+
+
+def test_registers_round_trip():
+    sketch = HyperLogLog(8)
+    for i in range(500):
+        sketch.add(f'viewer-{i}')
+    restored = HyperLogLog.from_bytes(bytes(sketch.registers))
+    assert restored.precision == 8
+    assert restored.estimate() == sketch.estimate()
@@ -0,0 +1,47 @@
+from app.utils.minhash import MinHashLSH
+import random
+
+
+def test_identical_sets_always_collide():
+    index = MinHashLSH(bands=32, rows=2)
+    index.add('a', ['p1', 'p2', 'p3'])
+    index.add('b', ['p3', 'p2', 'p1'])
+    index.add('c', ['p7', 'p8'])
+    assert index.query('a', min_similarity=0.2, limit=10) == [('b', 1.0)]
+
+
+def test_incremental_add_matches_adding_all_at_once():
+    incremental, at_once = MinHashLSH(), MinHashLSH()
+    for item in ['p1', 'p2', 'p3', 'p4']:
+        incremental.add('a', [item])
+    at_once.add('a', ['p1', 'p2', 'p3', 'p4'])
+
+    assert incremental._signatures['a'] == at_once._signatures['a']
+    assert incremental._buckets == at_once._buckets
+    assert incremental.items('a') == {'p1', 'p2', 'p3', 'p4'}
+
+
+def test_query_uses_exact_jaccard_and_threshold():
+    index = MinHashLSH(bands=64, rows=1)
+    index.add('a', ['p1', 'p2', 'p3', 'p4'])
+    index.add('b', ['p1', 'p2', 'p3', 'p5'])  # 3 / 5
+    index.add('c', ['p1', 'p9'])  # 1 / 5
+    assert index.query('a', min_similarity=0.5, limit=10) == [('b', 0.6)]
+    assert index.query('missing', min_similarity=0.1, limit=10) == []
+
+
+def test_finds_most_similar_pairs():
+    rng = random.Random(7)
+    catalog = [f'p{i}' for i in range(500)]
+    index = MinHashLSH()
+    baskets = {}
+    for user in range(300):
+        baskets[f'u{user}'] = set(rng.sample(catalog, 8))
+        index.add(f'u{user}', baskets[f'u{user}'])
+    # Near-duplicates of u0 (7 of 8 items shared, J = 0.78) must all be found
+    for copy in range(5):
+        basket = set(list(baskets['u0'])[:7]) | {f'extra{copy}'}
+        index.add(f'copy{copy}', basket)
+
+    found = {key for key, _ in index.query('u0', min_similarity=0.5, limit=10)}
+    assert {f'copy{copy}' for copy in range(5)} <= found
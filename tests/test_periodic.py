@@ -0,0 +1,67 @@
+from app.utils.periodic import PeriodicWorker
+import asyncio
+
+
+def run_worker(step, interval, run_first=True, settle=0.05, poke=None):
+    stopped = []
+
+    async def on_stop():
+        stopped.append(True)
+
+    async def main():
+        worker = PeriodicWorker('Test worker', step, interval, run_first=run_first, on_stop=on_stop)
+        worker.start()
+        await asyncio.sleep(settle)
+        if poke is not None:
+            poke(worker)
+            await asyncio.sleep(settle)
+        await worker.stop()
+        assert not worker.running
+
+    asyncio.run(main())
+    return stopped
+
+
+def test_step_returning_true_runs_again_without_waiting():
+    calls = []
+
+    async def step():
+        calls.append(len(calls))
+        return len(calls) < 3
+
+    stopped = run_worker(step, lambda: 60)
+    assert calls == [0, 1, 2]
+    assert stopped == [True]
+
+
+def test_counts_are_not_mistaken_for_more_work():
+    calls = []
+
+    async def step():
+        calls.append(1)
+        return 5
+
+    run_worker(step, lambda: 60)
+    assert calls == [1]
+
+
+def test_run_first_false_waits_and_wake_cuts_the_wait_short():
+    calls = []
+
+    async def step():
+        calls.append(1)
+
+    stopped = run_worker(step, lambda: None, run_first=False, poke=lambda worker: worker.wake())
+    assert calls == [1]
+    assert stopped == [True]
+
+
+def test_failing_step_is_retried_after_the_interval():
+    calls = []
+
+    async def step():
+        calls.append(1)
+        raise RuntimeError('boom')
+
+    run_worker(step, lambda: 0.01, settle=0.1)
+    assert len(calls) >= 2
@@ -0,0 +1,37 @@
+from app.services.catalog_cache import CatalogCache, CatalogSnapshot
+from app.services.recommendation_cache import RecommendationCache
+from collections import OrderedDict
+import asyncio
+import pytest
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    products = {f'p{i}': {'id': f'p{i}', 'stock_quantity': 5} for i in range(4)}
+    monkeypatch.setattr(RecommendationCache, '_entries', OrderedDict())
+    monkeypatch.setattr(RecommendationCache, '_size', 0)
+
+    async def get_snapshot():
+        return CatalogSnapshot(list(products.values()), [])
+    monkeypatch.setattr(CatalogCache, 'get_snapshot', get_snapshot)
+    return products
+
+
+def test_hit_hydrates_current_rows(catalog):
+    RecommendationCache.put('u1', 3, ['p2', 'p0', 'p1'], RecommendationCache.generation())
+    products = asyncio.run(RecommendationCache.get('u1', 3))
+    assert [product['id'] for product in products] == ['p2', 'p0', 'p1']
+
+
+def test_sold_out_product_turns_the_entry_into_a_miss(catalog):
+    RecommendationCache.put('u1', 3, ['p2', 'p0', 'p1'], RecommendationCache.generation())
+    catalog['p0']['stock_quantity'] = 0
+    assert asyncio.run(RecommendationCache.get('u1', 3)) is None
+    assert RecommendationCache.get_ids('u1', 3) is None
+    assert RecommendationCache._size == 0
+
+
+def test_deleted_product_turns_the_entry_into_a_miss(catalog):
+    RecommendationCache.put('u1', 2, ['p3', 'p1'], RecommendationCache.generation())
+    del catalog['p3']
+    assert asyncio.run(RecommendationCache.get('u1', 2)) is None
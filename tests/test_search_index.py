@@ -0,0 +1,73 @@
+from app.services.search_index import SearchIndex, stem, tokenize
+
+
+def make_index(*products):
+    index = SearchIndex()
+    for product in products:
+        index.upsert(product)
+    return index
+
+
+def product(product_id, name, category='Electronics', description=''):
+    return {'id': product_id, 'name': name, 'category': category, 'description': description}
+
+
+def test_tokenize_drops_stopwords_and_stems():
+    assert tokenize('The Chargers for phones') == ['charger', 'phon']
+    assert stem('charged') == stem('charge')
+
+
+def test_name_match_outranks_description_match():
+    index = make_index(
+        product('a', 'Leather case', description='Fits any charger'),
+        product('b', 'Fast charger', description='Leather free')
+    )
+    assert [product_id for product_id, _ in index.search('charger')] == ['b', 'a']
+
+
+def test_rare_terms_weigh_more_than_common_ones():
+    index = make_index(
+        product('a', 'Samsung phone'),
+        product('b', 'Samsung tablet'),
+        product('c', 'Nokia phone'),
+        product('d', 'Samsung charger')
+    )
+    ranked = index.search('samsung phone')
+    assert ranked[0][0] == 'a'
+    # "phone" is in 2 of 4 products and "samsung" in 3, so the phone match ranks next
+    assert ranked[1][0] == 'c'
+
+
+def test_prefix_matches_partial_words():
+    index = make_index(product('a', 'Headphones'), product('b', 'Speaker'))
+    assert [product_id for product_id, _ in index.search('headph')] == ['a']
+
+
+def test_upsert_reindexes_changed_text():
+    index = make_index(product('a', 'Blue kettle'))
+    index.upsert(product('a', 'Red toaster'))
+
+    assert index.search('kettle') == []
+    assert [product_id for product_id, _ in index.search('toaster')] == ['a']
+    assert 'kettl' not in index.postings
+    assert index.total_length == index.doc_lengths['a']
+
+
+def test_remove_drops_postings_and_length():
+    index = make_index(product('a', 'Blue kettle'), product('b', 'Blue mug'))
+    index.remove('a')
+
+    assert [product_id for product_id, _ in index.search('blue')] == ['b']
+    assert 'kettl' not in index.postings
+    assert index.total_length == index.doc_lengths['b']
+    index.remove('a')  # Removing twice is a no-op
+
+
+def test_incremental_index_matches_fresh_build():
+    products = [product(str(i), f'Item {i} phone', description='charger' * (i % 3)) for i in range(10)]
+    index = make_index(*products)
+    index.upsert(product('3', 'Wireless phone charger'))
+    index.remove('7')
+
+    fresh = make_index(*[p for p in products if p['id'] not in ('3', '7')], product('3', 'Wireless phone charger'))
+    assert index.search('phone charger') == fresh.search('phone charger')
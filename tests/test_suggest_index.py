@@ -0,0 +1,34 @@
+from app.services.catalog_cache import CatalogSnapshot
+from app.services.suggest_index import SuggestIndex
+
+
+def make_index():
+    products = [
+        {'id': 'a', 'name': 'Samsung Galaxy S24', 'category': 'Phones', 'score': 5},
+        {'id': 'b', 'name': 'Samsung Charger', 'category': 'Accessories', 'score': 9},
+        {'id': 'c', 'name': 'Galaxy Buds', 'category': 'Audio', 'score': 1}
+    ]
+    index = SuggestIndex(max_tracked_queries=2)
+    index.sync(CatalogSnapshot(products, []), score=lambda product: product['score'])
+    return index
+
+
+def test_products_match_any_word_prefix_ranked_by_score():
+    index = make_index()
+    assert index.suggest_products('sam', 5) == ['b', 'a']
+    assert index.suggest_products('galaxy', 5) == ['a', 'c']
+    # One and two character prefixes come from the precomputed lists
+    assert index.suggest_products('g', 5) == ['a', 'c']
+
+
+def test_categories_ranked_by_best_product():
+    assert make_index().suggest_categories('a', 5) == ['Accessories', 'Audio']
+
+
+def test_queries_ranked_by_count_and_bounded():
+    index = make_index()
+    for query in ['phone case', 'Phone  Case', 'phone charger', 'tv', 'tablet', 'toaster']:
+        index.record_query(query)
+
+    assert index.suggest_queries('phone', 5) == ['phone case', 'phone charger']
+    assert len(index._query_counts) <= 2 * index.max_tracked_queries
@@ -0,0 +1,84 @@
+from app.services import trending
+from app.services.trending import TrendingCounter
+from app.core.config import settings
+import asyncio
+import math
+import random
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def counter(clock, monkeypatch):
+    monkeypatch.setattr(TrendingCounter, '_scores', {})
+    monkeypatch.setattr(TrendingCounter, '_pending', {})
+    monkeypatch.setattr(TrendingCounter, '_top', {})
+    monkeypatch.setattr(TrendingCounter, '_heap', [])
+    monkeypatch.setattr(TrendingCounter, '_landmark', clock[0])
+    monkeypatch.setattr(TrendingCounter, '_checkpoint_lock', None)
+    monkeypatch.setattr(settings, 'TRENDING_TOP_K', 5)
+
+
+def current_score(product_id, now):
+    rate = math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+    return TrendingCounter._scores[product_id] * math.exp(-(now - TrendingCounter._landmark) * rate)
+
+
+def test_score_halves_every_half_life(clock):
+    TrendingCounter.record('p1', 'view')
+    clock[0] += settings.TRENDING_HALF_LIFE_HOURS * 3600
+    assert current_score('p1', clock[0]) == pytest.approx(0.5)
+
+    TrendingCounter.record('p1', 'purchase')
+    assert current_score('p1', clock[0]) == pytest.approx(3.5)
+
+
+def test_recent_activity_outranks_older_activity(clock):
+    for _ in range(3):
+        TrendingCounter.record('old', 'view')
+    clock[0] += 2 * settings.TRENDING_HALF_LIFE_HOURS * 3600  # 3 views are now worth 0.75
+    TrendingCounter.record('new', 'view')
+    assert TrendingCounter.top() == ['new', 'old']
+
+
+def test_top_k_matches_brute_force_across_rescales(clock, monkeypatch):
+    monkeypatch.setattr(settings, 'TRENDING_HALF_LIFE_HOURS', 1.0)
+    rate = math.log(2) / 3600
+    rng = random.Random(5)
+    events = []
+    for _ in range(5000):
+        clock[0] += rng.random() * 120
+        product_id = f'p{rng.randrange(40)}'
+        activity = rng.choice(['view', 'purchase'])
+        TrendingCounter.record(product_id, activity)
+        events.append((clock[0], product_id, trending.ACTIVITY_WEIGHTS.get(activity, 1.0)))
+
+    assert TrendingCounter._landmark > 1_000_000.0  # The landmark was moved at least once
+    exact = {}
+    for at, product_id, weight in events:
+        exact[product_id] = exact.get(product_id, 0.0) + weight * math.exp(-(clock[0] - at) * rate)
+    assert TrendingCounter.top() == sorted(exact, key=exact.get, reverse=True)[:5]
+    assert len(TrendingCounter._heap) <= 4 * settings.TRENDING_TOP_K
+
+
+def test_checkpoint_merges_shared_scores_and_keeps_concurrent_activity(clock, fake_db):
+    db = fake_db(trending)
+
+    def shared_scores(query):
+        TrendingCounter.record('p2', 'view')  # Recorded while the RPC is in flight
+        return [{'product_id': 'p1', 'score': 10.0}, {'product_id': 'p9', 'score': 4.0}]
+
+    db.on('checkpoint_trending_scores', shared_scores)
+    TrendingCounter.record('p1', 'purchase')
+    asyncio.run(TrendingCounter.checkpoint())
+
+    assert [query.params['p_deltas'] for query in db.calls] == [{'p1': pytest.approx(3.0)}]
+    assert TrendingCounter.top() == ['p1', 'p9', 'p2']
+    assert TrendingCounter._pending == {'p2': pytest.approx(1.0)}
+
+
+def test_failed_checkpoint_keeps_increments(clock, fake_db):
+    fake_db(trending).on('checkpoint_trending_scores', ConnectionError('database down'))
+    TrendingCounter.record('p1', 'view')
+    with pytest.raises(ConnectionError):
+        asyncio.run(TrendingCounter.checkpoint())
+    assert TrendingCounter._pending == {'p1': pytest.approx(1.0)}
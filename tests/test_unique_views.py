@@ -0,0 +1,71 @@
+from app.services import unique_views
+from app.services.unique_views import UniqueViewCounter
+from app.core.config import settings
+from app.utils.hyperloglog import HyperLogLog
+import asyncio
+import base64
+import pytest
+
+
+@pytest.fixture
+def counter(clock, fake_db, monkeypatch):
+    db = fake_db(unique_views)
+    monkeypatch.setattr(UniqueViewCounter, '_sketches', {})
+    monkeypatch.setattr(UniqueViewCounter, '_changed', set())
+    monkeypatch.setattr(UniqueViewCounter, '_flush_lock', None)
+    return clock, db
+
+
+def test_repeat_viewers_count_once(counter):
+    for viewer in ['a', 'b', 'a', 'c', 'b']:
+        UniqueViewCounter.record('p1', viewer)
+    assert UniqueViewCounter.estimate('p1') == 3
+    assert UniqueViewCounter.estimate('p2') == 0
+
+
+def shared_sketch(product_id, bucket, viewers):
+    sketch = HyperLogLog(settings.UNIQUE_VIEWS_PRECISION)
+    for viewer in viewers:
+        sketch.add(viewer)
+    return {'product_id': product_id, 'bucket': bucket, 'registers': base64.b64encode(sketch.registers).decode()}
+
+
+def test_flush_merges_every_instances_sketches(counter):
+    clock, db = counter
+    bucket = UniqueViewCounter._current_bucket()
+    # Another instance saw 'b' and 'c' on p1, and p2 only
+    db.on('merge_product_view_sketches', [shared_sketch('p1', bucket, ['b', 'c']), shared_sketch('p2', bucket, ['x'])])
+    UniqueViewCounter.record('p1', 'a')
+    UniqueViewCounter.record('p1', 'b')
+
+    asyncio.run(UniqueViewCounter.flush())
+    merge = db.queries('merge_product_view_sketches')[0].params
+    assert [(sketch['product_id'], sketch['bucket']) for sketch in merge['p_sketches']] == [('p1', bucket)]
+    assert merge['p_oldest_bucket'] == bucket - UniqueViewCounter._window_buckets() + 1
+    assert db.queries('set_product_unique_views')[0].params['p_counts'] == {'p1': 3, 'p2': 1}
+
+    # Nothing changed locally: the next flush only reads the shared sketches back
+    asyncio.run(UniqueViewCounter.flush())
+    assert db.queries('merge_product_view_sketches')[1].params['p_sketches'] == []
+
+
+def test_failed_merge_keeps_changes_for_the_next_flush(counter):
+    clock, db = counter
+    db.on('merge_product_view_sketches', ConnectionError('database down'))
+    UniqueViewCounter.record('p1', 'a')
+    with pytest.raises(ConnectionError):
+        asyncio.run(UniqueViewCounter.flush())
+    assert UniqueViewCounter._changed == {('p1', UniqueViewCounter._current_bucket())}
+
+
+def test_aged_out_products_are_forgotten_and_drop_to_zero(counter):
+    clock, db = counter
+    UniqueViewCounter.record('p1', 'a')
+    asyncio.run(UniqueViewCounter.flush())
+    assert db.calls[-1].params['p_counts'] == {'p1': 1}
+
+    # Past the window every bucket has aged out: p1 is left out of the counts, which zeroes it
+    clock[0] += (settings.UNIQUE_VIEWS_WINDOW_HOURS + settings.UNIQUE_VIEWS_BUCKET_HOURS) * 3600
+    asyncio.run(UniqueViewCounter.flush())
+    assert db.calls[-1].params['p_counts'] == {}
+    assert UniqueViewCounter._sketches == {}